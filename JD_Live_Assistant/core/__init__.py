@@ -1,16 +1,47 @@
-"""核心业务模块包。"""
-
-from .automation import BrowserController
-from .config import ConfigManager
-from .hotkeys import HotkeyManager
-from .license import LicenseManager
-from .schedule import ScheduleManager
-
-__all__ = [
-    "BrowserController",
-    "HotkeyManager",
-    "ScheduleManager",
-    "ConfigManager",
-    "LicenseManager",
-]
+"""核心业务模块包。
 
+各子模块在首次访问时才导入（PEP 562），``from JD_Live_Assistant.core import X``
+只加载 ``X`` 所在的模块，Playwright、APScheduler 等较重的依赖不会在启动时被
+连带导入。
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+_EXPORTS = {
+    "BrowserController": ".automation",
+    "HotkeyManager": ".hotkeys",
+    "ScheduleManager": ".schedule",
+    "ConfigManager": ".config",
+    "ConfigError": ".config",
+    "LicenseManager": ".license",
+    "CommentMonitor": ".monitor",
+    "TaskCancelled": ".control",
+    "TaskControl": ".control",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .automation import BrowserController
+    from .config import ConfigError, ConfigManager
+    from .control import TaskCancelled, TaskControl
+    from .hotkeys import HotkeyManager
+    from .license import LicenseManager
+    from .monitor import CommentMonitor
+    from .schedule import ScheduleManager
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,238 @@
+"""商品讲解操作模块：通过 Playwright 定位器点击“讲解”“确定”“结束”按钮。
+
+原先在页面脚本中调用 ``button.click()``，失败时再派发合成的 ``click`` 事件，之后
+固定休眠若干秒“等页面反应”。现在改为：
+
+- 通过定位器点击，由 Playwright 的可操作性检查（可见、稳定、可用、能接收事件）
+  负责滚动与等待，不再点击尚未就绪的元素；
+- 点击后等待后置条件：讲解后该商品出现“结束”按钮，结束后列表中不再有“结束”
+  按钮；条件成立立即返回，超时才视为失败；
+- 等待期间出现“确定”确认框时点击确认，再继续等待后置条件，不再只检查第一次；
+  通常确认框已由页面中的自动确认（见 :mod:`.modals`）关闭，这里作为兜底。
+
+传入任务控制（``control``）时，等待按钮出现与等待后置条件都拆成短时间片，
+任务停止后在 ``CANCEL_SLICE`` 秒内抛出 :class:`~.control.TaskCancelled`；
+点击本身不可重复，只在按钮出现后执行一次。
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple, Type, TypeVar, Union
+
+from loguru import logger
+
+from .automation import timeout_error
+from .goods import GOODS_ROW_SKU_SCRIPT
+
+if TYPE_CHECKING:  # pragma: no cover
+    from playwright.sync_api import ElementHandle, Frame, Locator, Page
+
+    from .control import TaskControl
+
+EXPLAIN_TEXT = re.compile(r"^\s*讲解\s*$")
+STOP_TEXT = re.compile(r"^\s*结束\s*$")
+CONFIRM_TEXT = re.compile(r"确\s*定")
+
+STATE_EXPLAINING = "explaining"
+STATE_STOPPED = "stopped"
+STATE_CONFIRM = "confirm"
+EFFECT_POLL_MS = 100
+# 按钮出现后实际点击的最短超时秒数
+MIN_CLICK_SECONDS = 1.0
+
+T = TypeVar("T")
+
+# 后置条件：返回 "confirm"（出现确认框）、目标状态，或 false 继续等待
+_EFFECT_SCRIPT = """
+([target, row, itemSelector]) => {
+    const textOf = (node) => (node.textContent || '').replace(/\\s+/g, '');
+    const visible = (node) => node.getClientRects().length > 0;
+    const hasStop = (node) => Array.from(node.querySelectorAll('span')).some((span) => textOf(span) === '结束' && visible(span));
+    const confirm = Array.from(document.querySelectorAll('button.ant-btn-primary')).some((button) => textOf(button).includes('确定') && visible(button));
+    if (confirm) {
+        return 'confirm';
+    }
+    const items = Array.from(document.querySelectorAll(itemSelector));
+    if (target === 'explaining') {
+        // 点击的行被重新渲染时，退回到检查整个列表
+        const explaining = row && row.isConnected ? hasStop(row) : items.some(hasStop);
+        return explaining ? target : false;
+    }
+    return items.some(hasStop) ? false : target;
+}
+"""
+
+
+def _playwright_error() -> Type[Exception]:
+    from playwright.sync_api import Error
+
+    return Error
+
+
+@dataclass(frozen=True)
+class ActionResult:
+    """一次点击操作的结果。"""
+
+    ok: bool
+    elapsed: float = 0.0
+    confirmed: bool = False
+    detail: str = ""
+
+
+class GoodsActions:
+    """商品列表上的讲解/结束操作，``ctx`` 为商品列表所在的 Page 或 Frame。"""
+
+    def __init__(
+        self,
+        item_selector: str,
+        button_selector: str,
+        click_timeout: float = 5.0,
+        effect_timeout: float = 8.0,
+        max_confirms: int = 2,
+        control: Optional[TaskControl] = None,
+        before_click: Optional[Callable[[Union[Page, Frame]], None]] = None,
+    ) -> None:
+        self.item_selector = item_selector
+        self.button_selector = button_selector
+        self.click_timeout = click_timeout
+        self.effect_timeout = effect_timeout
+        self.max_confirms = max_confirms
+        self.control = control
+        # 点击讲解/结束前调用，如为确认框自动确认开启时间窗口（见 ModalAutoConfirmer.arm）
+        self.before_click = before_click
+
+    # 定位器 ------------------------------------------------------------------
+    def explain_button(self, ctx: Union[Page, Frame], index: int) -> Locator:
+        row = ctx.locator(self.item_selector).nth(index)
+        primary = row.locator(self.button_selector).filter(has_text=EXPLAIN_TEXT)
+        fallback = row.locator("button, a, span").filter(has_text=EXPLAIN_TEXT)
+        return primary.or_(fallback).first
+
+    def stop_button(self, ctx: Union[Page, Frame]) -> Locator:
+        # 同一时间只有一个商品在讲解，列表中的“结束”按钮即为当前商品的
+        items = ctx.locator(self.item_selector)
+        primary = items.locator(self.button_selector).filter(has_text=STOP_TEXT)
+        fallback = items.locator("span").filter(has_text=STOP_TEXT)
+        return primary.or_(fallback).first
+
+    def confirm_button(self, ctx: Union[Page, Frame]) -> Locator:
+        scoped = ctx.locator(".ant-popover .ant-btn-primary, .ant-modal .ant-btn-primary").filter(has_text=CONFIRM_TEXT)
+        fallback = ctx.locator("button.ant-btn-primary").filter(has_text=CONFIRM_TEXT)
+        return scoped.or_(fallback).first
+
+    # 操作 --------------------------------------------------------------------
+    def explain(self, ctx: Union[Page, Frame], index: int, sku: Optional[str] = None) -> ActionResult:
+        """点击第 ``index`` 个商品的“讲解”按钮，等待该商品进入讲解状态。
+
+        传入 ``sku`` 时先核对该行仍是这个商品：翻页、滚动或列表刷新后 DOM 索引
+        可能已指向别的商品，此时不点击。
+        """
+
+        error = _playwright_error()
+        try:
+            # 固定点击前的商品行，用于判断讲解状态是否出现在这一行上
+            row = self._within(ctx.locator(self.item_selector).nth(index).element_handle, self.click_timeout)
+        except error as exc:
+            return ActionResult(False, detail=f"商品行不存在：{_first_line(exc)}")
+        try:
+            if sku is not None:
+                try:
+                    current = row.evaluate(GOODS_ROW_SKU_SCRIPT, index)
+                except error as exc:
+                    return ActionResult(False, detail=f"读取商品行失败：{_first_line(exc)}")
+                if current != sku:
+                    return ActionResult(False, detail=f"第 {index} 行已是其他商品（SKU: {current}）")
+            return self._click_until(ctx, self.explain_button(ctx, index), STATE_EXPLAINING, row)
+        finally:
+            row.dispose()
+
+    def stop(self, ctx: Union[Page, Frame]) -> ActionResult:
+        """点击当前讲解商品的“结束”按钮，等待列表中不再有商品处于讲解状态。"""
+
+        return self._click_until(ctx, self.stop_button(ctx), STATE_STOPPED, None)
+
+    def _click_until(
+        self,
+        ctx: Union[Page, Frame],
+        button: Locator,
+        target: str,
+        row: Optional[ElementHandle],
+    ) -> ActionResult:
+        error = _playwright_error()
+        started = time.monotonic()
+        if self.before_click is not None:
+            self.before_click(ctx)
+        try:
+            self._click(button, self.click_timeout)
+        except error as exc:
+            return ActionResult(False, time.monotonic() - started, detail=f"按钮不可点击：{_first_line(exc)}")
+
+        confirmed = False
+        deadline = started + self.click_timeout + self.effect_timeout
+        for _ in range(self.max_confirms + 1):
+            remaining = deadline - time.monotonic()
+            try:
+                state, waited = self._wait_effect(ctx, target, row, remaining)
+            except error as exc:
+                return ActionResult(False, time.monotonic() - started, confirmed, f"等待页面响应超时：{_first_line(exc)}")
+            if state != STATE_CONFIRM:
+                logger.debug("操作 {} 生效，耗时 {:.0f}ms", target, (time.monotonic() - started) * 1000)
+                return ActionResult(True, time.monotonic() - started, confirmed)
+            try:
+                self._click(self.confirm_button(ctx), min(remaining - waited, self.click_timeout))
+                confirmed = True
+            except error as exc:
+                # 确认框可能已被页面中的自动确认关闭，继续等待后置条件
+                logger.debug("点击确认按钮失败: {}", _first_line(exc))
+        return ActionResult(False, time.monotonic() - started, confirmed, "确认后页面仍未响应")
+
+    def _wait_effect(
+        self,
+        ctx: Union[Page, Frame],
+        target: str,
+        row: Optional[ElementHandle],
+        timeout: float,
+    ) -> Tuple[Any, float]:
+        started = time.monotonic()
+        handle = self._within(
+            lambda **options: ctx.wait_for_function(
+                _EFFECT_SCRIPT,
+                arg=[target, row, self.item_selector],
+                # 固定间隔轮询：后台标签页或被遮挡的窗口中 requestAnimationFrame 会被挂起
+                polling=EFFECT_POLL_MS,
+                **options,
+            ),
+            timeout,
+        )
+        try:
+            return handle.json_value(), time.monotonic() - started
+        finally:
+            handle.dispose()
+
+    def _click(self, button: Locator, seconds: float) -> None:
+        """在 ``seconds`` 秒内点击按钮一次。
+
+        等待按钮出现可以安全地分片重试；点击会切换讲解/结束状态，超时后重试可能
+        点击两次，因此只以剩余时间点击一次。
+        """
+
+        started = time.monotonic()
+        if self.control is not None:
+            self._within(lambda **options: button.wait_for(state="visible", **options), seconds)
+        remaining = seconds - (time.monotonic() - started)
+        button.click(timeout=max(remaining, MIN_CLICK_SECONDS) * 1000)
+
+    def _within(self, call: Callable[..., T], seconds: float) -> T:
+        """以 ``timeout=毫秒`` 调用 Playwright 操作；有任务控制时分片调用以便及时响应停止。"""
+
+        seconds = max(seconds, 0.1)
+        if self.control is None:
+            return call(timeout=seconds * 1000)
+        return self.control.sliced(lambda part: call(timeout=part * 1000), seconds, retry_on=timeout_error())
+
+
+def _first_line(exc: BaseException) -> str:
+    return str(exc).strip().splitlines()[0] if str(exc).strip() else exc.__class__.__name__
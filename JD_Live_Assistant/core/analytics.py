@@ -0,0 +1,258 @@
+"""互动统计模块，按时间窗口与讲解商品聚合评论数据。
+
+所有计数都存放在固定大小的环形缓冲区中：
+
+- 秒级：最近 ``seconds`` 秒的评论数；
+- 分钟级：最近 ``minutes`` 分钟的评论数、关键词命中数与独立用户；
+- 讲解窗口：任务线程在开始/结束讲解某个 SKU 时打开/关闭窗口，
+  最近 ``window_history`` 个窗口保留明细，按 SKU 的累计值按商品数有界。
+
+因此长时间直播（10 小时以上）内存占用保持恒定。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from .keywords import KeywordHit
+from .monitor import Comment
+
+
+class RingCounter:
+    """定长环形计数器，每个槽位对应一个时间桶。"""
+
+    def __init__(self, size: int, resolution: float) -> None:
+        self.size = size
+        self.resolution = resolution
+        self._counts: List[int] = [0] * size
+        self._buckets: List[int] = [-1] * size
+
+    def _slot(self, timestamp: float) -> int:
+        bucket = int(timestamp // self.resolution)
+        slot = bucket % self.size
+        if self._buckets[slot] != bucket:
+            # 槽位属于已过期的时间桶，复用前清零
+            self._buckets[slot] = bucket
+            self._counts[slot] = 0
+        return slot
+
+    def add(self, timestamp: float, amount: int = 1) -> None:
+        self._counts[self._slot(timestamp)] += amount
+
+    def series(self, now: float) -> List[int]:
+        """返回最近 ``size`` 个时间桶的计数，按时间从旧到新排列。"""
+
+        current = int(now // self.resolution)
+        values: List[int] = []
+        for bucket in range(current - self.size + 1, current + 1):
+            slot = bucket % self.size
+            values.append(self._counts[slot] if self._buckets[slot] == bucket else 0)
+        return values
+
+    def total(self, now: float, span: Optional[int] = None) -> int:
+        """返回最近 ``span`` 个时间桶（默认全部）的计数之和。"""
+
+        values = self.series(now)
+        return sum(values[-span:] if span else values)
+
+
+class RingSet:
+    """定长环形集合，用于按时间桶统计独立用户。"""
+
+    def __init__(self, size: int, resolution: float) -> None:
+        self.size = size
+        self.resolution = resolution
+        self._sets: List[Set[str]] = [set() for _ in range(size)]
+        self._buckets: List[int] = [-1] * size
+
+    def add(self, timestamp: float, value: str) -> None:
+        bucket = int(timestamp // self.resolution)
+        slot = bucket % self.size
+        if self._buckets[slot] != bucket:
+            self._buckets[slot] = bucket
+            self._sets[slot] = set()
+        self._sets[slot].add(value)
+
+    def series(self, now: float) -> List[int]:
+        current = int(now // self.resolution)
+        values: List[int] = []
+        for bucket in range(current - self.size + 1, current + 1):
+            slot = bucket % self.size
+            values.append(len(self._sets[slot]) if self._buckets[slot] == bucket else 0)
+        return values
+
+    def distinct(self, now: float, span: int = 1) -> int:
+        """返回最近 ``span`` 个时间桶内的独立值数量。"""
+
+        current = int(now // self.resolution)
+        merged: Set[str] = set()
+        for bucket in range(current - min(span, self.size) + 1, current + 1):
+            slot = bucket % self.size
+            if self._buckets[slot] == bucket:
+                merged |= self._sets[slot]
+        return len(merged)
+
+
+@dataclass
+class ExplanationWindow:
+    """一次商品讲解期间的互动统计。"""
+
+    sku: str
+    label: str
+    started_at: float
+    ended_at: Optional[float] = None
+    comments: int = 0
+    keyword_hits: int = 0
+    users: Set[str] = field(default_factory=set, repr=False)
+    archived_users: int = 0
+
+    @property
+    def unique_users(self) -> int:
+        return len(self.users) if self.ended_at is None else self.archived_users
+
+    @property
+    def seconds(self) -> float:
+        end = self.ended_at if self.ended_at is not None else time.time()
+        return max(end - self.started_at, 0.0)
+
+    @property
+    def comments_per_minute(self) -> float:
+        seconds = self.seconds
+        return self.comments * 60.0 / seconds if seconds > 0 else 0.0
+
+
+@dataclass
+class SkuStats:
+    """某个 SKU 在全部讲解窗口中的累计互动。"""
+
+    windows: int = 0
+    seconds: float = 0.0
+    comments: int = 0
+    keyword_hits: int = 0
+    unique_users: int = 0
+
+
+class CommentAnalytics:
+    """评论互动统计，供评论监听线程写入、界面与任务线程读取。"""
+
+    def __init__(self, seconds: int = 300, minutes: int = 60, window_history: int = 200) -> None:
+        self._lock = threading.Lock()
+        self._per_second = RingCounter(seconds, 1.0)
+        self._per_minute = RingCounter(minutes, 60.0)
+        self._keywords_per_minute = RingCounter(minutes, 60.0)
+        self._users_per_minute = RingSet(minutes, 60.0)
+        self._current: Optional[ExplanationWindow] = None
+        self._history: Deque[ExplanationWindow] = deque(maxlen=window_history)
+        self._by_sku: Dict[str, SkuStats] = {}
+        self.total_comments = 0
+        self.total_keyword_hits = 0
+
+    # 评论与关键词监听 ------------------------------------------------------
+    def record_comment(self, comment: Comment) -> None:
+        timestamp = comment.timestamp or time.time()
+        user = comment.user_id or comment.user
+        with self._lock:
+            self.total_comments += 1
+            self._per_second.add(timestamp)
+            self._per_minute.add(timestamp)
+            if user:
+                self._users_per_minute.add(timestamp, user)
+            if self._current is not None:
+                self._current.comments += 1
+                if user:
+                    self._current.users.add(user)
+
+    def record_keyword(self, hit: KeywordHit) -> None:
+        timestamp = hit.comment.timestamp or time.time()
+        with self._lock:
+            self.total_keyword_hits += hit.occurrences
+            self._keywords_per_minute.add(timestamp, hit.occurrences)
+            if self._current is not None:
+                self._current.keyword_hits += hit.occurrences
+
+    # 讲解窗口 ----------------------------------------------------------------
+    def begin_window(self, sku: str, label: str = "") -> None:
+        """开始统计某个 SKU 的讲解窗口，未关闭的旧窗口会先被关闭。"""
+
+        with self._lock:
+            self._close_current()
+            self._current = ExplanationWindow(sku=sku, label=label or sku, started_at=time.time())
+
+    def end_window(self) -> Optional[ExplanationWindow]:
+        """关闭当前讲解窗口并返回其统计，没有打开的窗口时返回 None。"""
+
+        with self._lock:
+            return self._close_current()
+
+    def _close_current(self) -> Optional[ExplanationWindow]:
+        window = self._current
+        if window is None:
+            return None
+        self._current = None
+        window.ended_at = time.time()
+        # 明细只需保留在窗口打开期间，归档时只留下独立用户数
+        window.archived_users = len(window.users)
+        window.users = set()
+        self._history.append(window)
+        stats = self._by_sku.setdefault(window.sku, SkuStats())
+        stats.windows += 1
+        stats.seconds += window.seconds
+        stats.comments += window.comments
+        stats.keyword_hits += window.keyword_hits
+        stats.unique_users += window.unique_users
+        return window
+
+    # 查询 --------------------------------------------------------------------
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """返回用于图表展示的统计快照。"""
+
+        now = now or time.time()
+        with self._lock:
+            current = self._current
+            return {
+                "per_second": self._per_second.series(now),
+                "per_minute": self._per_minute.series(now),
+                "keyword_hits_per_minute": self._keywords_per_minute.series(now),
+                "unique_users_per_minute": self._users_per_minute.series(now),
+                "comments_last_10s": self._per_second.total(now, 10),
+                "comments_last_minute": self._per_second.total(now, 60),
+                "unique_users_last_5min": self._users_per_minute.distinct(now, 5),
+                "total_comments": self.total_comments,
+                "total_keyword_hits": self.total_keyword_hits,
+                "current_window": None
+                if current is None
+                else {
+                    "sku": current.sku,
+                    "label": current.label,
+                    "seconds": current.seconds,
+                    "comments": current.comments,
+                    "unique_users": current.unique_users,
+                    "keyword_hits": current.keyword_hits,
+                },
+            }
+
+    def recent_windows(self, limit: int = 20) -> List[ExplanationWindow]:
+        with self._lock:
+            return list(self._history)[-limit:]
+
+    def sku_ranking(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """按讲解期间的每分钟评论数对 SKU 排序。"""
+
+        with self._lock:
+            rows = [
+                {
+                    "sku": sku,
+                    "windows": stats.windows,
+                    "comments": stats.comments,
+                    "keyword_hits": stats.keyword_hits,
+                    "unique_users": stats.unique_users,
+                    "comments_per_minute": stats.comments * 60.0 / stats.seconds if stats.seconds else 0.0,
+                }
+                for sku, stats in self._by_sku.items()
+            ]
+        rows.sort(key=lambda row: row["comments_per_minute"], reverse=True)
+        return rows[:limit]
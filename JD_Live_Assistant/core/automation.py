@@ -5,10 +5,27 @@ from __future__ import annotations
 import socket
 import threading
 from contextlib import suppress
-from typing import Any, Callable, Optional
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Optional, Type
 
 from loguru import logger
-from playwright.sync_api import Browser, Error, Page, Playwright, sync_playwright
+
+if TYPE_CHECKING:  # pragma: no cover
+    from playwright.sync_api import Browser, CDPSession, Page, Playwright
+
+
+def _sync_api() -> ModuleType:
+    """首次连接浏览器时才导入 Playwright，其导入耗时较长，不应拖慢程序启动。"""
+
+    from playwright import sync_api
+
+    return sync_api
+
+
+def timeout_error() -> Type[Exception]:
+    """Playwright 的超时异常类型，可取消的分片等待据此判断“本时间片未完成”。"""
+
+    return _sync_api().TimeoutError
 
 
 class BrowserController:
@@ -83,7 +100,7 @@ class BrowserController:
             self.disconnect(_lock_acquired=True)
             
             logger.debug("启动 Playwright...")
-            self._playwright = sync_playwright().start()
+            self._playwright = _sync_api().sync_playwright().start()
             logger.debug("Playwright 启动成功")
             
             endpoint = f"http://127.0.0.1:{port}"
@@ -96,7 +113,7 @@ class BrowserController:
                 logger.debug("执行 connect_over_cdp...")
                 self._browser = self._playwright.chromium.connect_over_cdp(endpoint)
                 logger.debug("CDP连接成功")
-            except Error as e:
+            except _sync_api().Error as e:
                 # Playwright 特定的错误
                 error_msg = (
                     f"连接浏览器失败: {str(e)}\n"
@@ -175,7 +192,7 @@ class BrowserController:
         except RuntimeError:
             # 超时错误已处理，直接重新抛出
             raise
-        except Error as e:
+        except _sync_api().Error as e:
             error_msg = (
                 f"连接浏览器失败: {str(e)}\n"
                 "可能的原因：\n"
@@ -222,6 +239,25 @@ class BrowserController:
                 raise RuntimeError("浏览器尚未连接，无法执行操作。")
             return callback(self._page)
 
+    def new_cdp_session(self) -> CDPSession:
+        """为当前页面创建 CDP 会话，用于订阅 Network 等底层事件。"""
+
+        with self._lock:
+            if not self._page:
+                raise RuntimeError("浏览器尚未连接，无法创建 CDP 会话。")
+            return self._page.context.new_cdp_session(self._page)
+
+    def pump(self, milliseconds: float) -> None:
+        """让出控制权给 Playwright 事件循环，使已订阅的事件得到分发。
+
+        Playwright 同步 API 只在调用期间处理事件，订阅事件的线程需周期性调用本方法。
+        """
+
+        with self._lock:
+            if not self._page:
+                raise RuntimeError("浏览器尚未连接，无法处理事件。")
+            self._page.wait_for_timeout(milliseconds)
+
     def disconnect(self, _lock_acquired: bool = False) -> None:
         """
         断开浏览器连接并释放资源。
@@ -237,7 +273,7 @@ class BrowserController:
                 logger.debug("清理 Page 对象")
                 self._page = None
             if self._browser:
-                with suppress(Error):
+                with suppress(_sync_api().Error):
                     logger.debug("关闭浏览器连接")
                     self._browser.close()
                 self._browser = None
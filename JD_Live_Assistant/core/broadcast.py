@@ -0,0 +1,253 @@
+"""直播日程模块，按时段自动开始/结束讲解任务。
+
+``settings.yaml`` 中的 ``calendar`` 为时段列表，每个时段包含：
+
+- ``name``：时段名称（必填，唯一）；
+- ``start``：开始时间，``HH:MM``（每天）、五段 crontab（如 ``"0 9 * * mon-fri"``）
+  或 ISO 日期时间（如 ``"2025-06-18 20:00"``，只执行一次，时间已过的不再登记）；
+- ``end``：结束时间（可选），``HH:MM`` 时沿用开始时间的日期规则，也可写完整
+  crontab 或 ISO 日期时间；跨零点的时段请使用完整写法；
+- ``port``、``duration``、``interval``、``playlist_path``、``material_path``、
+  ``continuous``：该时段的任务参数（可选，缺省取 ``task`` 配置）；
+- ``enabled``：是否启用（可选，默认 true）。
+
+示例::
+
+    calendar:
+      - name: 早场
+        start: "09:00"
+        end: "11:30"
+        playlist_path: playlists/morning.yaml
+        duration: 20
+      - name: 晚场
+        start: "0 19 * * mon-fri"
+        end: "22:00"
+        port: 9223
+        continuous: true
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from loguru import logger
+
+from .schedule import TIMEZONE, ScheduleManager
+
+if TYPE_CHECKING:  # pragma: no cover
+    from apscheduler.triggers.base import BaseTrigger
+
+JOB_PREFIX = "slot:"
+ACTION_START = "start_task"
+ACTION_STOP = "stop_task"
+EVENT_START = "start"
+EVENT_STOP = "stop"
+
+_CLOCK = re.compile(r"^(\d{1,2}):(\d{2})$")
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+class CalendarError(Exception):
+    """直播日程配置异常。"""
+
+
+@dataclass(frozen=True)
+class BroadcastSlot:
+    """一个直播时段。"""
+
+    name: str
+    start: str
+    end: str = ""
+    port: Optional[int] = None
+    duration: Optional[float] = None
+    interval: Optional[float] = None
+    playlist_path: str = ""
+    material_path: str = ""
+    continuous: Optional[bool] = None
+    enabled: bool = True
+
+    def task_params(self) -> Dict[str, Any]:
+        """返回启动任务所需的参数，未设置的项不包含在内。"""
+
+        params: Dict[str, Any] = {"slot": self.name}
+        for key in ("port", "duration", "interval", "continuous"):
+            value = getattr(self, key)
+            if value is not None:
+                params[key] = value
+        for key in ("playlist_path", "material_path"):
+            value = getattr(self, key)
+            if value:
+                params[key] = value
+        return params
+
+
+class BroadcastCalendar:
+    """直播日程：解析时段、登记定时任务并预先计算触发时间。"""
+
+    def __init__(self, slots: Iterable[BroadcastSlot] = ()) -> None:
+        self.slots: List[BroadcastSlot] = [slot for slot in slots if slot.enabled]
+        self._triggers: Dict[str, Tuple[BaseTrigger, Optional[BaseTrigger]]] = {
+            slot.name: _build_triggers(slot) for slot in self.slots
+        }
+
+    @classmethod
+    def from_config(cls, items: Any) -> "BroadcastCalendar":
+        if not items:
+            return cls()
+        if not isinstance(items, (list, tuple)):
+            raise CalendarError("calendar 配置应为时段列表")
+        slots: List[BroadcastSlot] = []
+        names: set = set()
+        for position, item in enumerate(items, start=1):
+            slot = _parse_slot(item, position)
+            if slot.name in names:
+                raise CalendarError(f"时段名称重复：{slot.name}")
+            names.add(slot.name)
+            slots.append(slot)
+        return cls(slots)
+
+    def get(self, name: str) -> Optional[BroadcastSlot]:
+        return next((slot for slot in self.slots if slot.name == name), None)
+
+    def register(self, scheduler: ScheduleManager, now: Optional[datetime] = None) -> int:
+        """一次性登记全部时段的开始/结束任务，并移除已不在日程中的旧任务。
+
+        配置热加载与程序重启都会重新登记。只执行一次的时段触发后任务即被调度器
+        删除，时间已过时不再重新登记，否则会在 misfire 宽限期内再次触发；任务库中
+        尚未触发的同一任务（程序未运行时错过）保留，按 misfire 规则补执行一次。
+        """
+
+        now = now or datetime.now().astimezone()
+        wanted: Dict[str, Tuple[BaseTrigger, str, Dict[str, Any]]] = {}
+        for slot in self.slots:
+            start_trigger, end_trigger = self._triggers[slot.name]
+            wanted[f"{JOB_PREFIX}{slot.name}:{EVENT_START}"] = (start_trigger, ACTION_START, slot.task_params())
+            if end_trigger is not None:
+                wanted[f"{JOB_PREFIX}{slot.name}:{EVENT_STOP}"] = (end_trigger, ACTION_STOP, {"slot": slot.name})
+
+        for job_id in scheduler.job_ids(JOB_PREFIX):
+            if job_id not in wanted:
+                scheduler.remove(job_id)
+        registered = 0
+        for job_id, (trigger, action, params) in wanted.items():
+            if _expired(trigger, now):
+                if not scheduler.has_action(job_id, trigger, action, **params):
+                    scheduler.remove(job_id)
+                continue
+            scheduler.add_action(job_id, trigger, action, **params)
+            registered += 1
+        logger.info("直播日程已登记：{} 个时段，{} 个定时任务", len(self.slots), registered)
+        return registered
+
+    def upcoming(self, now: Optional[datetime] = None, limit: int = 10) -> List[Tuple[datetime, BroadcastSlot, str]]:
+        """按时间顺序返回接下来的 ``limit`` 个开始/结束事件。"""
+
+        now = now or datetime.now().astimezone()
+        streams = []
+        for slot in self.slots:
+            start_trigger, end_trigger = self._triggers[slot.name]
+            streams.append(_fire_times(start_trigger, now, slot, EVENT_START))
+            if end_trigger is not None:
+                streams.append(_fire_times(end_trigger, now, slot, EVENT_STOP))
+        merged = heapq.merge(*streams, key=lambda event: event[0])
+        return [event for _, event in zip(range(limit), merged)]
+
+
+def _fire_times(
+    trigger: BaseTrigger,
+    now: datetime,
+    slot: BroadcastSlot,
+    event: str,
+) -> Iterator[Tuple[datetime, BroadcastSlot, str]]:
+    previous: Optional[datetime] = None
+    while True:
+        fire_time = trigger.get_next_fire_time(previous, previous + _ONE_MICROSECOND if previous else now)
+        if fire_time is None:
+            return
+        # DateTrigger 首次总是返回其 run_date，已过去的一次性事件不列出
+        if fire_time >= now:
+            yield fire_time, slot, event
+        previous = fire_time
+
+
+def _expired(trigger: BaseTrigger, now: datetime) -> bool:
+    """只执行一次的触发器是否已过触发时间。"""
+
+    from apscheduler.triggers.date import DateTrigger
+
+    return isinstance(trigger, DateTrigger) and trigger.run_date <= now
+
+
+def _build_triggers(slot: BroadcastSlot) -> Tuple[BaseTrigger, Optional[BaseTrigger]]:
+    from apscheduler.triggers.cron import CronTrigger
+    from apscheduler.triggers.date import DateTrigger
+
+    start = slot.start.strip()
+    end = slot.end.strip()
+    try:
+        clock = _CLOCK.match(start)
+        if clock:
+            fields = {"day": "*", "month": "*", "day_of_week": "*"}
+            start_trigger: BaseTrigger = CronTrigger(
+                hour=int(clock.group(1)), minute=int(clock.group(2)), timezone=TIMEZONE
+            )
+        elif len(start.split()) == 5:
+            minute, hour, day, month, day_of_week = start.split()
+            fields = {"day": day, "month": month, "day_of_week": day_of_week}
+            start_trigger = CronTrigger.from_crontab(start, timezone=TIMEZONE)
+        else:
+            run_date = datetime.fromisoformat(start)
+            start_trigger = DateTrigger(run_date=run_date, timezone=TIMEZONE)
+            return start_trigger, _build_one_off_end(end, run_date) if end else None
+
+        if not end:
+            return start_trigger, None
+        end_clock = _CLOCK.match(end)
+        if end_clock:
+            return start_trigger, CronTrigger(
+                hour=int(end_clock.group(1)), minute=int(end_clock.group(2)), timezone=TIMEZONE, **fields
+            )
+        return start_trigger, CronTrigger.from_crontab(end, timezone=TIMEZONE)
+    except (TypeError, ValueError) as exc:
+        raise CalendarError(f"时段 {slot.name} 的时间格式无效：{exc}") from exc
+
+
+def _build_one_off_end(end: str, run_date: datetime) -> BaseTrigger:
+    from apscheduler.triggers.date import DateTrigger
+
+    clock = _CLOCK.match(end)
+    if clock:
+        end_date = run_date.replace(hour=int(clock.group(1)), minute=int(clock.group(2)), second=0, microsecond=0)
+        if end_date <= run_date:
+            end_date += timedelta(days=1)
+    else:
+        end_date = datetime.fromisoformat(end)
+    return DateTrigger(run_date=end_date, timezone=TIMEZONE)
+
+
+def _parse_slot(item: Any, position: int) -> BroadcastSlot:
+    if not isinstance(item, Mapping):
+        raise CalendarError(f"第 {position} 个时段格式错误")
+    name = str(item.get("name") or "").strip()
+    start = str(item.get("start") or "").strip()
+    if not name or not start:
+        raise CalendarError(f"第 {position} 个时段缺少 name 或 start")
+    try:
+        return BroadcastSlot(
+            name=name,
+            start=start,
+            end=str(item.get("end") or "").strip(),
+            port=int(item["port"]) if item.get("port") not in (None, "") else None,
+            duration=float(item["duration"]) if item.get("duration") not in (None, "") else None,
+            interval=float(item["interval"]) if item.get("interval") not in (None, "") else None,
+            playlist_path=str(item.get("playlist_path") or "").strip(),
+            material_path=str(item.get("material_path") or "").strip(),
+            continuous=bool(item["continuous"]) if item.get("continuous") is not None else None,
+            enabled=bool(item.get("enabled", True)),
+        )
+    except (TypeError, ValueError) as exc:
+        raise CalendarError(f"时段 {name} 的参数无效：{exc}") from exc
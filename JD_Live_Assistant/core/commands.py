@@ -0,0 +1,102 @@
+"""命令执行模块，在单独的线程中串行执行耗时操作。
+
+热键回调运行在 keyboard 库的全局钩子线程上，界面回调运行在 Tk 主线程上，
+二者都不能被浏览器跳转、刷新这类阻塞操作占用。这些操作统一作为命令提交到
+本模块的队列中，由唯一的执行线程依次完成：
+
+- 同一命令尚在排队时重复提交会被合并（例如连续按多次刷新只执行一次）；
+- 所有浏览器操作都在同一线程中执行，满足 Playwright 同步 API 的线程要求；
+- 执行结果通过 ``on_result`` 回调交还调用方（界面中用 ``after`` 切回主线程）。
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+ResultHandler = Callable[[str, Any, Optional[BaseException]], None]
+
+_STOP = object()
+
+
+class CommandExecutor:
+    """单线程命令执行器，支持按名称合并重复命令。"""
+
+    def __init__(self, name: str = "command-executor", on_result: Optional[ResultHandler] = None) -> None:
+        self.name = name
+        self.on_result = on_result
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        key: str,
+        func: Callable[[], Any],
+        coalesce: bool = True,
+        notify: bool = True,
+    ) -> "Future[Any]":
+        """提交命令并立即返回。
+
+        Args:
+            coalesce: 同名命令仍在排队时不再重复入队，直接返回已有的 Future
+            notify: 执行完成后是否调用 ``on_result``
+        """
+
+        with self._lock:
+            if coalesce:
+                existing = self._pending.get(key)
+                if existing is not None:
+                    logger.debug("命令 {} 已在队列中，合并本次提交", key)
+                    return existing
+            future: "Future[Any]" = Future()
+            self._pending[key] = future
+        self._queue.put((key, func, future, notify))
+        return future
+
+    def call(self, key: str, func: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """提交命令并等待结果，用于需要同步完成的场景（如退出前断开连接）。"""
+
+        if threading.current_thread() is self._thread:
+            return func()
+        return self.submit(key, func, coalesce=False, notify=False).result(timeout=timeout)
+
+    def shutdown(self, timeout: Optional[float] = 5.0) -> None:
+        """等待已提交的命令执行完毕后停止执行线程。"""
+
+        self._queue.put(_STOP)
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout=timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            key, func, future, notify = item  # type: Tuple[str, Callable[[], Any], Future, bool]
+            with self._lock:
+                if self._pending.get(key) is future:
+                    del self._pending[key]
+            if not future.set_running_or_notify_cancel():
+                continue
+            result: Any = None
+            error: Optional[BaseException] = None
+            try:
+                result = func()
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("执行命令 {} 失败", key)
+                error = exc
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+            if notify and self.on_result is not None:
+                try:
+                    self.on_result(key, result, error)
+                except Exception:  # noqa: BLE001
+                    logger.exception("处理命令 {} 的结果失败", key)
@@ -1,12 +1,33 @@
-"""配置管理模块，负责读取与写入应用配置。"""
+"""配置管理模块，负责读取、校验、写入与监视应用配置。
+
+- 读取时补齐 :data:`DEFAULT_CONFIG` 中缺少的配置项，并按 :data:`SCHEMA` 校验一次
+  （端口、时长、热键等），类型不符的值会被规范化或拒绝，此后各模块直接使用
+  校验过的值；
+- :attr:`ConfigManager.snapshot` 返回只读快照，可安全地交给其他线程，各模块都
+  通过快照读取配置；需要修改时用 :meth:`ConfigManager.editable` 取得副本并保存；
+- :meth:`ConfigManager.watch` 在后台线程中监视 ``settings.yaml``，文件变化并稳定
+  一段时间（防抖）后重新加载，把变更的配置项推送给订阅者；校验失败时保留
+  原配置；
+- 保存时先写临时文件再原子替换，写到一半退出也不会留下损坏的配置文件。
+"""
 
 from __future__ import annotations
 
+import copy
+import os
+import re
+import tempfile
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 
 import yaml
+from loguru import logger
+
+from .goods import LIST_AUTO, LIST_PAGINATION, LIST_SCROLL, LIST_STATIC
+from .playlist import ORDER_SEQUENTIAL, ORDER_SHUFFLE, ORDER_WEIGHTED
 
 DEFAULT_CONFIG: Dict[str, Any] = {
     "app": {
@@ -14,22 +35,347 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "live_url": "https://live.jd.com/#/anchor/live-list",
     },
     "schedule": {
+        "enabled": False,
         "daily_start_time": "09:00",
+        "misfire_grace_seconds": 300,
+        "coalesce": True,
     },
+    "calendar": [],
     "hotkeys": {
         "start_live": "ctrl+alt+f5",
         "stop_live": "ctrl+alt+f6",
         "refresh": "ctrl+alt+r",
+        "skip_product": "ctrl+alt+n",
+        "replay_product": "ctrl+alt+b",
+        "pause_task": "ctrl+alt+p",
+        "extend_product": "ctrl+alt+e",
+    },
+    "task": {
+        "duration_seconds": 8,
+        "interval_seconds": 2,
+        "material_path": "",
+        "playlist_path": "",
+        "playlist_include_unlisted": True,
+        "continuous": False,
+        "continuous_order": "sequential",
+        "drift_compensation": True,
+        "drift_tolerance_seconds": 1.0,
+        "extend_seconds": 30,
+        "goods_list_mode": "auto",
+    },
+    "image": {
+        "fetch_workers": 4,
+        "timeout_seconds": 8,
+        "prefetch_depth": 2,
+        "normalize": {
+            "enabled": False,
+            "width": 800,
+            "height": 800,
+            "format": "jpeg",
+            "quality": 85,
+            "mode": "contain",
+        },
+    },
+    "monitor": {
+        "enabled": False,
+        "queue_size": 5000,
+        "url_keyword": "",
+        "text_fields": ["content", "msg", "text", "message", "comment"],
+        "user_fields": ["nickName", "nickname", "userName", "uname", "name"],
+        "keywords": ["多少钱", "链接", "怎么买", "优惠券", "发货", "退款", "质量"],
+        "alert_cooldown_seconds": 30,
+        "window_history": 200,
+        "demand": {
+            "enabled": True,
+            "threshold": 5,
+            "window_seconds": 30,
+            "cooldown_seconds": 120,
+            "min_dwell_seconds": 5,
+            "aliases": {},
+        },
+    },
+    "modal": {
+        "auto_confirm": True,
+        "confirm_texts": ["确定", "确认"],
+        "require_keywords": [],
+        "ignore_keywords": ["结束直播", "下播"],
+        "window_seconds": 15,
     },
+    "diagnostics": {
+        "level": "summary",
+    },
+}
+
+
+class ConfigError(Exception):
+    """配置文件格式或取值无效。"""
+
+
+def _port(value: Any) -> int:
+    port = int(value)
+    if not 1 <= port <= 65535:
+        raise ValueError("端口应在 1-65535 之间")
+    return port
+
+
+def _positive(value: Any) -> float:
+    number = float(value)
+    if number <= 0:
+        raise ValueError("必须大于 0")
+    return number
+
+
+def _non_negative(value: Any) -> float:
+    number = float(value)
+    if number < 0:
+        raise ValueError("不能为负数")
+    return number
+
+
+def _positive_int(value: Any) -> int:
+    number = int(value)
+    if number <= 0:
+        raise ValueError("必须为正整数")
+    return number
+
+
+def _non_negative_int(value: Any) -> int:
+    number = int(value)
+    if number < 0:
+        raise ValueError("不能为负数")
+    return number
+
+
+def _boolean(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "yes", "on", "1", "false", "no", "off", "0"):
+        return value.strip().lower() in ("true", "yes", "on", "1")
+    if isinstance(value, int):
+        return bool(value)
+    raise ValueError("应为 true 或 false")
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        raise ValueError("应为字符串")
+    return str(value)
+
+
+_CLOCK = re.compile(r"^([01]?\d|2[0-3]):[0-5]\d$")
+
+
+def _clock(value: Any) -> str:
+    text = _text(value).strip()
+    if text and not _CLOCK.match(text):
+        raise ValueError("时间格式应为 HH:MM")
+    return text
+
+
+def _text_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        raise ValueError("应为字符串列表")
+    return [str(item) for item in value if str(item).strip()]
+
+
+def _hotkeys(value: Any) -> Dict[str, str]:
+    if value is None:
+        return {}
+    if not isinstance(value, Mapping):
+        raise ValueError("应为 名称: 组合键 的映射")
+    mapping: Dict[str, str] = {}
+    used: Dict[str, str] = {}
+    for name, hotkey in value.items():
+        combo = str(hotkey or "").strip().lower()
+        if not combo:
+            continue
+        if combo in used:
+            raise ValueError(f"{name} 与 {used[combo]} 使用了相同的组合键 {combo}")
+        used[combo] = str(name)
+        mapping[str(name)] = combo
+    return mapping
+
+
+def _choice(*choices: str) -> Callable[[Any], str]:
+    def check(value: Any) -> str:
+        text = _text(value).strip()
+        if text not in choices:
+            raise ValueError(f"应为 {' / '.join(choices)} 之一")
+        return text
+
+    return check
+
+
+def _mapping(value: Any) -> Dict[str, Any]:
+    if value is None:
+        return {}
+    if not isinstance(value, Mapping):
+        raise ValueError("应为映射")
+    return dict(value)
+
+
+def _calendar(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError("应为时段列表")
+    return value
+
+
+# 配置项的校验与规范化规则（点号路径 -> 校验函数），未列出的配置项原样保留，
+# 配置中缺失的项由各模块使用默认值
+SCHEMA: Dict[str, Callable[[Any], Any]] = {
+    "app.default_port": _port,
+    "app.live_url": _text,
+    "schedule.enabled": _boolean,
+    "schedule.daily_start_time": _clock,
+    "schedule.misfire_grace_seconds": _non_negative_int,
+    "schedule.coalesce": _boolean,
+    "calendar": _calendar,
+    "hotkeys": _hotkeys,
+    "task.duration_seconds": _positive,
+    "task.interval_seconds": _non_negative,
+    "task.material_path": _text,
+    "task.playlist_path": _text,
+    "task.playlist_include_unlisted": _boolean,
+    "task.continuous": _boolean,
+    "task.continuous_order": _choice(ORDER_SEQUENTIAL, ORDER_SHUFFLE, ORDER_WEIGHTED),
+    "task.drift_compensation": _boolean,
+    "task.drift_tolerance_seconds": _non_negative,
+    "task.extend_seconds": _positive,
+    "task.goods_list_mode": _choice(LIST_AUTO, LIST_STATIC, LIST_PAGINATION, LIST_SCROLL),
+    "image.fetch_workers": _positive_int,
+    "image.timeout_seconds": _positive,
+    "image.prefetch_depth": _non_negative_int,
+    "monitor.enabled": _boolean,
+    "monitor.queue_size": _positive_int,
+    "monitor.url_keyword": _text,
+    "monitor.text_fields": _text_list,
+    "monitor.user_fields": _text_list,
+    "monitor.keywords": _text_list,
+    "monitor.alert_cooldown_seconds": _non_negative,
+    "monitor.window_history": _positive_int,
+    "monitor.demand.enabled": _boolean,
+    "monitor.demand.threshold": _positive_int,
+    "monitor.demand.window_seconds": _positive,
+    "monitor.demand.cooldown_seconds": _non_negative,
+    "monitor.demand.min_dwell_seconds": _non_negative,
+    "monitor.demand.aliases": _mapping,
+    "modal.auto_confirm": _boolean,
+    "modal.confirm_texts": _text_list,
+    "modal.require_keywords": _text_list,
+    "modal.ignore_keywords": _text_list,
+    "modal.window_seconds": _positive,
 }
 
 
+def validate_config(raw: Any) -> Dict[str, Any]:
+    """按 :data:`SCHEMA` 校验配置，返回规范化后的副本。
+
+    Raises:
+        ConfigError: 存在无效的配置项，异常信息列出全部问题
+    """
+
+    if raw is None:
+        raw = {}
+    if not isinstance(raw, Mapping):
+        raise ConfigError("配置文件顶层应为映射")
+    config = _with_defaults(DEFAULT_CONFIG, copy.deepcopy(dict(raw)))
+    errors: List[str] = []
+    for path, check in SCHEMA.items():
+        *parents, key = path.split(".")
+        section: Any = config
+        for name in parents:
+            section = section.get(name) if isinstance(section, dict) else None
+            if section is None:
+                break
+        if not isinstance(section, dict):
+            if section is not None:
+                errors.append(f"{'.'.join(parents)}: 应为映射")
+            continue
+        if key not in section:
+            continue
+        try:
+            section[key] = check(section[key])
+        except (TypeError, ValueError) as exc:
+            errors.append(f"{path}: {exc}（当前值 {section[key]!r}）")
+    if errors:
+        raise ConfigError("配置无效：\n" + "\n".join(dict.fromkeys(errors)))
+    return config
+
+
+def _with_defaults(defaults: Mapping[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    """补齐缺少的配置项（包括值为空的配置节），已有的值保持不变。"""
+
+    for key, default in defaults.items():
+        if isinstance(default, Mapping):
+            if config.get(key) is None:
+                config[key] = copy.deepcopy(dict(default))
+            elif isinstance(config[key], dict):
+                _with_defaults(default, config[key])
+        elif key not in config:
+            config[key] = copy.deepcopy(default)
+    return config
+
+
+def freeze(value: Any) -> Any:
+    """将配置转换为只读结构：映射转为 ``MappingProxyType``，列表转为元组。"""
+
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def diff_config(old: Mapping[str, Any], new: Mapping[str, Any], prefix: str = "") -> Dict[str, Tuple[Any, Any]]:
+    """比较两份配置，返回变化的配置项（点号路径 -> (旧值, 新值)），列表整体比较。"""
+
+    changes: Dict[str, Tuple[Any, Any]] = {}
+    for key in list(old.keys()) + [key for key in new.keys() if key not in old]:
+        path = f"{prefix}{key}"
+        before, after = old.get(key), new.get(key)
+        if isinstance(before, Mapping) and isinstance(after, Mapping):
+            changes.update(diff_config(before, after, f"{path}."))
+        elif before != after:
+            changes[path] = (before, after)
+    return changes
+
+
+@dataclass(frozen=True)
+class ConfigChange:
+    """一次配置重新加载的结果。"""
+
+    changes: Mapping[str, Tuple[Any, Any]]
+    snapshot: Mapping[str, Any]
+
+    def touched(self, *prefixes: str) -> bool:
+        """是否有配置项位于任一前缀（如 ``"hotkeys"``、``"task.duration_seconds"``）之下。"""
+
+        return any(path == prefix or path.startswith(f"{prefix}.") for path in self.changes for prefix in prefixes)
+
+
+ConfigListener = Callable[[ConfigChange], None]
+
+
 @dataclass
 class ConfigManager:
     """配置文件管理器。"""
 
     path: Path
     _config: Dict[str, Any] = field(default_factory=dict, init=False)
+    _snapshot: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}), init=False)
+    _signature: Optional[Tuple[int, int]] = field(default=None, init=False)
+    _listeners: List[Tuple[Tuple[str, ...], ConfigListener]] = field(default_factory=list, init=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False)
+    _watcher: Optional[threading.Thread] = field(default=None, init=False)
+    _watch_stop: threading.Event = field(default_factory=threading.Event, init=False)
 
     def ensure_exists(self) -> None:
         """确保配置文件存在，不存在时写入默认内容。"""
@@ -39,26 +385,154 @@ class ConfigManager:
             self.save(DEFAULT_CONFIG)
 
     def load(self) -> Dict[str, Any]:
-        """读取配置文件。"""
+        """读取并校验配置文件。
+
+        Raises:
+            ConfigError: 配置文件无法解析或校验失败
+        """
 
         self.ensure_exists()
-        with self.path.open("r", encoding="utf-8") as fh:
-            self._config = yaml.safe_load(fh) or {}
+        with self._lock:
+            signature = self._stat()
+            config = self._read()
+            self._install(config, signature)
         return self._config
 
     def save(self, config: Dict[str, Any]) -> None:
-        """保存配置。"""
+        """校验并原子地保存配置。"""
 
+        validated = validate_config(config)
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        with self.path.open("w", encoding="utf-8") as fh:
-            yaml.safe_dump(config, fh, allow_unicode=True, sort_keys=False)
-        self._config = config
+        with self._lock:
+            fd, tmp_name = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp", dir=str(self.path.parent))
+            try:
+                if self.path.exists():
+                    os.chmod(tmp_name, self.path.stat().st_mode & 0o777)
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    yaml.safe_dump(validated, fh, allow_unicode=True, sort_keys=False)
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                os.replace(tmp_name, self.path)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+            # 同时记录文件状态，避免监视线程把本次保存当作外部修改
+            self._install(validated, self._stat())
 
     @property
     def data(self) -> Dict[str, Any]:
-        """返回当前配置数据。"""
+        """返回当前配置数据（内部使用的字典，读取请使用 :attr:`snapshot`）。"""
 
         if not self._config:
             return self.load()
         return self._config
 
+    @property
+    def snapshot(self) -> Mapping[str, Any]:
+        """返回当前配置的只读快照。"""
+
+        if not self._config:
+            self.load()
+        return self._snapshot
+
+    def editable(self) -> Dict[str, Any]:
+        """返回当前配置的可修改副本，修改后通过 :meth:`save` 保存。"""
+
+        return copy.deepcopy(self.data)
+
+    # 变更通知 ----------------------------------------------------------------
+    def subscribe(self, listener: ConfigListener, prefixes: Sequence[str] = ()) -> None:
+        """订阅配置变更，``prefixes`` 非空时只在这些配置项变化时通知。
+
+        回调在监视线程中执行，涉及界面的操作需自行切回界面线程。
+        """
+
+        self._listeners.append((tuple(prefixes), listener))
+
+    def reload(self) -> Optional[ConfigChange]:
+        """重新读取配置文件，有变化时通知订阅者并返回变更；校验失败时保留原配置。"""
+
+        with self._lock:
+            signature = self._stat()
+            try:
+                config = self._read()
+            except ConfigError as exc:
+                # 记录文件状态，文件未再次修改前不重复报错
+                self._signature = signature
+                logger.warning("配置文件已修改但未生效：{}", exc)
+                return None
+            # 与上次加载/保存的只读快照比较，不受运行中对配置字典的修改影响
+            changes = diff_config(self._snapshot, freeze(config))
+            self._install(config, signature)
+        if not changes:
+            return None
+        change = ConfigChange(changes=MappingProxyType(changes), snapshot=self._snapshot)
+        logger.info("配置文件已重新加载，变更项：{}", ", ".join(changes))
+        for prefixes, listener in list(self._listeners):
+            if prefixes and not change.touched(*prefixes):
+                continue
+            try:
+                listener(change)
+            except Exception:  # noqa: BLE001
+                logger.exception("处理配置变更失败")
+        return change
+
+    def watch(self, interval: float = 1.0, debounce: float = 0.5) -> None:
+        """启动后台线程监视配置文件，文件状态稳定 ``debounce`` 秒后重新加载。"""
+
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._watch_stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch_loop,
+            args=(interval, debounce),
+            name="config-watcher",
+            daemon=True,
+        )
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._watch_stop.set()
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None and watcher is not threading.current_thread():
+            watcher.join(timeout=2)
+
+    def _watch_loop(self, interval: float, debounce: float) -> None:
+        while not self._watch_stop.wait(interval):
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                continue
+            # 防抖：编辑器保存时可能分多次写入，等文件状态不再变化后再读取
+            while not self._watch_stop.wait(debounce):
+                latest = self._stat()
+                if latest == signature:
+                    break
+                signature = latest
+            else:
+                return
+            if signature is not None and signature != self._signature:
+                try:
+                    self.reload()
+                except Exception:  # noqa: BLE001
+                    logger.exception("重新加载配置文件失败")
+
+    # 内部实现 ----------------------------------------------------------------
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with self.path.open("r", encoding="utf-8") as fh:
+                raw = yaml.safe_load(fh)
+        except yaml.YAMLError as exc:
+            raise ConfigError(f"配置文件解析失败：{exc}") from exc
+        return validate_config(raw)
+
+    def _install(self, config: Dict[str, Any], signature: Optional[Tuple[int, int]]) -> None:
+        self._config = config
+        self._snapshot = freeze(config)
+        self._signature = signature
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,276 @@
+"""讲解任务控制模块，在任务线程与界面/热键之间传递实时控制命令。
+
+替代原先单一的停止事件，支持：
+
+- ``stop``：停止任务；
+- ``skip``：结束当前商品，进入下一个；
+- ``replay``：重新讲解上一个商品；
+- ``pause`` / ``resume``：暂停/继续计时（暂停期间讲解与间隔都不计时）；
+- ``extend``：为当前商品追加讲解时间；
+- ``update_settings``：运行中修改讲解时长、间隔等参数（配置文件热加载）。
+
+命令通过条件变量通知，任务线程的每个等待点都会在 ~100ms 内响应，
+无需等到当前讲解时间结束。
+
+``TaskControl`` 同时是任务的取消令牌：页面等待、点击与图片下载等阻塞调用
+通过 :meth:`TaskControl.sliced` / :meth:`TaskControl.result` 拆成不超过
+``CANCEL_SLICE`` 秒的时间片，停止后在下一个时间片抛出 :class:`TaskCancelled`。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, Type, TypeVar, Union
+
+from loguru import logger
+
+COMMAND_SKIP = "skip"
+COMMAND_REPLAY = "replay"
+COMMAND_EXTEND = "extend"
+
+REASON_DONE = "done"
+REASON_STOP = "stop"
+REASON_SKIP = COMMAND_SKIP
+REASON_REPLAY = COMMAND_REPLAY
+REASON_INTERRUPT = "interrupt"
+
+POLL_INTERVAL = 0.1
+# 可取消的阻塞调用每个时间片的最长秒数，停止命令在该时间内生效
+CANCEL_SLICE = 0.25
+
+T = TypeVar("T")
+
+
+class TaskCancelled(BaseException):
+    """任务已被停止。
+
+    与 ``KeyboardInterrupt`` 一样继承 ``BaseException``，任务线程中各处
+    ``except Exception`` 的容错代码不会把停止当作普通失败处理后继续执行。
+    """
+
+
+@dataclass(frozen=True)
+class WaitOutcome:
+    """一次等待的结束原因。"""
+
+    reason: str
+    extended: float = 0.0
+    paused: float = 0.0
+
+    @property
+    def stopped(self) -> bool:
+        return self.reason == REASON_STOP
+
+    @property
+    def early(self) -> bool:
+        """是否偏离了计划时间（跳过、重播、插播、暂停或追加了时间）。"""
+
+        return self.reason != REASON_DONE or self.extended > 0 or self.paused > 0
+
+    @property
+    def cut_short(self) -> bool:
+        """是否被跳过、重播或插播提前结束；暂停与追加时间只推迟截止时间。"""
+
+        return self.reason in (REASON_SKIP, REASON_REPLAY, REASON_INTERRUPT)
+
+
+class TaskControl:
+    """讲解任务的控制通道，线程安全。"""
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._paused = False
+        self._commands: Deque[Tuple[str, float]] = deque()
+        self._settings: Dict[str, Any] = {}
+
+    # 控制端（界面、热键、定时任务） ------------------------------------------
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def skip(self) -> None:
+        self._push(COMMAND_SKIP)
+
+    def replay(self) -> None:
+        self._push(COMMAND_REPLAY)
+
+    def extend(self, seconds: float) -> None:
+        if seconds > 0:
+            self._push(COMMAND_EXTEND, seconds)
+
+    def pause(self) -> None:
+        with self._cond:
+            self._paused = True
+            self._cond.notify_all()
+
+    def resume(self) -> None:
+        with self._cond:
+            self._paused = False
+            self._cond.notify_all()
+
+    def toggle_pause(self) -> bool:
+        """切换暂停状态，返回切换后是否处于暂停。"""
+
+        with self._cond:
+            self._paused = not self._paused
+            self._cond.notify_all()
+            return self._paused
+
+    def update_settings(self, **settings: Any) -> None:
+        """提交新的任务参数，任务线程在处理下一个商品前读取。"""
+
+        with self._cond:
+            self._settings.update(settings)
+
+    def reset(self) -> None:
+        """新任务开始前清除停止、暂停状态与未处理的命令。"""
+
+        with self._cond:
+            self._stopped = False
+            self._paused = False
+            self._commands.clear()
+            self._settings.clear()
+
+    def _push(self, command: str, value: float = 0.0) -> None:
+        with self._cond:
+            self._commands.append((command, value))
+            self._cond.notify_all()
+
+    # 任务线程 ----------------------------------------------------------------
+    def is_stopped(self) -> bool:
+        return self._stopped
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def take_settings(self) -> Dict[str, Any]:
+        """取出尚未应用的任务参数。"""
+
+        with self._cond:
+            settings, self._settings = self._settings, {}
+        return settings
+
+    def sleep(self, seconds: float) -> bool:
+        """普通等待，只响应停止命令；返回 True 表示任务被停止。"""
+
+        with self._cond:
+            return self._cond.wait_for(lambda: self._stopped, timeout=max(seconds, 0.0))
+
+    def check(self) -> None:
+        """任务已被停止时抛出 :class:`TaskCancelled`。"""
+
+        if self._stopped:
+            raise TaskCancelled()
+
+    def delay(self, seconds: float) -> None:
+        """可取消的等待，任务停止时立即抛出 :class:`TaskCancelled`。"""
+
+        if self.sleep(seconds):
+            raise TaskCancelled()
+
+    def sliced(
+        self,
+        call: Callable[[float], T],
+        timeout: float,
+        retry_on: Union[Type[BaseException], Tuple[Type[BaseException], ...]],
+        step: float = CANCEL_SLICE,
+    ) -> T:
+        """把一次最长 ``timeout`` 秒的阻塞调用拆成若干次短调用，每次之间检查停止。
+
+        Args:
+            call: 以本次可用秒数为参数的阻塞调用（如 Playwright 的等待），超时抛出 ``retry_on``
+            timeout: 总超时秒数，用完后把最后一次的超时异常抛给调用方（最多超出一个时间片）
+            retry_on: 表示“本时间片内未完成”的异常类型
+            step: 每个时间片的秒数
+
+        ``call`` 会被重复调用，只能用于可重复的等待，不能用于点击等有副作用的操作。
+        """
+
+        deadline = time.monotonic() + max(timeout, 0.0)
+        while True:
+            self.check()
+            try:
+                return call(step)
+            except retry_on:
+                if time.monotonic() >= deadline:
+                    raise
+
+    def result(self, future: "Future[T]", timeout: Optional[float] = None) -> T:
+        """等待后台任务结果，期间响应停止；停止时放弃结果并抛出 :class:`TaskCancelled`。"""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._stopped:
+                future.cancel()
+                raise TaskCancelled()
+            wait = CANCEL_SLICE if deadline is None else min(CANCEL_SLICE, deadline - time.monotonic())
+            try:
+                return future.result(timeout=max(wait, 0.0))
+            except FutureTimeoutError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+
+    def wait(
+        self,
+        seconds: float,
+        extendable: bool = True,
+        interrupt: Optional[Callable[[float], bool]] = None,
+    ) -> WaitOutcome:
+        """讲解/间隔等待，响应全部控制命令。
+
+        Args:
+            seconds: 计划等待的秒数，暂停期间不计时
+            extendable: 是否接受追加时间（仅讲解等待接受，间隔等待中保留到下次讲解）
+            interrupt: 每个轮询周期调用一次，参数为已计时的秒数，返回真时提前结束
+        """
+
+        started = time.monotonic()
+        deadline = started + max(seconds, 0.0)
+        paused_total = 0.0
+        extended = 0.0
+        with self._cond:
+            while True:
+                if self._stopped:
+                    return WaitOutcome(REASON_STOP, extended, paused_total)
+                reason = self._take_command(extendable)
+                if isinstance(reason, float):
+                    deadline += reason
+                    extended += reason
+                    continue
+                if reason is not None:
+                    return WaitOutcome(reason, extended, paused_total)
+
+                now = time.monotonic()
+                if self._paused:
+                    self._cond.wait(POLL_INTERVAL)
+                    pause = time.monotonic() - now
+                    deadline += pause
+                    paused_total += pause
+                    continue
+                remaining = deadline - now
+                if remaining <= 0:
+                    return WaitOutcome(REASON_DONE, extended, paused_total)
+                if interrupt is not None and interrupt(now - started - paused_total):
+                    return WaitOutcome(REASON_INTERRUPT, extended, paused_total)
+                self._cond.wait(min(remaining, POLL_INTERVAL))
+
+    def _take_command(self, extendable: bool) -> Optional[object]:
+        """取出一条可在当前等待中处理的命令：追加时间返回秒数，跳过/重播返回原因。"""
+
+        for position, (command, value) in enumerate(self._commands):
+            if command == COMMAND_EXTEND and not extendable:
+                continue
+            del self._commands[position]
+            if command == COMMAND_EXTEND:
+                logger.debug("处理追加讲解命令：{} 秒", value)
+                return float(value)
+            return command
+        return None
@@ -0,0 +1,189 @@
+"""评论需求检测模块，根据评论热度调整讲解顺序。
+
+评论中提到商品编号（"3号"、"#3"、"3号链接"）或商品标题片段时记为一次提及。
+同一商品在 ``window_seconds`` 内被不同观众提及达到 ``threshold`` 次后，
+检测器发出插播需求；任务线程在讲解/间隔等待中轮询该需求，将对应 SKU
+移到讲解队列队首。
+
+检测运行在评论分发线程上，任务线程只读取待处理的需求，二者通过锁与
+事件交互，从评论到达到切换商品只有一个轮询周期的延迟。
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Iterable, Mapping, Optional, Set, Tuple
+
+from loguru import logger
+
+from .keywords import KeywordAutomaton, normalize_text
+from .monitor import Comment
+
+# "3号"、"3号链接"、"#3"、"3#"；嵌在长数字串（SKU、价格等）中的数字不算
+INDEX_PATTERN = re.compile(r"(?<!\d)(?:#\s*(\d{1,3})|(\d{1,3})\s*(?:号|#))(?!\d)")
+# 标题按空白与常见标点切分为片段，过短的片段（如"手机"）容易误判
+TITLE_SPLIT = re.compile(r"[\s,，、/|｜()（）\[\]【】+]+")
+MIN_FRAGMENT_LENGTH = 3
+
+
+def _index_key(value: Any) -> Optional[int]:
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+class DemandDetector:
+    """按滑动窗口统计商品提及次数，超过阈值时产生插播需求。"""
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        window_seconds: float = 30.0,
+        cooldown_seconds: float = 120.0,
+        aliases: Optional[Mapping[str, Iterable[str]]] = None,
+    ) -> None:
+        """
+        初始化需求检测器。
+
+        Args:
+            threshold: 窗口内触发插播所需的提及次数（同一观众只计一次）
+            window_seconds: 滑动窗口长度（秒）
+            cooldown_seconds: 同一商品两次插播之间的最短间隔（秒）
+            aliases: 额外的商品别名，SKU -> 别名列表
+        """
+        self.threshold = max(int(threshold), 1)
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.aliases = {str(sku): list(names) for sku, names in (aliases or {}).items()}
+        self._lock = threading.Lock()
+        self._pending_event = threading.Event()
+        self._by_index: Dict[int, str] = {}
+        self._fragments = KeywordAutomaton()
+        self._fragment_owner: Dict[str, str] = {}
+        self._catalog_signature: Tuple[Tuple[str, str, str], ...] = ()
+        self._mentions: Dict[str, Deque[Tuple[float, str]]] = {}
+        self._last_triggered: Dict[str, float] = {}
+        self._pending: Counter = Counter()
+        self.triggered = 0
+
+    def configure(
+        self,
+        threshold: int,
+        window_seconds: float,
+        cooldown_seconds: float,
+        aliases: Optional[Mapping[str, Iterable[str]]] = None,
+    ) -> None:
+        """运行中更新检测参数，别名变化时下次 :meth:`set_catalog` 重新建立索引。"""
+
+        with self._lock:
+            self.threshold = max(int(threshold), 1)
+            self.window_seconds = window_seconds
+            self.cooldown_seconds = cooldown_seconds
+            aliases = {str(sku): list(names) for sku, names in (aliases or {}).items()}
+            if aliases != self.aliases:
+                self.aliases = aliases
+                self._catalog_signature = ()
+
+    # 商品目录 ----------------------------------------------------------------
+    def set_catalog(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """根据商品快照更新编号与标题片段索引，快照未变化时直接返回。"""
+
+        catalog = tuple(
+            (str(row.get("sku")), str(row.get("itemIndex") or ""), str(row.get("title") or ""))
+            for row in rows
+            if row.get("sku")
+        )
+        if catalog == self._catalog_signature:
+            return
+
+        by_index: Dict[int, str] = {}
+        owners: Dict[str, Set[str]] = {}
+        for sku, item_index, title in catalog:
+            key = _index_key(item_index)
+            if key is not None:
+                by_index.setdefault(key, sku)
+            fragments = TITLE_SPLIT.split(normalize_text(title)) + [
+                normalize_text(alias) for alias in self.aliases.get(sku, [])
+            ]
+            for fragment in fragments:
+                if len(fragment) >= MIN_FRAGMENT_LENGTH:
+                    owners.setdefault(fragment, set()).add(sku)
+
+        # 多个商品共有的片段（品牌名等）无法区分商品，丢弃
+        fragment_owner = {fragment: next(iter(skus)) for fragment, skus in owners.items() if len(skus) == 1}
+        with self._lock:
+            self._catalog_signature = catalog
+            self._by_index = by_index
+            self._fragments = KeywordAutomaton(fragment_owner)
+            self._fragment_owner = fragment_owner
+        logger.debug("需求检测商品目录已更新：编号 {} 个，标题片段 {} 个", len(by_index), len(fragment_owner))
+
+    # 评论监听 ----------------------------------------------------------------
+    def process(self, comment: Comment) -> None:
+        """评论监听入口：识别评论提及的商品并更新滑动窗口。"""
+
+        text = normalize_text(comment.text)
+        now = time.monotonic()
+        user = comment.user_id or comment.user or f"anonymous-{now}"
+        with self._lock:
+            skus: Set[str] = set()
+            for match in INDEX_PATTERN.finditer(text):
+                sku = self._by_index.get(int(match.group(1) or match.group(2)))
+                if sku:
+                    skus.add(sku)
+            for fragment in self._fragments.search(text):
+                skus.add(self._fragment_owner[fragment])
+            for sku in skus:
+                self._record(sku, user, now)
+
+    def _record(self, sku: str, user: str, now: float) -> None:
+        mentions = self._mentions.setdefault(sku, deque())
+        while mentions and now - mentions[0][0] > self.window_seconds:
+            mentions.popleft()
+        if any(existing == user for _, existing in mentions):
+            return
+        mentions.append((now, user))
+        if len(mentions) < self.threshold:
+            return
+        last = self._last_triggered.get(sku)
+        if last is not None and now - last < self.cooldown_seconds:
+            return
+        self._last_triggered[sku] = now
+        self._pending[sku] = len(mentions)
+        mentions.clear()
+        self.triggered += 1
+        self._pending_event.set()
+        logger.info("评论需求触发：SKU {} 在 {} 秒内被提及 {} 次", sku, self.window_seconds, self._pending[sku])
+
+    # 任务线程接口 ------------------------------------------------------------
+    def has_pending(self, exclude: Optional[str] = None) -> bool:
+        """是否有待处理的插播需求（可排除当前正在讲解的 SKU）。"""
+
+        if not self._pending_event.is_set():
+            return False
+        with self._lock:
+            return any(sku != exclude for sku in self._pending)
+
+    def poll(self, exclude: Optional[str] = None) -> Optional[str]:
+        """取出提及次数最多的插播需求，没有时返回 None。"""
+
+        with self._lock:
+            self._pending.pop(exclude, None)
+            if not self._pending:
+                self._pending_event.clear()
+                return None
+            sku, _ = self._pending.most_common(1)[0]
+            del self._pending[sku]
+            if not self._pending:
+                self._pending_event.clear()
+            return sku
+
+    def reset(self) -> None:
+        with self._lock:
+            self._mentions.clear()
+            self._pending.clear()
+            self._pending_event.clear()
@@ -0,0 +1,295 @@
+"""页面诊断模块，按级别输出商品列表页面的结构信息。
+
+诊断不再运行在任务启动的主路径上：只有在查找商品列表失败后才会执行，
+且执行的深度由 ``diagnostics.level`` 控制：
+
+- ``off``：不做任何诊断；
+- ``summary``：仅执行一次轻量统计（表格行、商品容器、加载状态等）；
+- ``full``：执行完整探测（全量元素统计、frames 信息、调试文件导出）。
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+LEVEL_OFF = "off"
+LEVEL_SUMMARY = "summary"
+LEVEL_FULL = "full"
+LEVELS = (LEVEL_OFF, LEVEL_SUMMARY, LEVEL_FULL)
+
+SUMMARY_SCRIPT = """
+() => {
+    const loading = document.querySelector('.ant-spin-spinning, .page-loading-warp');
+    return {
+        url: window.location.href,
+        title: document.title,
+        readyState: document.readyState,
+        hasLoading: !!loading,
+        iframeCount: document.getElementsByTagName('iframe').length,
+        tableRowCount: document.querySelectorAll('tr.ant-table-row').length,
+        skuContainerCount: document.querySelectorAll('div.antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-skuContainer').length,
+        oldWrapperCount: document.querySelectorAll('div.antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-wrapper').length,
+        bodyHtmlLength: document.body ? document.body.innerHTML.length : 0
+    };
+}
+"""
+
+FULL_SCRIPT = """
+() => {
+    const readyState = document.readyState;
+    const hasBody = !!document.body;
+    const loadingElements = document.querySelectorAll('.ant-spin-spinning, .page-loading-warp, [class*="loading"], [class*="spin"]');
+    const allTrs = document.querySelectorAll('tr');
+    const trsWithAntTableRow = Array.from(allTrs).filter(tr => {
+        const className = tr.className || '';
+        return typeof className === 'string' && className.includes('ant-table-row');
+    });
+    const goodsElements = document.querySelectorAll('[class*="goods"], [class*="sku"], [class*="item"]');
+    const explainButtons = Array.from(document.querySelectorAll('button, a, span, div')).filter(el => {
+        const text = (el.textContent || '').trim();
+        return text === '讲解' || text.includes('讲解');
+    });
+
+    // 查找包含"讲解"按钮的父容器
+    const goodsContainers = new Set();
+    const explainButtonDetails = [];
+    explainButtons.forEach((btn, idx) => {
+        explainButtonDetails.push({
+            index: idx,
+            tag: btn.tagName || '',
+            class: (btn.className || '').toString().substring(0, 100),
+            text: (btn.textContent || '').trim().substring(0, 50)
+        });
+        let parent = btn.parentElement;
+        let depth = 0;
+        while (parent && depth < 10) {
+            const className = parent.className;
+            if (typeof className === 'string' && className.trim()) {
+                goodsContainers.add(className.split(' ')[0]);
+            } else if (parent.tagName === 'TR') {
+                goodsContainers.add('TR');
+            }
+            parent = parent.parentElement;
+            depth++;
+        }
+    });
+
+    const reactRoots = document.querySelectorAll('[id*="root"], [id*="app"], [class*="root"], [class*="app"]');
+    const bodyHtmlLength = hasBody ? document.body.innerHTML.length : 0;
+
+    return {
+        url: window.location.href,
+        title: document.title,
+        readyState: readyState,
+        hasBody: hasBody,
+        bodyChildren: hasBody ? document.body.children.length : 0,
+        bodyHtmlLength: bodyHtmlLength,
+        hasContent: bodyHtmlLength > 100,
+        hasLoading: loadingElements.length > 0,
+        loadingCount: loadingElements.length,
+        iframeCount: document.querySelectorAll('iframe').length,
+        tableCount: document.querySelectorAll('table').length,
+        antTableCount: document.querySelectorAll('table.ant-table, .ant-table').length,
+        tbodyCount: document.querySelectorAll('tbody').length,
+        hasTbody: !!document.querySelector('tbody.ant-table-tbody'),
+        allTrCount: allTrs.length,
+        trsWithAntTableRowCount: trsWithAntTableRow.length,
+        tableRowCount: document.querySelectorAll('tr.ant-table-row').length,
+        skuContainerCount: document.querySelectorAll('div.antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-skuContainer').length,
+        oldWrapperCount: document.querySelectorAll('div.antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-wrapper').length,
+        goodsCount: goodsElements.length,
+        explainButtonCount: explainButtons.length,
+        explainButtonDetails: explainButtonDetails.slice(0, 5),
+        reactRootCount: reactRoots.length,
+        containerClasses: Array.from(goodsContainers).slice(0, 10),
+        firstTrClass: allTrs.length > 0 ? (allTrs[0].className || '') : '',
+        firstTrHtml: allTrs.length > 0 ? (allTrs[0].outerHTML || '').substring(0, 200) : ''
+    };
+}
+"""
+
+CLASS_NAMES_SCRIPT = """
+() => {
+    const classNames = new Set();
+    document.querySelectorAll('div[class]').forEach(div => {
+        if (div.className && typeof div.className === 'string') {
+            classNames.add(div.className);
+        }
+    });
+    return Array.from(classNames).slice(0, 50);
+}
+"""
+
+
+def normalize_level(level: Any) -> str:
+    """将配置中的诊断级别规范化，未知取值回退为 summary。"""
+
+    value = str(level or "").strip().lower()
+    if value in LEVELS:
+        return value
+    if value:
+        logger.warning("未知的诊断级别 {}，使用 summary", level)
+    return LEVEL_SUMMARY
+
+
+class PageDiagnostics:
+    """商品列表页面诊断器。
+
+    页面探测必须在持有 Playwright 对象的线程上执行，日志整理与调试文件写入
+    则放到后台线程完成，避免拖慢任务线程。
+    """
+
+    def __init__(self, level: str = LEVEL_SUMMARY, log: Optional[Callable[[str], None]] = None) -> None:
+        self.level = normalize_level(level)
+        self._log = log or (lambda message: logger.info(message))
+
+    @property
+    def enabled(self) -> bool:
+        return self.level != LEVEL_OFF
+
+    def report_failure(self, page: Any, debug_dir: Optional[Path] = None) -> None:
+        """在商品列表定位失败后执行诊断。"""
+
+        if not self.enabled:
+            return
+        try:
+            if self.level == LEVEL_FULL:
+                self._run_full(page, debug_dir)
+            else:
+                self._run_summary(page)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("页面诊断失败: {}", exc)
+            self._log(f"页面诊断失败：{exc}")
+
+    # ------------------------------------------------------------------
+    def _run_summary(self, page: Any) -> None:
+        info: Dict[str, Any] = page.evaluate(SUMMARY_SCRIPT) or {}
+        self._log(
+            "页面诊断：readyState={readyState}, 表格行={tableRowCount}, 商品容器={skuContainerCount}, "
+            "旧容器={oldWrapperCount}, iframe={iframeCount}, 加载中={hasLoading}".format(
+                readyState=info.get("readyState", "未知"),
+                tableRowCount=info.get("tableRowCount", 0),
+                skuContainerCount=info.get("skuContainerCount", 0),
+                oldWrapperCount=info.get("oldWrapperCount", 0),
+                iframeCount=info.get("iframeCount", 0),
+                hasLoading=info.get("hasLoading", False),
+            )
+        )
+        self._log_advice(info)
+        logger.info("页面状态诊断(summary) -> {}", info)
+
+    def _run_full(self, page: Any, debug_dir: Optional[Path]) -> None:
+        info: Dict[str, Any] = page.evaluate(FULL_SCRIPT) or {}
+        frames = self._collect_frames(page)
+        snippet: Optional[str] = None
+        class_names: List[str] = []
+        if debug_dir is not None:
+            snippet = page.inner_html("body")
+            class_names = page.evaluate(CLASS_NAMES_SCRIPT) or []
+
+        # 页面数据已取回，其余整理与落盘工作交给后台线程
+        threading.Thread(
+            target=self._emit_full,
+            args=(info, frames, snippet, class_names, debug_dir),
+            name="page-diagnostics",
+            daemon=True,
+        ).start()
+
+    def _collect_frames(self, page: Any) -> List[Dict[str, Any]]:
+        frames: List[Dict[str, Any]] = []
+        for frame in page.frames[:10]:
+            try:
+                frames.append(
+                    {
+                        "url": frame.url,
+                        "name": frame.name or "",
+                        "is_main": frame == page.main_frame,
+                        "table_row_count": len(frame.query_selector_all("tr.ant-table-row")),
+                    }
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.debug("检查frame失败: {}", exc)
+        return frames
+
+    def _emit_full(
+        self,
+        info: Dict[str, Any],
+        frames: List[Dict[str, Any]],
+        snippet: Optional[str],
+        class_names: List[str],
+        debug_dir: Optional[Path],
+    ) -> None:
+        self._log("页面状态：")
+        labels = [
+            ("url", "当前URL"),
+            ("title", "页面标题"),
+            ("readyState", "页面readyState"),
+            ("bodyChildren", "body子元素数量"),
+            ("bodyHtmlLength", "body HTML长度"),
+            ("reactRootCount", "React根元素数量"),
+            ("iframeCount", "iframe数量"),
+            ("loadingCount", "加载元素数量"),
+            ("tableCount", "表格数量"),
+            ("antTableCount", "Ant Design表格数量"),
+            ("tbodyCount", "tbody数量"),
+            ("allTrCount", "所有tr元素数量"),
+            ("trsWithAntTableRowCount", "包含'ant-table-row'类的tr数量"),
+            ("tableRowCount", "表格行数量 (tr.ant-table-row)"),
+            ("skuContainerCount", "商品容器数量 (skuContainer)"),
+            ("oldWrapperCount", "旧容器数量 (wrapper)"),
+            ("goodsCount", "商品相关元素数量"),
+            ("explainButtonCount", "'讲解'按钮数量"),
+        ]
+        for key, label in labels:
+            self._log(f"  - {label}: {info.get(key, '未知')}")
+
+        for detail in info.get("explainButtonDetails", []):
+            self._log(
+                f"    按钮{detail.get('index', 0) + 1}: 标签={detail.get('tag', '')}, "
+                f"类名={detail.get('class', '')[:50]}, 文本={detail.get('text', '')}"
+            )
+        container_classes = info.get("containerClasses", [])
+        if container_classes:
+            self._log(f"  - 检测到的商品容器类名: {', '.join(container_classes[:5])}")
+        if info.get("firstTrClass"):
+            self._log(f"  - 第一个tr的类名: {info.get('firstTrClass')}")
+
+        self._log(f"页面框架信息：共 {len(frames)} 个")
+        for idx, frame in enumerate(frames[:5]):
+            frame_type = "主框架" if frame.get("is_main") else "子框架"
+            self._log(
+                f"  - 框架{idx + 1} ({frame_type}): {str(frame.get('url', '未知'))[:100]}，"
+                f"表格行数量={frame.get('table_row_count', 0)}"
+            )
+
+        self._log_advice(info)
+        logger.info("页面状态诊断(full) -> {}", info)
+
+        if debug_dir is None:
+            return
+        try:
+            debug_dir.mkdir(parents=True, exist_ok=True)
+            if snippet:
+                snippet_path = debug_dir / "debug-snippet.html"
+                snippet_path.write_text(snippet, encoding="utf-8")
+                self._log(f"已将页面内容写入：{snippet_path}")
+            if class_names:
+                selector_path = debug_dir / "debug-selectors.txt"
+                selector_path.write_text("\n".join(class_names), encoding="utf-8")
+                self._log(f"已保存页面中的类名到：{selector_path}")
+        except OSError as exc:
+            self._log(f"写入调试文件失败：{exc}")
+
+    def _log_advice(self, info: Dict[str, Any]) -> None:
+        if info.get("hasBody") is False:
+            self._log("⚠️ 警告: 页面没有body元素，可能页面还未加载")
+        elif info.get("bodyHtmlLength", 0) < 100:
+            self._log("⚠️ 警告: body内容很少，可能页面内容未加载")
+        elif info.get("readyState") not in (None, "complete"):
+            self._log(f"⚠️ 警告: 页面readyState为'{info.get('readyState')}'，可能还在加载中")
+        if info.get("hasLoading"):
+            self._log("页面仍在加载中，请等待页面完全加载后再试。")
@@ -0,0 +1,673 @@
+"""商品列表读取模块：增量同步与分页/虚拟滚动列表的完整目录。
+
+讲解任务每处理一个商品都要重新读取商品列表。原先每次都把全部商品行返回给
+Python，单次读取的 CDP 数据量与商品数量成正比，整场直播累计为 O(n²)。
+
+现在页面一侧在 ``window.__jdlaGoodsMirror`` 中为每行商品保存内容签名与版本号，
+每次读取只返回上次读取之后内容（按钮文本、SKU、编号、位置等）发生变化的行与
+被移除的行；Python 一侧由 :class:`GoodsMirror` 合并为本地镜像。页面刷新或切换
+frame 后页面状态丢失，会话号不一致时自动退回全量同步。
+
+商品较多时，直播后台会分页（Ant Design 分页器）或虚拟滚动显示商品，页面上只有
+当前渲染的行。:class:`GoodsCatalog` 逐页/逐屏读取一遍，得到完整的 SKU 目录并记录
+每个商品所在的页码或滚动位置；讲解某个商品前再翻页/滚动到它所在的位置。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping as MappingABC
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Protocol
+
+from loguru import logger
+
+LIST_AUTO = "auto"
+LIST_STATIC = "static"
+LIST_PAGINATION = "pagination"
+LIST_SCROLL = "scroll"
+
+# 目录只保留讲解需要的字段，DOM 索引随翻页/滚动变化，不保存
+CATALOG_FIELDS = ("sku", "itemIndex", "hasButton", "buttonText", "isProcessed", "imageUrl", "title")
+
+# 读取单行商品信息（按钮文本、是否已处理、编号、SKU、商品图与标题），供各脚本拼接使用
+_READ_ROW_JS = """
+    const readRow = (item, idx) => {
+        // 查找"讲解"按钮 - 排除下拉菜单的触发按钮（三个点...）
+        let button = null;
+
+        // 辅助函数：检查是否是下拉菜单的触发按钮（三个点）
+        const isDropdownTrigger = (node) => {
+            if (!node) return false;
+            const text = (node.textContent || node.innerText || '').trim();
+            // 检查是否是三个点（但排除文本为"讲解"的情况）
+            if (text === '讲解') {
+                return false; // "讲解"按钮不是下拉菜单触发按钮
+            }
+            // 检查是否是三个点或包含下拉菜单相关的类名
+            if (text === '...' || text === '⋯' || text === '⋮' || (text.length <= 2 && text !== '讲解')) {
+                return true;
+            }
+            // 检查是否包含下拉菜单相关的类名
+            const className = node.className || '';
+            if (typeof className === 'string') {
+                if (className.includes('dropdown') || className.includes('more') || 
+                    className.includes('menu') || className.includes('trigger')) {
+                    return true;
+                }
+            }
+            // 检查父元素是否是下拉菜单
+            let parent = node.parentElement;
+            let checkCount = 0;
+            while (parent && checkCount < 3) {
+                const parentClass = parent.className || '';
+                if (typeof parentClass === 'string') {
+                    if (parentClass.includes('dropdown') || parentClass.includes('menu')) {
+                        return true;
+                    }
+                }
+                parent = parent.parentElement;
+                checkCount++;
+            }
+            return false;
+        };
+
+        // 辅助函数：获取元素的完整文本（包括内部所有子元素的文本）
+        const getFullText = (node) => {
+            if (!node) return '';
+            // 先尝试获取 textContent（包含所有子元素的文本）
+            let text = (node.textContent || '').trim();
+            // 如果 textContent 为空，尝试获取 innerText
+            if (!text) {
+                text = (node.innerText || '').trim();
+            }
+            // 如果还是为空，尝试查找内部的 span 等元素
+            if (!text) {
+                const innerSpan = node.querySelector('span');
+                if (innerSpan) {
+                    text = (innerSpan.textContent || innerSpan.innerText || '').trim();
+                }
+            }
+            return text;
+        };
+
+        // 方式1: 查找包含"讲解"文本的span，且类名包含selectBtn
+        // 根据HTML结构：<span class="antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-selectBtn">讲解</span>
+        const selectBtnSpans = Array.from(item.querySelectorAll('span.antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-selectBtn'));
+        button = selectBtnSpans.find((span) => {
+            const text = getFullText(span);
+            // 严格匹配：文本必须是"讲解"
+            return text === "讲解";
+        });
+
+        // 方式2: 如果没找到，查找包含"讲解"文本的span，但排除下拉菜单
+        if (!button) {
+            const allSpans = Array.from(item.querySelectorAll('span'));
+            button = allSpans.find((span) => {
+                const text = getFullText(span);
+                // 严格匹配：文本必须是"讲解"，不能是下拉菜单触发按钮
+                return text === "讲解" && !isDropdownTrigger(span);
+            });
+        }
+
+        // 方式3: 如果还是没找到，在整个item中查找，但排除下拉菜单
+        if (!button) {
+            const allButtons = Array.from(item.querySelectorAll('button, span, div, a'));
+            button = allButtons.find((node) => {
+                const text = getFullText(node);
+                // 严格匹配：文本必须是"讲解"，不能是下拉菜单触发按钮
+                return text === "讲解" && !isDropdownTrigger(node);
+            });
+        }
+
+        // 获取按钮文本（使用完整文本获取函数）
+        const buttonText = button ? getFullText(button) : '';
+        // 判断是否已处理：按钮文本不是"讲解"或包含"取消"、"结束"等
+        const isProcessed = !button || (
+            buttonText !== "讲解" && 
+            !buttonText.includes("讲解") &&
+            (buttonText.includes("取消") || buttonText.includes("结束"))
+        );
+
+        // 获取商品编号（index）
+        // 根据HTML结构：<span class="antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-index">08</span>
+        let itemIndex = null;
+        const indexSpan = item.querySelector('span.antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-index');
+        if (indexSpan) {
+            const indexText = (indexSpan.textContent || indexSpan.innerText || '').trim();
+            // 尝试解析为数字
+            const indexNum = parseInt(indexText, 10);
+            if (!isNaN(indexNum)) {
+                itemIndex = indexNum;
+            } else {
+                // 如果无法解析为数字，使用文本
+                itemIndex = indexText;
+            }
+        }
+
+        // 尝试获取SKU信息 - 多种方式
+        let sku = null;
+
+        // 方式1: 查找包含"SKU:"文本的元素，提取SKU后面的数字
+        const allTextElements = Array.from(item.querySelectorAll('*'));
+        for (const el of allTextElements) {
+            const text = el.textContent || '';
+            // 查找包含"SKU:"或"SKU："的文本
+            const skuMatch = text.match(/SKU[：:]\\s*(\\d+)/i);
+            if (skuMatch && skuMatch[1]) {
+                sku = skuMatch[1];
+                break;
+            }
+        }
+
+        // 方式2: 查找包含SKU的元素（data-sku, data-id等属性）
+        if (!sku) {
+            const skuElements = Array.from(item.querySelectorAll('[data-sku], [data-id], [data-product-id], [class*="sku"]'));
+            for (const el of skuElements) {
+                const skuValue = el.getAttribute('data-sku') || 
+                                el.getAttribute('data-id') || 
+                                el.getAttribute('data-product-id') ||
+                                el.getAttribute('id');
+                if (skuValue && skuValue.length > 0 && skuValue !== '商品图') {
+                    // 如果是纯数字，直接使用；否则尝试提取数字
+                    if (/^\\d+$/.test(skuValue)) {
+                        sku = skuValue;
+                        break;
+                    } else {
+                        const numMatch = skuValue.match(/\\d{10,}/);
+                        if (numMatch) {
+                            sku = numMatch[0];
+                            break;
+                        }
+                    }
+                }
+            }
+        }
+
+        // 方式3: 从图片URL中提取SKU（京东商品URL通常包含SKU）
+        if (!sku) {
+            const images = Array.from(item.querySelectorAll('img'));
+            for (const img of images) {
+                const imgSrc = img.src || img.getAttribute('data-src') || '';
+                if (imgSrc) {
+                    // 尝试从URL中提取SKU（多种格式）
+                    // 格式1: /jfs/t1/数字/数字/数字/数字/xxx.jpg
+                    let skuMatch = imgSrc.match(/[\\/]jfs[\\/]t\\d+[\\/](\\d+)[\\/]/);
+                    if (skuMatch && skuMatch[1]) {
+                        sku = skuMatch[1];
+                        break;
+                    }
+                    // 格式2: /数字/数字.jpg 或 /数字数字数字.jpg
+                    skuMatch = imgSrc.match(/[\\/](\\d{8,})[\\/]/);
+                    if (skuMatch && skuMatch[1]) {
+                        sku = skuMatch[1];
+                        break;
+                    }
+                    // 格式3: 查找URL中的长数字串（10位以上）
+                    skuMatch = imgSrc.match(/[\\/](\\d{10,})/);
+                    if (skuMatch && skuMatch[1]) {
+                        sku = skuMatch[1];
+                        break;
+                    }
+                }
+            }
+        }
+
+        // 方式4: 在整个item的文本中查找长数字串（可能是SKU）
+        if (!sku) {
+            const itemText = item.textContent || '';
+            // 查找13位数字（京东SKU通常是13位）
+            const skuMatch = itemText.match(/\\d{13}/);
+            if (skuMatch) {
+                sku = skuMatch[0];
+            } else {
+                // 如果没找到13位，尝试10位以上的数字
+                const longNumMatch = itemText.match(/\\d{10,}/);
+                if (longNumMatch) {
+                    sku = longNumMatch[0];
+                }
+            }
+        }
+
+        // 方式5: 查找商品标题作为唯一标识
+        if (!sku) {
+            const titleEl = item.querySelector('[class*="title"], [class*="name"], [title]');
+            if (titleEl) {
+                const title = titleEl.textContent?.trim() || titleEl.getAttribute('title') || '';
+                if (title && title.length > 0 && title !== '商品图') {
+                    sku = title.substring(0, 100); // 使用完整标题作为标识
+                }
+            }
+        }
+
+        // 方式6: 使用索引+按钮文本作为后备方案（不使用时间戳，确保同一商品每次获取的SKU相同）
+        if (!sku) {
+            sku = `item_${idx}_${buttonText}`;
+        }
+
+        // 商品图地址（alt 为"商品图"且不是"AI手卡"图片），用于后台预取
+        const productImage = Array.from(item.querySelectorAll('img')).find((img) => {
+            const alt = (img.alt || '').trim();
+            const title = (img.title || '').trim();
+            return alt === '商品图' && !(title.includes('AI') && title.includes('手卡'));
+        });
+
+        // 商品标题，用于匹配评论中提到的商品
+        const titleNode = item.querySelector('[class*="title"], [class*="name"], [class*="Title"], [class*="Name"], span[title], div[title]');
+        const titleText = titleNode ? (titleNode.textContent?.trim() || titleNode.getAttribute('title') || '') : '';
+
+        return {
+            index: idx, // DOM索引
+            itemIndex: itemIndex, // 商品编号（从页面获取的编号，如08）
+            hasButton: !!button,
+            buttonText: buttonText,
+            isProcessed: isProcessed,
+            sku: sku, // 确保有值
+            imageUrl: productImage ? (productImage.src || productImage.getAttribute('data-src') || null) : null,
+            title: titleText
+        };
+    };
+"""
+
+# 列表布局相关的辅助函数：分页器、滚动容器、等待渲染、翻页
+_LIST_HELPERS_JS = """
+    const firstItem = () => document.querySelector(itemSelector);
+    const firstKey = () => {
+        const item = firstItem();
+        return item ? String(readRow(item, 0).sku) : null;
+    };
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+    const waitForChange = async (before, timeoutMs) => {
+        const deadline = Date.now() + timeoutMs;
+        while (Date.now() < deadline) {
+            await sleep(50);
+            if (firstKey() !== before) {
+                return true;
+            }
+        }
+        return false;
+    };
+    const findPager = () => {
+        const item = firstItem();
+        const scope = item ? item.closest('.ant-table-wrapper, .ant-list, .ant-spin-container') : null;
+        return (scope && scope.querySelector('.ant-pagination')) || document.querySelector('.ant-pagination');
+    };
+    const pageNumber = (node) => parseInt((node && (node.getAttribute('title') || node.textContent)) || '', 10);
+    const currentPage = (pager) => pageNumber(pager.querySelector('.ant-pagination-item-active')) || 1;
+    const lastPage = (pager) => Math.max(1, ...Array.from(pager.querySelectorAll('.ant-pagination-item')).map(pageNumber).filter((value) => !isNaN(value)));
+    const goToPage = async (target) => {
+        const pager = findPager();
+        if (!pager) {
+            return target === 1;
+        }
+        for (let attempt = 0; attempt < 200; attempt++) {
+            const current = currentPage(pager);
+            if (current === target) {
+                return true;
+            }
+            // 目标页码可见时直接点击，否则向目标方向快速跳页（每次 5 页）或逐页翻
+            let control = pager.querySelector(`.ant-pagination-item-${target}`);
+            if (!control) {
+                const forward = target > current;
+                const far = Math.abs(target - current) > 5;
+                control = (far && pager.querySelector(forward ? '.ant-pagination-jump-next' : '.ant-pagination-jump-prev'))
+                    || pager.querySelector(forward ? '.ant-pagination-next:not(.ant-pagination-disabled)' : '.ant-pagination-prev:not(.ant-pagination-disabled)');
+            }
+            if (!control) {
+                return false;
+            }
+            const before = firstKey();
+            (control.querySelector('a, button') || control).click();
+            await waitForChange(before, 5000);
+        }
+        return currentPage(pager) === target;
+    };
+    const findScroller = () => {
+        const item = firstItem();
+        let node = item ? item.parentElement : null;
+        while (node && node !== document.body && node !== document.documentElement) {
+            const overflow = getComputedStyle(node).overflowY;
+            if ((overflow === 'auto' || overflow === 'scroll') && node.scrollHeight > node.clientHeight + 1) {
+                return node;
+            }
+            node = node.parentElement;
+        }
+        return document.scrollingElement || document.documentElement;
+    };
+    const scrollerTop = (scroller) => (
+        scroller === document.scrollingElement || scroller === document.documentElement ? 0 : scroller.getBoundingClientRect().top
+    );
+    const renderedRows = (position) => {
+        const scroller = position === null ? findScroller() : null;
+        const origin = scroller ? scrollerTop(scroller) - scroller.scrollTop : 0;
+        return Array.from(document.querySelectorAll(itemSelector)).map((item, idx) => {
+            const row = readRow(item, idx);
+            // 分页列表记录页码，滚动列表记录该行在滚动容器中的偏移
+            row.position = scroller ? Math.round(item.getBoundingClientRect().top - origin) : position;
+            return row;
+        });
+    };
+"""
+
+# 参数：{ itemSelector }；返回列表布局 { mode, pages }
+GOODS_LAYOUT_SCRIPT = """
+({ itemSelector }) => {
+    const item = document.querySelector(itemSelector);
+    const pager = item ? ((item.closest('.ant-table-wrapper, .ant-list, .ant-spin-container') || document).querySelector('.ant-pagination')) : null;
+    if (pager) {
+        const pages = Math.max(1, ...Array.from(pager.querySelectorAll('.ant-pagination-item')).map((node) => parseInt(node.getAttribute('title') || node.textContent, 10)).filter((value) => !isNaN(value)));
+        if (pages > 1 || pager.querySelector('.ant-pagination-next:not(.ant-pagination-disabled)')) {
+            return { mode: 'pagination', pages: pages };
+        }
+    }
+    if (item && item.closest('.rc-virtual-list, .ant-table-tbody-virtual, [class*="virtual"], [class*="Virtual"]')) {
+        return { mode: 'scroll', pages: 1 };
+    }
+    return { mode: 'static', pages: 1 };
+}
+"""
+
+# 参数：{ itemSelector, mode, position, settleMs }；翻到指定页或滚动到指定位置后读取已渲染的行，
+# 返回 { rows, next }，next 为下一块的位置，读完时为 null
+GOODS_CHUNK_SCRIPT = """
+async ({ itemSelector, mode, position, settleMs }) => {
+""" + _READ_ROW_JS + _LIST_HELPERS_JS + """
+    if (mode === 'pagination') {
+        if (!(await goToPage(position))) {
+            return { rows: [], next: null };
+        }
+        const pager = findPager();
+        const last = pager ? lastPage(pager) : 1;
+        return { rows: renderedRows(position), next: position < last ? position + 1 : null };
+    }
+    const scroller = findScroller();
+    const before = firstKey();
+    scroller.scrollTop = position;
+    if (position > 0) {
+        await waitForChange(before, settleMs);
+    }
+    await sleep(settleMs);
+    const top = scroller.scrollTop;
+    const bottom = scroller.scrollHeight - scroller.clientHeight;
+    const step = Math.max(Math.floor(scroller.clientHeight * 0.8), 1);
+    return { rows: renderedRows(null), next: top >= bottom - 1 ? null : Math.min(top + step, bottom) };
+}
+"""
+
+# 参数：{ itemSelector, mode, sku, position, settleMs }；翻页/滚动到商品所在位置，返回是否已渲染
+GOODS_REVEAL_SCRIPT = """
+async ({ itemSelector, mode, sku, position, settleMs }) => {
+""" + _READ_ROW_JS + _LIST_HELPERS_JS + """
+    const rendered = () => Array.from(document.querySelectorAll(itemSelector)).some((item, idx) => String(readRow(item, idx).sku) === sku);
+    if (rendered()) {
+        return true;
+    }
+    if (mode === 'pagination') {
+        return (await goToPage(position)) && rendered();
+    }
+    const scroller = findScroller();
+    // 先滚到记录的位置（目标行位于视口上方三分之一处），找不到时在附近上下搜索
+    const base = Math.max(position - Math.floor(scroller.clientHeight / 3), 0);
+    for (const offset of [0, -1, 1, -2, 2]) {
+        scroller.scrollTop = Math.max(base + offset * scroller.clientHeight, 0);
+        await sleep(settleMs);
+        if (rendered()) {
+            return true;
+        }
+    }
+    return false;
+}
+"""
+
+# 在商品行元素上执行，参数为 DOM 索引；返回该行当前的 SKU，点击前用于核对行是否已变化
+GOODS_ROW_SKU_SCRIPT = """
+(item, idx) => {
+""" + _READ_ROW_JS + """
+    return String(readRow(item, idx).sku);
+}
+"""
+
+# 参数：{ itemSelector, session, since }；返回：{ session, version, full, total, rows, removed }
+GOODS_DELTA_SCRIPT = """
+({ itemSelector, session, since }) => {
+    const STORE = '__jdlaGoodsMirror';
+    let state = window[STORE];
+    if (!state || state.itemSelector !== itemSelector) {
+        state = window[STORE] = {
+            session: Math.random().toString(36).slice(2) + Date.now().toString(36),
+            itemSelector: itemSelector,
+            version: 0,
+            rows: new Map(),
+            removed: new Map()
+        };
+    }
+    const full = session !== state.session;
+""" + _READ_ROW_JS + """
+    // 同一 SKU 出现多次时，后出现的行以 "SKU#序号" 区分
+    const occurrences = new Map();
+    const present = new Set();
+    Array.from(document.querySelectorAll(itemSelector)).forEach((item, idx) => {
+        const row = readRow(item, idx);
+        const sku = String(row.sku);
+        const count = occurrences.get(sku) || 0;
+        occurrences.set(sku, count + 1);
+        row.key = count ? `${sku}#${count}` : sku;
+        present.add(row.key);
+        const signature = JSON.stringify(row);
+        const previous = state.rows.get(row.key);
+        if (!previous || previous.signature !== signature) {
+            state.rows.set(row.key, { row: row, signature: signature, version: ++state.version });
+            state.removed.delete(row.key);
+        }
+    });
+    for (const key of Array.from(state.rows.keys())) {
+        if (!present.has(key)) {
+            state.rows.delete(key);
+            state.removed.set(key, ++state.version);
+        }
+    }
+
+    const base = full ? 0 : since;
+    const rows = [];
+    for (const entry of state.rows.values()) {
+        if (entry.version > base) {
+            rows.push(entry.row);
+        }
+    }
+    const removed = [];
+    if (!full) {
+        for (const [key, version] of state.removed) {
+            if (version > base) {
+                removed.push(key);
+            }
+        }
+    }
+    return { session: state.session, version: state.version, full: full, total: state.rows.size, rows: rows, removed: removed };
+}
+"""
+
+
+class GoodsMirror:
+    """商品列表的本地镜像，合并页面返回的增量。"""
+
+    def __init__(self) -> None:
+        self.session: Optional[str] = None
+        self.version = 0
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._ordered: Optional[List[Dict[str, Any]]] = None
+        self._by_sku: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def request(self, item_selector: str) -> Dict[str, Any]:
+        """下一次调用 :data:`GOODS_DELTA_SCRIPT` 的参数。"""
+
+        return {"itemSelector": item_selector, "session": self.session, "since": self.version}
+
+    def apply(self, delta: Optional[Mapping[str, Any]]) -> bool:
+        """合并一次增量，返回镜像内容是否发生变化。"""
+
+        if not delta:
+            return False
+        full = bool(delta.get("full")) or delta.get("session") != self.session
+        rows = delta.get("rows") or []
+        removed = delta.get("removed") or []
+        if full:
+            self._rows.clear()
+            self.session = delta.get("session")
+        for row in rows:
+            self._rows[str(row.get("key") or row.get("sku"))] = dict(row)
+        for key in removed:
+            self._rows.pop(str(key), None)
+        self.version = int(delta.get("version") or 0)
+
+        changed = full or bool(rows) or bool(removed)
+        if changed:
+            self._ordered = None
+            self._by_sku = None
+            logger.debug(
+                "商品列表{}同步：{} 行更新，{} 行移除，共 {} 行",
+                "全量" if full else "增量",
+                len(rows),
+                len(removed),
+                len(self._rows),
+            )
+        total = delta.get("total")
+        if total is not None and int(total) != len(self._rows):
+            # 镜像与页面不一致（例如漏掉了一次增量），下次读取时全量同步
+            logger.warning("商品列表镜像与页面不一致（{} / {}），将重新全量同步", len(self._rows), total)
+            self.reset()
+        return changed
+
+    def reset(self) -> None:
+        self.session = None
+        self.version = 0
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """按页面顺序排列的商品行，镜像未变化时返回同一个列表。"""
+
+        if self._ordered is None:
+            self._ordered = sorted(self._rows.values(), key=lambda row: row.get("index", 0))
+        return self._ordered
+
+    @property
+    def by_sku(self) -> Dict[str, Dict[str, Any]]:
+        if self._by_sku is None:
+            self._by_sku = {str(row.get("sku")): row for row in self.rows() if row.get("sku")}
+        return self._by_sku
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class _Evaluator(Protocol):
+    def evaluate(self, expression: str, arg: Any = None) -> Any: ...
+
+
+class GoodsCatalog(MappingABC):
+    """分页/虚拟滚动商品列表的完整目录（SKU -> 商品信息与所在位置）。
+
+    目录只在每轮讲解开始时读取一次，每次只渲染一页/一屏，单次读取的数据量与页面
+    大小有关，与商品总数无关。
+    """
+
+    def __init__(self, mode: str, item_selector: str, settle_ms: int = 150, max_chunks: int = 500) -> None:
+        self.mode = mode
+        self.item_selector = item_selector
+        self.settle_ms = settle_ms
+        self.max_chunks = max_chunks
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._ordered: Optional[List[Dict[str, Any]]] = None
+
+    @staticmethod
+    def detect(ctx: _Evaluator, item_selector: str) -> str:
+        """识别商品列表的布局：``pagination``、``scroll`` 或 ``static``。"""
+
+        layout = ctx.evaluate(GOODS_LAYOUT_SCRIPT, {"itemSelector": item_selector}) or {}
+        return str(layout.get("mode") or LIST_STATIC)
+
+    @classmethod
+    def open(
+        cls,
+        ctx: _Evaluator,
+        item_selector: str,
+        mode: str = LIST_AUTO,
+        checkpoint: Optional[Callable[[], None]] = None,
+    ) -> Optional["GoodsCatalog"]:
+        """按配置的列表模式读取目录；普通列表（所有商品都已渲染）返回 None。"""
+
+        if mode == LIST_AUTO:
+            mode = cls.detect(ctx, item_selector)
+        if mode not in (LIST_PAGINATION, LIST_SCROLL):
+            return None
+        catalog = cls(mode, item_selector)
+        catalog.build(ctx, checkpoint)
+        return catalog
+
+    def build(self, ctx: _Evaluator, checkpoint: Optional[Callable[[], None]] = None) -> int:
+        """逐页/逐屏读取整个列表，返回商品数量。
+
+        Args:
+            checkpoint: 每读取一页/一屏前调用，抛出异常即中止读取（如任务被停止）
+        """
+
+        self._rows.clear()
+        self._ordered = None
+        position = 1 if self.mode == LIST_PAGINATION else 0
+        for _ in range(self.max_chunks):
+            if checkpoint is not None:
+                checkpoint()
+            chunk = ctx.evaluate(
+                GOODS_CHUNK_SCRIPT,
+                {
+                    "itemSelector": self.item_selector,
+                    "mode": self.mode,
+                    "position": position,
+                    "settleMs": self.settle_ms,
+                },
+            ) or {}
+            for row in chunk.get("rows") or []:
+                sku = str(row.get("sku") or "")
+                if sku and sku not in self._rows:
+                    entry = {name: row.get(name) for name in CATALOG_FIELDS}
+                    entry["position"] = row.get("position")
+                    self._rows[sku] = entry
+            following = chunk.get("next")
+            if following is None or following <= position:
+                break
+            position = following
+        else:
+            logger.warning("商品列表超过 {} {}，只读取了前面部分", self.max_chunks, "页" if self.mode == LIST_PAGINATION else "屏")
+        logger.info("商品目录读取完成（{}）：共 {} 个商品", "分页" if self.mode == LIST_PAGINATION else "滚动", len(self._rows))
+        return len(self._rows)
+
+    def reveal(self, ctx: _Evaluator, sku: str) -> bool:
+        """翻页/滚动到商品所在位置，返回该商品是否已渲染在页面上。"""
+
+        entry = self._rows.get(sku)
+        if entry is None:
+            return False
+        return bool(
+            ctx.evaluate(
+                GOODS_REVEAL_SCRIPT,
+                {
+                    "itemSelector": self.item_selector,
+                    "mode": self.mode,
+                    "sku": sku,
+                    "position": entry.get("position") or 0,
+                    "settleMs": self.settle_ms,
+                },
+            )
+        )
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """按列表顺序排列的全部商品，目录未重新读取时返回同一个列表。"""
+
+        if self._ordered is None:
+            self._ordered = list(self._rows.values())
+        return self._ordered
+
+    def __getitem__(self, sku: str) -> Dict[str, Any]:
+        return self._rows[sku]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
@@ -1,44 +1,72 @@
-"""全局热键管理模块。"""
+"""全局热键管理模块。
+
+keyboard 库在系统级钩子线程上调用热键回调，回调阻塞会拖慢整台电脑的按键响应。
+设置 ``executor`` 后，钩子线程只负责把命令放入执行队列，实际处理由
+:class:`~JD_Live_Assistant.core.commands.CommandExecutor` 的线程完成，
+连续重复按下的同一热键在排队期间会被合并。
+
+只设置标志、不做阻塞操作的回调（如讲解控制命令）可以登记为 ``immediate``，
+直接在钩子线程上执行，不必排在浏览器命令之后。
+"""
 
 from __future__ import annotations
 
-from typing import Callable, Dict
+from types import ModuleType
+from typing import Callable, Collection, Dict, Optional, Set
 
-import keyboard
 from loguru import logger
 
+from .commands import CommandExecutor
+
+
+def _keyboard() -> ModuleType:
+    """注册热键时才导入 keyboard，不占用程序启动时间。"""
+
+    import keyboard
+
+    return keyboard
+
 
 class HotkeyManager:
     """封装 keyboard 库的热键注册与释放。"""
 
-    def __init__(self) -> None:
+    def __init__(self, executor: Optional[CommandExecutor] = None) -> None:
         self._callbacks: Dict[str, Callable[[], None]] = {}
         self._registered: Dict[str, int] = {}
+        self._names: Dict[str, str] = {}
+        self._immediate: Set[str] = set()
         self._active = False
+        self.executor = executor
 
-    def register(self, hotkey: str, callback: Callable[[], None]) -> None:
-        """注册新的热键与回调。"""
+    def register(self, hotkey: str, callback: Callable[[], None], immediate: bool = False) -> None:
+        """注册新的热键与回调，``immediate`` 为真时回调直接在钩子线程上执行。"""
 
         if hotkey in self._callbacks:
             logger.warning("热键 {} 已存在，将覆盖旧回调", hotkey)
         self._callbacks[hotkey] = callback
+        if immediate:
+            self._immediate.add(hotkey)
+        else:
+            self._immediate.discard(hotkey)
         if self._active:
-            self._registered[hotkey] = keyboard.add_hotkey(hotkey, callback)
+            self._registered[hotkey] = _keyboard().add_hotkey(hotkey, self._dispatch, args=(hotkey,))
             logger.info("启用热键: {}", hotkey)
 
     def unregister(self, hotkey: str) -> None:
         identifier = self._registered.pop(hotkey, None)
         if identifier is not None:
-            keyboard.remove_hotkey(identifier)
+            _keyboard().remove_hotkey(identifier)
             logger.info("移除热键: {}", hotkey)
         self._callbacks.pop(hotkey, None)
+        self._names.pop(hotkey, None)
+        self._immediate.discard(hotkey)
 
     def start(self) -> None:
         if self._active:
             return
         logger.debug("启动热键监听")
-        for hotkey, callback in self._callbacks.items():
-            self._registered[hotkey] = keyboard.add_hotkey(hotkey, callback)
+        for hotkey in self._callbacks:
+            self._registered[hotkey] = _keyboard().add_hotkey(hotkey, self._dispatch, args=(hotkey,))
             logger.info("启用热键: {}", hotkey)
         self._active = True
 
@@ -47,21 +75,40 @@ class HotkeyManager:
             return
         logger.debug("停止热键监听")
         for identifier in list(self._registered.values()):
-            keyboard.remove_hotkey(identifier)
+            _keyboard().remove_hotkey(identifier)
         self._registered.clear()
         self._active = False
 
     def clear(self) -> None:
         self.stop()
         self._callbacks.clear()
+        self._names.clear()
+        self._immediate.clear()
+
+    def _dispatch(self, hotkey: str) -> None:
+        """在钩子线程上执行：只做入队，不运行回调本身。"""
+
+        callback = self._callbacks.get(hotkey)
+        if callback is None:
+            return
+        if self.executor is None or hotkey in self._immediate:
+            callback()
+            return
+        self.executor.submit(self._names.get(hotkey, hotkey), callback)
 
-    def bind_from_mapping(self, mapping: Dict[str, str], handlers: Dict[str, Callable[[], None]]) -> None:
-        """根据配置映射批量注册热键。"""
+    def bind_from_mapping(
+        self,
+        mapping: Dict[str, str],
+        handlers: Dict[str, Callable[[], None]],
+        immediate: Collection[str] = (),
+    ) -> None:
+        """根据配置映射批量注册热键，``immediate`` 中的名称不经过执行队列。"""
 
         for name, hotkey in mapping.items():
             handler = handlers.get(name)
             if handler:
-                self.register(hotkey, handler)
+                self.register(hotkey, handler, immediate=name in immediate)
+                self._names[hotkey] = name
             else:
                 logger.warning("未找到对应处理器: {}", name)
 
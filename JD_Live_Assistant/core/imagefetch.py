@@ -0,0 +1,225 @@
+"""图片下载服务，复用 HTTP 长连接并在线程池中并发下载商品图片。
+
+任务线程只负责提交下载请求并拿到 ``Future``，实际的网络与磁盘写入在
+有界线程池中完成，从而与页面点击、等待等操作并行执行。
+"""
+
+from __future__ import annotations
+
+import http.client
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from loguru import logger
+
+DEFAULT_HEADERS: Dict[str, str] = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "Referer": "https://live.jd.com/",
+    "Connection": "keep-alive",
+}
+
+CHUNK_SIZE = 64 * 1024
+MIN_IMAGE_BYTES = 100
+MAX_REDIRECTS = 3
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+_HostKey = Tuple[str, str, int]
+
+
+class ImageFetchError(Exception):
+    """图片下载失败。"""
+
+
+class _ConnectionPool:
+    """按主机缓存空闲的 HTTP(S) 连接，实现 keep-alive 复用。"""
+
+    def __init__(self, max_idle_per_host: int) -> None:
+        self._max_idle = max_idle_per_host
+        self._idle: Dict[_HostKey, "queue.LifoQueue[http.client.HTTPConnection]"] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: _HostKey, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        """取出一个连接，返回 (连接, 是否为复用连接)。"""
+
+        with self._lock:
+            idle = self._idle.setdefault(key, queue.LifoQueue(maxsize=self._max_idle))
+        try:
+            conn = idle.get_nowait()
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        except queue.Empty:
+            scheme, host, port = key
+            factory = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            return factory(host, port, timeout=timeout), False
+
+    def release(self, key: _HostKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.get(key)
+        if idle is None:
+            conn.close()
+            return
+        try:
+            idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._idle.values())
+            self._idle.clear()
+        for idle in pools:
+            while True:
+                try:
+                    idle.get_nowait().close()
+                except queue.Empty:
+                    break
+
+
+class ImageFetcher:
+    """图片下载服务：长连接池 + 有界线程池 + 流式写盘。"""
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        timeout: float = 8.0,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self._pool = _ConnectionPool(max_idle_per_host=max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-fetch")
+
+    def submit(
+        self,
+        url: str,
+        destination: Path,
+        postprocess: Optional[Callable[[Path], Path]] = None,
+        reuse_existing: bool = False,
+    ) -> "Future[Path]":
+        """提交后台下载，返回在完成时给出最终文件路径的 Future。
+
+        Args:
+            postprocess: 下载完成后在同一工作线程中执行的处理（如图片规范化），返回最终路径
+            reuse_existing: 目标文件已存在时跳过下载
+        """
+
+        def job() -> Path:
+            path = destination if reuse_existing and destination.is_file() else self.fetch(url, destination)
+            return postprocess(path) if postprocess else path
+
+        return self._executor.submit(job)
+
+    def fetch(self, url: str, destination: Path) -> Path:
+        """同步下载图片到目标路径，先写临时文件再原子替换。
+
+        Raises:
+            ImageFetchError: 网络错误、超时、非 200 响应或数据过小时抛出
+        """
+
+        deadline = time.monotonic() + self.timeout
+        target = url.split("#")[0]
+        for _ in range(MAX_REDIRECTS + 1):
+            location = self._fetch_once(target, destination, deadline)
+            if location is None:
+                return destination
+            target = urljoin(target, location)
+        raise ImageFetchError(f"重定向次数过多：{url}")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._pool.close()
+
+    # ------------------------------------------------------------------
+    def _fetch_once(self, url: str, destination: Path, deadline: float) -> Optional[str]:
+        """执行一次请求；返回重定向地址，下载完成时返回 None。"""
+
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ImageFetchError(f"不支持的图片地址：{url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key: _HostKey = (parts.scheme, parts.hostname, port)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        # 复用的长连接可能已被服务器关闭，失败时用新连接重试一次
+        for attempt in range(2):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ImageFetchError(f"下载超时：{url}")
+            conn, reused = self._pool.acquire(key, remaining)
+            try:
+                conn.request("GET", path, headers=self.headers)
+                response = conn.getresponse()
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                if reused and attempt == 0:
+                    logger.debug("复用连接失败，重新建立连接: {}", exc)
+                    continue
+                raise ImageFetchError(f"请求图片失败：{exc}") from exc
+            try:
+                location = self._handle_response(url, response, destination, deadline)
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                raise ImageFetchError(f"下载图片失败：{exc}") from exc
+            except BaseException:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._pool.release(key, conn)
+            return location
+        raise ImageFetchError(f"请求图片失败：{url}")
+
+    def _handle_response(
+        self,
+        url: str,
+        response: http.client.HTTPResponse,
+        destination: Path,
+        deadline: float,
+    ) -> Optional[str]:
+        if response.status in REDIRECT_STATUSES:
+            response.read()
+            location = response.getheader("Location")
+            if not location:
+                raise ImageFetchError(f"重定向缺少 Location：{url}")
+            return location
+        if response.status != 200:
+            response.read()
+            raise ImageFetchError(f"HTTP状态码 {response.status}")
+
+        content_type = (response.getheader("Content-Type") or "").lower()
+        if not content_type.startswith("image/"):
+            # 某些服务器不返回正确的 Content-Type，继续下载
+            logger.warning("响应不是图片类型，Content-Type: {}", content_type)
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = destination.with_name(f"{destination.name}.{threading.get_ident()}.part")
+        size = 0
+        try:
+            with temp_path.open("wb") as fh:
+                while True:
+                    if time.monotonic() > deadline:
+                        raise ImageFetchError(f"下载超时：{url}")
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    fh.write(chunk)
+                    size += len(chunk)
+            if size < MIN_IMAGE_BYTES:
+                raise ImageFetchError("下载的图片数据为空或过小")
+            temp_path.replace(destination)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        return None
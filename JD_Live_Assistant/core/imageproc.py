@@ -0,0 +1,122 @@
+"""卡点素材图片规范化模块。
+
+京东商品图可能是 webp/avif/png 等任意格式与尺寸，直接写入 ``1.jpg`` 会让
+直播软件每次切换素材都重新解码大图。本模块在下载完成后解码一次，按配置的
+尺寸缩放并输出为基线 JPEG 或 PNG，结果按 SKU 与图片地址缓存：商品换图后
+地址改变，不会继续使用旧图；按位置生成的备用 SKU 对应到其他商品时也不会
+拿到别的商品的图片。
+
+依赖 Pillow（可选）；未安装时保持原始文件不做处理。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+try:  # Pillow 为可选依赖
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - 依赖缺失时退化为直通
+    Image = None  # type: ignore[assignment]
+    ImageOps = None  # type: ignore[assignment]
+
+FORMAT_JPEG = "jpeg"
+FORMAT_PNG = "png"
+
+
+@dataclass(frozen=True)
+class NormalizeOptions:
+    """图片规范化参数。"""
+
+    width: int = 800
+    height: int = 800
+    image_format: str = FORMAT_JPEG
+    quality: int = 85
+    background: str = "#FFFFFF"
+    # contain：等比缩放后居中填充至目标尺寸；fit：等比缩放不超过目标尺寸
+    mode: str = "contain"
+
+    @property
+    def suffix(self) -> str:
+        return ".png" if self.image_format == FORMAT_PNG else ".jpg"
+
+    @property
+    def signature(self) -> str:
+        return f"{self.width}x{self.height}-{self.mode}-{self.image_format}-q{self.quality}"
+
+
+class ImageNormalizer:
+    """将任意格式的商品图转换为统一尺寸与格式，并按 SKU 与图片地址缓存结果。"""
+
+    def __init__(self, cache_dir: Path, options: Optional[NormalizeOptions] = None) -> None:
+        self.cache_dir = cache_dir
+        self.options = options or NormalizeOptions()
+        self._lock = threading.Lock()
+        if Image is None:
+            logger.warning("未安装 Pillow，素材图片将保持原始格式")
+
+    @property
+    def available(self) -> bool:
+        return Image is not None
+
+    def cache_path(self, sku: str, url: str) -> Path:
+        """返回某个 SKU 的图片（来源地址 ``url``）在当前参数下的缓存文件路径。"""
+
+        digest = hashlib.sha1(f"{sku}|{url}|{self.options.signature}".encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{digest}{self.options.suffix}"
+
+    def cached(self, sku: str, url: str) -> Optional[Path]:
+        path = self.cache_path(sku, url)
+        return path if path.is_file() else None
+
+    def normalize(self, source: Path, sku: str, url: str) -> Path:
+        """解码并缩放 ``source``（下载自 ``url``），写入缓存后返回缓存路径。
+
+        Pillow 不可用时直接返回 ``source``。
+        """
+
+        if Image is None:
+            return source
+        target = self.cache_path(sku, url)
+        if target.is_file():
+            return target
+
+        opts = self.options
+        with Image.open(source) as img:
+            img = ImageOps.exif_transpose(img)
+            has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+            if opts.image_format == FORMAT_PNG:
+                img = img.convert("RGBA" if has_alpha else "RGB")
+            else:
+                img = _flatten(img.convert("RGBA"), opts.background) if has_alpha else img.convert("RGB")
+
+            size = (opts.width, opts.height)
+            if opts.mode == "fit":
+                img.thumbnail(size, Image.LANCZOS)
+            else:
+                img = ImageOps.pad(img, size, method=Image.LANCZOS, color=opts.background)
+
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = target.with_name(f"{target.name}.{threading.get_ident()}.part")
+            if opts.image_format == FORMAT_PNG:
+                img.save(temp_path, format="PNG", optimize=True)
+            else:
+                img.save(temp_path, format="JPEG", quality=opts.quality, optimize=True, progressive=False)
+
+        with self._lock:
+            temp_path.replace(target)
+        logger.debug("图片已规范化: {} -> {}", source, target)
+        return target
+
+
+def _flatten(img: "Image.Image", background: str) -> "Image.Image":
+    """将带透明通道的图片合成到纯色背景上（JPEG 不支持透明）。"""
+
+    canvas = Image.new("RGB", img.size, background)
+    canvas.paste(img, mask=img.getchannel("A"))
+    return canvas
@@ -0,0 +1,219 @@
+"""关键词提醒模块，基于 Aho–Corasick 自动机对评论做多关键词匹配。
+
+关键词与评论在匹配前统一做规范化：
+
+- NFKC 归一（全角字母、数字、标点转为半角）；
+- 大小写折叠；
+- 繁体转简体（安装 opencc 时使用完整词典，否则使用内置常用字表）。
+
+自动机构建一次后，每条评论只需线性扫描一遍即可找出全部命中的关键词，
+与关键词数量无关。关键词列表变化时，新增关键词直接插入现有字典树并重算
+失败链接；有关键词被删除时才整体重建。
+"""
+
+from __future__ import annotations
+
+import threading
+import unicodedata
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from .monitor import Comment
+
+try:  # opencc 为可选依赖
+    import opencc
+
+    _CONVERTER = opencc.OpenCC("t2s")
+except (ImportError, AttributeError, RuntimeError, ValueError):  # pragma: no cover - 依赖缺失时使用内置字表
+    _CONVERTER = None
+
+# 评论中常见的繁体字（价格、链接、物流、售后等），opencc 不可用时使用
+_T2S_TABLE = str.maketrans(
+    "錢鏈們買賣價貨發號碼優質換評騙壞運費郵紅藍綠黃顏長還這個麼嗎尺寸碼數點擊單贈禮團購歡氣縮線條從後種類裝專業實際產品樣開關問題謝謝給讓聽說話",
+    "钱链们买卖价货发号码优质换评骗坏运费邮红蓝绿黄颜长还这个么吗尺寸码数点击单赠礼团购欢气缩线条从后种类装专业实际产品样开关问题谢谢给让听说话",
+)
+
+
+def normalize_text(text: str) -> str:
+    """将文本规范化为匹配用的形式。"""
+
+    value = unicodedata.normalize("NFKC", text).casefold()
+    if _CONVERTER is not None:
+        return _CONVERTER.convert(value)
+    return value.translate(_T2S_TABLE)
+
+
+@dataclass(frozen=True)
+class KeywordHit:
+    """一次关键词命中事件。"""
+
+    keyword: str
+    comment: Comment
+    occurrences: int
+    total: int
+
+
+class KeywordAutomaton:
+    """Aho–Corasick 自动机。
+
+    节点以数组形式存储：``_goto[state]`` 为字符到子节点的映射，``_fail[state]``
+    为失败链接，``_output[state]`` 为在该节点结束的关键词（含经失败链接可达的）。
+    """
+
+    def __init__(self, keywords: Iterable[str] = ()) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terminal: List[Tuple[str, ...]] = [()]
+        self._output: List[Tuple[str, ...]] = [()]
+        self.keywords: Set[str] = set()
+        self.add(keywords)
+
+    def add(self, keywords: Iterable[str]) -> int:
+        """插入已规范化的关键词并重算失败链接，返回实际新增的数量。"""
+
+        added = 0
+        for keyword in keywords:
+            if not keyword or keyword in self.keywords:
+                continue
+            state = 0
+            for char in keyword:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._terminal.append(())
+                    self._output.append(())
+                    self._goto[state][char] = nxt
+                state = nxt
+            self._terminal[state] = self._terminal[state] + (keyword,)
+            self.keywords.add(keyword)
+            added += 1
+        if added:
+            self._link()
+        return added
+
+    def _link(self) -> None:
+        # 按 BFS 顺序计算失败链接，父节点的链接总是先于子节点完成
+        self._fail[0] = 0
+        self._output[0] = ()
+        pending = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._output[child] = self._terminal[child]
+            pending.append(child)
+        while pending:
+            state = pending.popleft()
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._terminal[child] + self._output[self._fail[child]]
+                pending.append(child)
+
+    def search(self, text: str) -> Counter:
+        """单次线性扫描 ``text``（需已规范化），返回各关键词的出现次数。"""
+
+        hits: Counter = Counter()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                hits.update(output[state])
+        return hits
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+
+class KeywordEngine:
+    """关键词提醒引擎：规范化、匹配、计数并向监听者派发命中事件。"""
+
+    def __init__(self, keywords: Iterable[str] = ()) -> None:
+        self._lock = threading.Lock()
+        self._automaton = KeywordAutomaton()
+        # 规范化后的关键词 -> 配置中的原始写法，用于展示
+        self._display: Dict[str, str] = {}
+        self._counts: Counter = Counter()
+        self._listeners: List[Callable[[KeywordHit], None]] = []
+        self.update(keywords)
+
+    def update(self, keywords: Iterable[str]) -> bool:
+        """根据新的关键词列表更新自动机，返回关键词集合是否发生变化。"""
+
+        display: Dict[str, str] = {}
+        for keyword in keywords:
+            raw = str(keyword).strip()
+            normalized = normalize_text(raw)
+            if normalized and normalized not in display:
+                display[normalized] = raw
+
+        with self._lock:
+            current = self._automaton.keywords
+            wanted = set(display)
+            if wanted == current:
+                self._display = display
+                return False
+            if current - wanted:
+                self._automaton = KeywordAutomaton(wanted)
+            else:
+                self._automaton.add(sorted(wanted - current))
+            removed = {self._display.get(key, key) for key in current - wanted}
+            for name in removed:
+                self._counts.pop(name, None)
+            self._display = display
+        logger.info("关键词已更新：共 {} 个", len(wanted))
+        return True
+
+    def add_listener(self, listener: Callable[[KeywordHit], None]) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[KeywordHit], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def match(self, text: str) -> Dict[str, int]:
+        """返回文本中命中的关键词（原始写法）及出现次数。"""
+
+        normalized = normalize_text(text)
+        with self._lock:
+            hits = self._automaton.search(normalized)
+            return {self._display.get(key, key): count for key, count in hits.items()}
+
+    def process(self, comment: Comment) -> List[KeywordHit]:
+        """评论监听入口：匹配关键词、累加计数并派发命中事件。"""
+
+        matched = self.match(comment.text)
+        if not matched:
+            return []
+        events: List[KeywordHit] = []
+        with self._lock:
+            for keyword, occurrences in matched.items():
+                self._counts[keyword] += occurrences
+                events.append(KeywordHit(keyword, comment, occurrences, self._counts[keyword]))
+        for event in events:
+            for listener in list(self._listeners):
+                try:
+                    listener(event)
+                except Exception:  # noqa: BLE001
+                    logger.exception("关键词监听者处理失败")
+        return events
+
+    def counts(self, keyword: Optional[str] = None) -> Dict[str, int]:
+        """返回累计命中次数；指定 ``keyword`` 时只返回该关键词。"""
+
+        with self._lock:
+            if keyword is not None:
+                return {keyword: self._counts.get(keyword, 0)}
+            return dict(self._counts)
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self._counts.clear()
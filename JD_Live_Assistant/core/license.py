@@ -1,16 +1,54 @@
-"""卡密验证与授权管理模块。"""
+"""卡密验证与授权管理模块。
+
+支持两种卡密：
+
+- 签名卡密（推荐）：``JDL1.<载荷>.<签名>``，载荷中包含卡密编号、到期日与授权范围，
+  由发卡方用 Ed25519（``EdDSA``，需安装 cryptography）私钥签名。客户端只内置
+  公钥即可离线校验，发放新批次无需修改代码；
+- 注册表卡密：在 ``DEFAULT_KEY_REGISTRY`` 或注册表文件（见 :mod:`.registry`）中
+  登记的卡密，按卡密点查到期日。
+
+``HS256``（HMAC-SHA256）的验证密钥同时也是签名密钥，内置在客户端中等于公开了
+发卡能力，只用于服务端校验与测试：``TokenVerifier`` 默认忽略 HS256 密钥，
+需显式传入 ``allow_shared_secret=True`` 才会接受。
+
+验证通过后，授权信息与一个验证摘要一起写入 ``license.json``。摘要以公开的验证
+密钥为键，任何人都能重新计算，因此不是安全边界：启动时签名卡密仍会验签一次
+（Ed25519 验签只需几十微秒），摘要只用于发现授权文件被修改或验证密钥已更换后
+重写缓存。到期时间在内存中保存为时间戳，``is_valid``、``remaining_days`` 只做
+一次比较，不再解析日期。
+"""
 
 from __future__ import annotations
 
+import base64
+import binascii
+import hashlib
+import hmac
 import json
-from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
 
 from loguru import logger
 
+from .registry import KeyRegistry, open_registry
+
+try:  # Ed25519 签名为可选功能
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+except ImportError:  # pragma: no cover - 未安装时只支持 HS256
+    InvalidSignature = None  # type: ignore[assignment,misc]
+    Ed25519PrivateKey = None  # type: ignore[assignment,misc]
+    Ed25519PublicKey = None  # type: ignore[assignment,misc]
+
 DATE_FMT = "%Y-%m-%d"
+TOKEN_PREFIX = "JDL1."
+ALG_HS256 = "HS256"
+ALG_EDDSA = "EdDSA"
+SECONDS_PER_DAY = 86400
 
 
 class LicenseError(Exception):
@@ -23,31 +61,196 @@ class LicenseInfo:
 
     key: str
     expiry: datetime
+    subject: str = ""
+    scope: Tuple[str, ...] = ()
+    expires_at: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.subject = self.subject or self.key
+        self.expires_at = self.expiry.timestamp()
 
     @property
     def expiry_date(self) -> str:
         return self.expiry.strftime(DATE_FMT)
 
+    def has_scope(self, name: str) -> bool:
+        """未限定范围的卡密视为拥有全部功能。"""
+
+        return not self.scope or name in self.scope
+
 
 DEFAULT_KEY_REGISTRY: Dict[str, str] = {
     # 示例卡密，可在部署时替换为真实数据或接入远程校验。
     "JD-DEMO-2025": "2025-12-31",
 }
 
+# 签名卡密的验证密钥：密钥编号 -> (算法, base64 编码的 32 字节 Ed25519 公钥)
+# 部署时用 generate_keys_cli.py --generate-keypair 生成密钥对并替换为发卡方的公钥，
+# 私钥只保存在发卡方。不要在这里登记 HS256 共享密钥。
+DEFAULT_TRUSTED_KEYS: Dict[str, Tuple[str, str]] = {
+    "demo": (ALG_EDDSA, "SgZhBU1cefo7gbc0C5SRJhlqBlCqgwsUWU5y9mFR0n8="),
+}
+
+
+class TokenVerifier:
+    """签名卡密验证器。"""
+
+    def __init__(
+        self,
+        trusted_keys: Optional[Mapping[str, Tuple[str, str]]] = None,
+        allow_shared_secret: bool = False,
+    ) -> None:
+        """
+        Args:
+            trusted_keys: 验证密钥，默认使用 ``DEFAULT_TRUSTED_KEYS``
+            allow_shared_secret: 是否接受 HS256 共享密钥，仅供服务端校验与测试使用
+        """
+        if trusted_keys is None:
+            trusted_keys = DEFAULT_TRUSTED_KEYS
+        self._keys: Dict[str, Tuple[str, Any]] = {}
+        for kid, (alg, material) in trusted_keys.items():
+            raw = base64.b64decode(material)
+            if alg == ALG_HS256:
+                if not allow_shared_secret:
+                    # 共享密钥可以直接签发卡密，不能随客户端分发
+                    logger.warning("客户端不接受 HS256 共享密钥 {}，请改用 Ed25519 公钥", kid)
+                    continue
+                self._keys[kid] = (alg, raw)
+            elif alg == ALG_EDDSA:
+                if Ed25519PublicKey is None:
+                    logger.warning("未安装 cryptography，无法使用 Ed25519 验证密钥 {}", kid)
+                    continue
+                self._keys[kid] = (alg, Ed25519PublicKey.from_public_bytes(raw))
+            else:
+                logger.warning("未知的卡密签名算法 {}（密钥 {}）", alg, kid)
+        # 验证密钥集合的指纹，密钥变化后缓存的验证结果自动失效
+        material_digest = hashlib.sha256()
+        for kid, (alg, material) in sorted(trusted_keys.items()):
+            material_digest.update(f"{kid}:{alg}:{material};".encode())
+        self.fingerprint = material_digest.digest()
+
+    def verify(self, token: str) -> LicenseInfo:
+        """验证签名卡密并返回其中的授权信息。
+
+        Raises:
+            LicenseError: 格式错误、签名无效或使用了未知的密钥
+        """
+
+        try:
+            body, signature_part = token[len(TOKEN_PREFIX) :].split(".")
+            payload = json.loads(_b64decode(body))
+            signature = _b64decode(signature_part)
+        except (ValueError, binascii.Error) as exc:
+            raise LicenseError("卡密格式错误") from exc
+        if not isinstance(payload, dict):
+            raise LicenseError("卡密格式错误")
+
+        kid = str(payload.get("kid", ""))
+        alg, key = self._keys.get(kid, (None, None))
+        if alg is None or alg != payload.get("alg"):
+            raise LicenseError("卡密不存在或未授权")
+        signed = f"{TOKEN_PREFIX}{body}".encode("ascii")
+        if alg == ALG_HS256:
+            valid = hmac.compare_digest(hmac.new(key, signed, hashlib.sha256).digest(), signature)
+        else:
+            try:
+                key.verify(signature, signed)
+                valid = True
+            except InvalidSignature:
+                valid = False
+        if not valid:
+            raise LicenseError("卡密签名无效")
+
+        try:
+            expiry = _parse_expiry(str(payload.get("exp", "")))
+        except ValueError as exc:
+            raise LicenseError("卡密中的到期日无效") from exc
+        scope = payload.get("scope") or ()
+        return LicenseInfo(
+            key=token,
+            expiry=expiry,
+            subject=str(payload.get("sub") or ""),
+            scope=tuple(str(item) for item in scope),
+        )
+
+    def cache_digest(self, info: LicenseInfo) -> str:
+        """授权缓存的验证摘要，绑定卡密、到期时间、授权范围与验证密钥。
+
+        摘要只用于发现缓存与卡密不一致，不能代替验签。
+        """
+
+        message = json.dumps(
+            [info.key, info.subject, info.expiry_date, list(info.scope)],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return hmac.new(self.fingerprint, message, hashlib.sha256).hexdigest()
+
+
+def issue_token(
+    subject: str,
+    expiry_date: str,
+    kid: str,
+    signing_key: Any,
+    alg: str = ALG_EDDSA,
+    scope: Iterable[str] = (),
+) -> str:
+    """生成签名卡密，供发卡脚本使用。
+
+    Args:
+        subject: 卡密编号，如 ``JD-A1B2C3D4``
+        expiry_date: 到期日，``YYYY-MM-DD``
+        kid: 验证密钥编号，需在客户端的 ``DEFAULT_TRUSTED_KEYS`` 中登记
+        signing_key: EdDSA 为 32 字节私钥或 ``Ed25519PrivateKey``，HS256 为共享密钥（bytes）
+        alg: 签名算法，``EdDSA``；``HS256`` 仅用于服务端校验与测试
+        scope: 授权范围，为空表示全部功能
+    """
+
+    _parse_expiry(expiry_date)
+    payload: Dict[str, Any] = {"alg": alg, "exp": expiry_date, "kid": kid, "sub": subject}
+    scope = list(scope)
+    if scope:
+        payload["scope"] = scope
+    body = _b64encode(json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+    signed = f"{TOKEN_PREFIX}{body}".encode("ascii")
+    if alg == ALG_HS256:
+        signature = hmac.new(signing_key, signed, hashlib.sha256).digest()
+    elif alg == ALG_EDDSA:
+        if Ed25519PrivateKey is None:
+            raise LicenseError("生成 Ed25519 签名卡密需要安装 cryptography")
+        if isinstance(signing_key, (bytes, bytearray)):
+            signing_key = Ed25519PrivateKey.from_private_bytes(bytes(signing_key))
+        signature = signing_key.sign(signed)
+    else:
+        raise LicenseError(f"不支持的签名算法：{alg}")
+    return f"{TOKEN_PREFIX}{body}.{_b64encode(signature)}"
+
+
+def is_token(key: str) -> bool:
+    return key.startswith(TOKEN_PREFIX)
+
 
 class LicenseManager:
     """负责卡密录入、校验、持久化与有效期判断。"""
 
-    def __init__(self, path: Path, registry: Optional[Dict[str, str]] = None) -> None:
+    def __init__(
+        self,
+        path: Path,
+        registry: Optional[Union[KeyRegistry, Mapping[str, str], Path]] = None,
+        trusted_keys: Optional[Mapping[str, Tuple[str, str]]] = None,
+        allow_shared_secret: bool = False,
+    ) -> None:
         self.path = path
-        self.registry = {k.upper(): v for k, v in (registry or DEFAULT_KEY_REGISTRY).items()}
+        self.registry = open_registry(registry if registry is not None else DEFAULT_KEY_REGISTRY)
+        self.verifier = TokenVerifier(trusted_keys, allow_shared_secret=allow_shared_secret)
         self._info: Optional[LicenseInfo] = None
+        self._expires_at = 0.0
         self.load()
 
     # ---------------------------------------------------------------------
     # 基础读写
     def load(self) -> None:
-        """加载本地授权文件。"""
+        """加载本地授权文件；签名卡密在启动时验签一次，摘要不符时重写缓存。"""
 
         if not self.path.exists():
             return
@@ -59,10 +262,12 @@ class LicenseManager:
             logger.error("读取授权文件失败: {}", exc)
             return
 
-        key = str(data.get("key", "")).strip().upper()
+        key = str(data.get("key", "")).strip()
         expiry_str = str(data.get("expiry", "")).strip()
         if not key or not expiry_str:
             return
+        if not is_token(key):
+            key = key.upper()
 
         try:
             expiry = _parse_expiry(expiry_str)
@@ -70,15 +275,40 @@ class LicenseManager:
             logger.warning("授权文件中的日期格式不合法: {}", expiry_str)
             return
 
-        self._info = LicenseInfo(key=key, expiry=expiry)
+        info = LicenseInfo(
+            key=key,
+            expiry=expiry,
+            subject=str(data.get("subject") or ""),
+            scope=tuple(data.get("scope") or ()),
+        )
+        if is_token(key):
+            # 摘要可以被伪造，授权信息一律以验签后的卡密载荷为准
+            cached_digest = str(data.get("digest", ""))
+            try:
+                info = self.verifier.verify(key)
+            except LicenseError as exc:
+                logger.warning("授权文件中的卡密验证失败: {}", exc)
+                return
+            self._set_info(info)
+            if not hmac.compare_digest(cached_digest, self.verifier.cache_digest(info)):
+                # 授权文件被修改或验证密钥已更换，按验签结果重写缓存
+                self.save()
+            return
+        self._set_info(info)
 
     def save(self) -> None:
         """持久化当前授权信息。"""
 
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        payload = {}
+        payload: Dict[str, Any] = {}
         if self._info:
             payload = {"key": self._info.key, "expiry": self._info.expiry_date}
+            if is_token(self._info.key):
+                payload.update(
+                    subject=self._info.subject,
+                    scope=list(self._info.scope),
+                    digest=self.verifier.cache_digest(self._info),
+                )
 
         with self.path.open("w", encoding="utf-8") as fh:
             json.dump(payload, fh, ensure_ascii=False, indent=2)
@@ -88,22 +318,26 @@ class LicenseManager:
     def validate_key(self, key: str) -> LicenseInfo:
         """校验卡密并保存授权信息。"""
 
-        key = key.strip().upper()
+        key = key.strip()
         if not key:
             raise LicenseError("请输入卡密")
 
-        expiry_str = self.registry.get(key)
-        if not expiry_str:
-            raise LicenseError("卡密不存在或未授权")
+        if is_token(key):
+            info = self.verifier.verify(key)
+        else:
+            key = key.upper()
+            expiry_str = self.registry.lookup(key)
+            if not expiry_str:
+                raise LicenseError("卡密不存在或未授权")
+            info = LicenseInfo(key=key, expiry=_parse_expiry(expiry_str))
 
-        expiry = _parse_expiry(expiry_str)
-        if expiry < _now():
+        if info.expires_at < time.time():
             raise LicenseError("卡密已过期，请联系管理员续期")
 
-        self._info = LicenseInfo(key=key, expiry=expiry)
+        self._set_info(info)
         self.save()
-        logger.info("卡密 {} 验证通过，有效期至 {}", key, expiry_str)
-        return self._info
+        logger.info("卡密 {} 验证通过，有效期至 {}", info.subject, info.expiry_date)
+        return info
 
     # ---------------------------------------------------------------------
     @property
@@ -112,21 +346,23 @@ class LicenseManager:
 
     @property
     def is_valid(self) -> bool:
-        if not self._info:
-            return False
-        return self._info.expiry >= _now()
+        return self._expires_at >= time.time()
 
     @property
     def remaining_days(self) -> int:
-        if not self._info or not self.is_valid:
+        remaining = self._expires_at - time.time()
+        if remaining < 0:
             return 0
-        delta = self._info.expiry - _now()
-        return max(delta.days, 0)
+        return int(remaining // SECONDS_PER_DAY)
 
     def invalidate(self) -> None:
-        self._info = None
+        self._set_info(None)
         self.save()
 
+    def _set_info(self, info: Optional[LicenseInfo]) -> None:
+        self._info = info
+        self._expires_at = info.expires_at if info else 0.0
+
 
 def _parse_expiry(expiry_str: str) -> datetime:
     """将 yyyy-mm-dd 转换为时区感知的 datetime，并补至当日结束。"""
@@ -136,6 +372,9 @@ def _parse_expiry(expiry_str: str) -> datetime:
     return datetime(date.year, date.month, date.day, 23, 59, 59, tzinfo=timezone.utc)
 
 
-def _now() -> datetime:
-    return datetime.now(timezone.utc)
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
 
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
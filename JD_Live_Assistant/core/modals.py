@@ -0,0 +1,259 @@
+"""确认框自动确认模块。
+
+直播后台在讲解、结束等操作后可能弹出 Ant Design 确认框（``.ant-modal``、
+``.ant-popover`` / ``.ant-popconfirm``），且不只在第一次操作时出现。
+:class:`ModalAutoConfirmer` 在页面中安装一次 ``MutationObserver``：确认框出现
+（插入节点或由隐藏变为显示）时按规则点击主按钮，整个过程在页面内完成，
+Python 一侧无需轮询。每次确认或忽略都通过 ``expose_binding`` 回报，由任务线程
+记录日志。
+
+只有本程序点击“讲解”“结束”后的 ``window_seconds`` 秒内（见
+:meth:`ModalAutoConfirmer.arm`）出现的确认框才会自动确认，运营人员在后台手动
+操作时弹出的确认框（如删除商品）不受影响；点击时已经打开的确认框也不处理。
+任务结束时 :meth:`ModalAutoConfirmer.uninstall` 断开监视。
+
+规则（``settings.yaml`` 中的 ``modal`` 配置）::
+
+    modal:
+      auto_confirm: true
+      confirm_texts: ["确定", "确认"]        # 点击文本包含其一的主按钮
+      require_keywords: []                   # 非空时，确认框内容须包含其一才确认
+      ignore_keywords: ["结束直播", "下播"]  # 内容包含其一的确认框不自动确认
+      window_seconds: 15                     # 点击讲解/结束后自动确认的时间窗口
+
+页面刷新后由 ``add_init_script`` 重新安装，之后新建的 frame 同样生效。初始化脚本
+无法从页面中移除，每次任务都会留下一个；页面的 ``sessionStorage`` 中记录当前负责
+自动确认的绑定名称（刷新后仍保留），初始化脚本只在名称与自己一致时安装，
+:meth:`ModalAutoConfirmer.uninstall` 清除记录后，刷新页面也不会再安装已停止任务的监视。
+"""
+
+from __future__ import annotations
+
+import json
+import secrets
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Union
+
+from loguru import logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    from playwright.sync_api import Frame, Page
+
+DIALOG_SELECTOR = ".ant-modal, .ant-popover, .ant-popconfirm"
+EVENT_CONFIRMED = "confirmed"
+EVENT_IGNORED = "ignored"
+
+# 参数：{ binding, selector, confirmTexts, requireKeywords, ignoreKeywords }
+AUTO_CONFIRM_SCRIPT = """
+(config) => {
+    const STORE = '__jdlaModalObserver';
+    if (window[STORE]) {
+        window[STORE].disconnect();
+    }
+    // 只在 armedUntil 之前处理确认框，由 __jdlaModalArm 在本程序点击前设置
+    let armedUntil = 0;
+    const textOf = (node) => (node.textContent || '').replace(/\\s+/g, '');
+    const visible = (node) => node.getClientRects().length > 0;
+    const report = (event) => {
+        const binding = window[config.binding];
+        if (typeof binding === 'function') {
+            binding(event).catch(() => {});
+        }
+    };
+    const handle = (dialog) => {
+        if (Date.now() >= armedUntil || (dialog.__jdlaSkipUntil || 0) >= armedUntil) {
+            return;
+        }
+        // 同一个确认框（Ant Design 会复用节点）1 秒内只处理一次，再次弹出时重新处理
+        if (dialog.__jdlaHandledAt && Date.now() - dialog.__jdlaHandledAt < 1000) {
+            return;
+        }
+        const button = Array.from(dialog.querySelectorAll('button.ant-btn-primary')).find(
+            (node) => visible(node) && !node.disabled && config.confirmTexts.some((text) => textOf(node).includes(text))
+        );
+        if (!button) {
+            return;
+        }
+        const text = textOf(dialog);
+        const ignored = config.ignoreKeywords.find((keyword) => text.includes(keyword));
+        if (ignored) {
+            // 同一内容的确认框只回报一次
+            if (dialog.__jdlaIgnoredText !== text) {
+                dialog.__jdlaIgnoredText = text;
+                report({ event: 'ignored', keyword: ignored, text: text.slice(0, 120) });
+            }
+            return;
+        }
+        if (config.requireKeywords.length && !config.requireKeywords.some((keyword) => text.includes(keyword))) {
+            return;
+        }
+        dialog.__jdlaHandledAt = Date.now();
+        button.click();
+        report({ event: 'confirmed', button: textOf(button), text: text.slice(0, 120) });
+    };
+    const scan = (node, deep) => {
+        if (!node || node.nodeType !== 1) {
+            return;
+        }
+        const dialog = node.closest(config.selector);
+        if (dialog) {
+            handle(dialog);
+        }
+        // 样式变化只检查所在的确认框，新插入的节点才检查其子树
+        if (deep) {
+            node.querySelectorAll(config.selector).forEach(handle);
+        }
+    };
+    const observer = new MutationObserver((mutations) => {
+        for (const mutation of mutations) {
+            if (mutation.type === 'attributes') {
+                scan(mutation.target, false);
+            } else {
+                mutation.addedNodes.forEach((node) => scan(node, true));
+            }
+        }
+    });
+    observer.observe(document, { childList: true, subtree: true, attributes: true, attributeFilter: ['style', 'class'] });
+    window[STORE] = observer;
+    window.__jdlaModalArm = (ms) => {
+        armedUntil = Date.now() + ms;
+        // 点击前已经打开的确认框不是本次点击弹出的，本次时间窗口内不处理
+        document.querySelectorAll(config.selector).forEach((dialog) => {
+            if (visible(dialog)) {
+                dialog.__jdlaSkipUntil = armedUntil;
+            }
+        });
+    };
+}
+"""
+
+# sessionStorage 中记录当前自动确认绑定名称的键；空字符串表示已移除
+OWNER_KEY = "__jdlaModalOwner"
+
+# 初始化脚本：只有当前任务的绑定才安装；从未记录过的新 frame（如新打开的跨域 frame）同样安装
+INIT_SCRIPT = """
+(config) => {
+    let owner = null;
+    try {
+        owner = window.sessionStorage.getItem('""" + OWNER_KEY + """');
+    } catch (error) {
+        // 沙箱 frame 中无法访问 sessionStorage，按新 frame 处理
+    }
+    if (owner === config.binding || (owner === null && window !== window.top)) {
+        (""" + AUTO_CONFIRM_SCRIPT + """)(config);
+    }
+}
+"""
+
+# 参数同 AUTO_CONFIRM_SCRIPT；记录当前绑定后安装
+CLAIM_SCRIPT = """
+(config) => {
+    try {
+        window.sessionStorage.setItem('""" + OWNER_KEY + """', config.binding);
+    } catch (error) {
+    }
+    (""" + AUTO_CONFIRM_SCRIPT + """)(config);
+}
+"""
+
+ARM_SCRIPT = """
+(ms) => {
+    if (typeof window.__jdlaModalArm === 'function') {
+        window.__jdlaModalArm(ms);
+    }
+}
+"""
+
+UNINSTALL_SCRIPT = """
+() => {
+    try {
+        window.sessionStorage.setItem('""" + OWNER_KEY + """', '');
+    } catch (error) {
+    }
+    if (window.__jdlaModalObserver) {
+        window.__jdlaModalObserver.disconnect();
+    }
+    delete window.__jdlaModalObserver;
+    delete window.__jdlaModalArm;
+}
+"""
+
+
+@dataclass
+class ModalRules:
+    """自动确认规则。"""
+
+    confirm_texts: List[str] = field(default_factory=lambda: ["确定", "确认"])
+    require_keywords: List[str] = field(default_factory=list)
+    ignore_keywords: List[str] = field(default_factory=list)
+    # 点击讲解/结束后自动确认的秒数
+    window_seconds: float = 15.0
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "ModalRules":
+        defaults = cls()
+        return cls(
+            confirm_texts=list(config.get("confirm_texts") or defaults.confirm_texts),
+            require_keywords=list(config.get("require_keywords") or []),
+            ignore_keywords=list(config.get("ignore_keywords") or []),
+            window_seconds=float(config.get("window_seconds", defaults.window_seconds)),
+        )
+
+
+class ModalAutoConfirmer:
+    """在页面中安装确认框自动确认脚本，并接收确认结果。"""
+
+    def __init__(self, rules: ModalRules, on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
+        self.rules = rules
+        self.on_event = on_event
+        self.confirmed = 0
+        # 每次安装使用新的绑定名称，避免与之前连接留在页面中的同名函数冲突
+        self.binding = f"__jdlaModalReport_{secrets.token_hex(4)}"
+        self._installed = False
+
+    def install(self, page: Page) -> None:
+        """在页面（含所有 frame）中安装自动确认脚本，页面刷新后自动重新安装。
+
+        同一个实例只注册一次绑定与初始化脚本，重复调用时只在各 frame 中重新执行。
+        之前任务留在页面中的初始化脚本在刷新后不再生效（见模块说明）。
+        """
+
+        arg = {
+            "binding": self.binding,
+            "selector": DIALOG_SELECTOR,
+            "confirmTexts": self.rules.confirm_texts,
+            "requireKeywords": self.rules.require_keywords,
+            "ignoreKeywords": self.rules.ignore_keywords,
+        }
+        if not self._installed:
+            page.expose_binding(self.binding, lambda source, event: self._report(event))
+            page.add_init_script(f"({INIT_SCRIPT})({json.dumps(arg, ensure_ascii=False)})")
+            self._installed = True
+        self._run_in_frames(page, CLAIM_SCRIPT, arg, "安装自动确认")
+
+    def arm(self, ctx: Union[Page, Frame]) -> None:
+        """本程序点击讲解/结束前调用：之后 ``window_seconds`` 秒内弹出的确认框自动确认。"""
+
+        if self._installed:
+            # 确认框可能出现在点击所在 frame 以外的文档中，所有 frame 都开启
+            page = getattr(ctx, "page", ctx)
+            self._run_in_frames(page, ARM_SCRIPT, self.rules.window_seconds * 1000, "开启自动确认")
+
+    def uninstall(self, page: Page) -> None:
+        """断开页面（含所有 frame）中的监视并清除记录，任务结束后（包括刷新页面后）不再自动确认。"""
+
+        if self._installed:
+            self._run_in_frames(page, UNINSTALL_SCRIPT, None, "移除自动确认")
+
+    def _run_in_frames(self, page: Page, script: str, arg: Any, action: str) -> None:
+        for frame in page.frames:
+            try:
+                frame.evaluate(script, arg)
+            except Exception as exc:  # noqa: BLE001 - 跨域或正在销毁的 frame
+                logger.debug("frame {} {}失败: {}", frame.url, action, exc)
+
+    def _report(self, event: Dict[str, Any]) -> None:
+        if event.get("event") == EVENT_CONFIRMED:
+            self.confirmed += 1
+        if self.on_event is not None:
+            self.on_event(event)
@@ -0,0 +1,258 @@
+"""弹幕监控模块，通过 CDP 捕获直播页面的 WebSocket 帧并解析评论。
+
+评论不从 DOM 中抓取，而是订阅 ``Network.webSocketFrameReceived`` 事件，
+直接解码直播间推送的消息帧。解析出的评论放入有界队列，由独立的分发线程
+交给监听者（关键词提醒、互动统计等）处理。
+
+线程模型：
+
+- ``comment-cdp``：持有独立的 :class:`BrowserController` 连接，订阅 CDP 事件并
+  周期性 ``pump`` 事件循环（Playwright 同步 API 不能跨线程使用）；
+- ``comment-dispatch``：从队列中取出评论并调用监听者。
+
+队列写满时丢弃最旧的评论并计数，保证 CDP 事件线程永远不会被阻塞。
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from loguru import logger
+
+from .automation import BrowserController
+
+DEFAULT_TEXT_FIELDS = ("content", "msg", "text", "message", "comment")
+DEFAULT_USER_FIELDS = ("nickName", "nickname", "userName", "uname", "name")
+DEFAULT_UID_FIELDS = ("uid", "userId", "pin", "openId")
+MAX_DECODE_DEPTH = 4
+
+
+@dataclass(frozen=True)
+class Comment:
+    """一条直播间评论。"""
+
+    text: str
+    user: str = ""
+    user_id: str = ""
+    timestamp: float = 0.0
+
+
+class CommentDecoder:
+    """将 WebSocket 帧解码为评论列表。
+
+    京东直播间推送的是 JSON 文本帧，评论可能位于嵌套的 ``data``/``list`` 字段中。
+    解码器在有限深度内查找同时包含文本字段的对象，字段名可通过配置调整。
+    """
+
+    def __init__(
+        self,
+        text_fields: Sequence[str] = DEFAULT_TEXT_FIELDS,
+        user_fields: Sequence[str] = DEFAULT_USER_FIELDS,
+        uid_fields: Sequence[str] = DEFAULT_UID_FIELDS,
+    ) -> None:
+        self.text_fields = tuple(text_fields)
+        self.user_fields = tuple(user_fields)
+        self.uid_fields = tuple(uid_fields)
+        # 在 json.loads 之前按字段名快速过滤无关帧（心跳、礼物等）
+        self._markers = self.text_fields
+
+    def decode(self, payload: str, opcode: int = 1) -> List[Comment]:
+        if opcode == 2:
+            try:
+                payload = base64.b64decode(payload).decode("utf-8")
+            except (ValueError, UnicodeDecodeError):
+                return []
+        if not payload or not any(marker in payload for marker in self._markers):
+            return []
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return []
+
+        now = time.time()
+        comments: List[Comment] = []
+        self._collect(data, now, comments, 0)
+        return comments
+
+    def _collect(self, node: Any, now: float, out: List[Comment], depth: int) -> None:
+        if depth > MAX_DECODE_DEPTH:
+            return
+        if isinstance(node, list):
+            for child in node:
+                self._collect(child, now, out, depth + 1)
+            return
+        if not isinstance(node, dict):
+            return
+
+        text = _first_str(node, self.text_fields)
+        if text:
+            out.append(
+                Comment(
+                    text=text,
+                    user=_first_str(node, self.user_fields),
+                    user_id=_first_str(node, self.uid_fields),
+                    timestamp=now,
+                )
+            )
+            return
+        for value in node.values():
+            if isinstance(value, str) and value[:1] in ("{", "["):
+                # 部分消息体是二次序列化的 JSON 字符串
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    continue
+            if isinstance(value, (dict, list)):
+                self._collect(value, now, out, depth + 1)
+
+
+def _first_str(node: Dict[str, Any], fields: Iterable[str]) -> str:
+    for name in fields:
+        value = node.get(name)
+        if isinstance(value, (str, int)) and str(value).strip():
+            return str(value).strip()
+    return ""
+
+
+class CommentMonitor:
+    """直播间评论监控器。"""
+
+    def __init__(
+        self,
+        maxsize: int = 5000,
+        decoder: Optional[CommentDecoder] = None,
+        url_keyword: str = "",
+        pump_interval_ms: int = 100,
+    ) -> None:
+        """
+        初始化评论监控器。
+
+        Args:
+            maxsize: 评论队列容量，写满时丢弃最旧的评论
+            decoder: 帧解码器，默认按常见字段名解析 JSON
+            url_keyword: 仅处理 URL 中包含该关键字的 WebSocket 连接，为空时处理全部
+            pump_interval_ms: CDP 事件线程每次让出事件循环的时长（毫秒）
+        """
+        self.decoder = decoder or CommentDecoder()
+        self.url_keyword = url_keyword
+        self.pump_interval_ms = pump_interval_ms
+        self._queue: "queue.Queue[Comment]" = queue.Queue(maxsize=maxsize)
+        self._listeners: List[Callable[[Comment], None]] = []
+        self._sockets: Dict[str, str] = {}
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.frames_received = 0
+        self.comments_received = 0
+        self.comments_dropped = 0
+
+    def add_listener(self, listener: Callable[[Comment], None]) -> None:
+        """注册评论监听者，在分发线程中按顺序调用。"""
+
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Comment], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    @property
+    def is_running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self, port: int) -> None:
+        """连接调试端口并开始监控。"""
+
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, args=(port,), name="comment-cdp", daemon=True),
+            threading.Thread(target=self._dispatch_loop, name="comment-dispatch", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info("弹幕监控已启动: 端口 {}", port)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        if not self._threads:
+            return
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        logger.info(
+            "弹幕监控已停止: 帧 {}，评论 {}，丢弃 {}",
+            self.frames_received,
+            self.comments_received,
+            self.comments_dropped,
+        )
+
+    # ------------------------------------------------------------------
+    def _capture_loop(self, port: int) -> None:
+        controller = BrowserController()
+        try:
+            controller.connect(port)
+            session = controller.new_cdp_session()
+            session.on("Network.webSocketCreated", self._on_socket_created)
+            session.on("Network.webSocketClosed", self._on_socket_closed)
+            session.on("Network.webSocketFrameReceived", self._on_frame)
+            session.send("Network.enable")
+            while not self._stop_event.is_set():
+                controller.pump(self.pump_interval_ms)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("弹幕监控异常退出")
+            if not self._stop_event.is_set():
+                logger.error("弹幕监控已中断: {}", exc)
+        finally:
+            controller.disconnect()
+
+    def _on_socket_created(self, params: Dict[str, Any]) -> None:
+        self._sockets[params.get("requestId", "")] = params.get("url", "")
+
+    def _on_socket_closed(self, params: Dict[str, Any]) -> None:
+        self._sockets.pop(params.get("requestId", ""), None)
+
+    def _on_frame(self, params: Dict[str, Any]) -> None:
+        if self.url_keyword:
+            url = self._sockets.get(params.get("requestId", ""))
+            # 监控启动前已建立的连接没有 URL 记录，此时不做过滤
+            if url is not None and self.url_keyword not in url:
+                return
+        self.frames_received += 1
+        response = params.get("response") or {}
+        comments = self.decoder.decode(response.get("payloadData", ""), int(response.get("opcode", 1)))
+        for comment in comments:
+            self._enqueue(comment)
+
+    def _enqueue(self, comment: Comment) -> None:
+        self.comments_received += 1
+        while True:
+            try:
+                self._queue.put_nowait(comment)
+                return
+            except queue.Full:
+                # 背压：丢弃最旧的评论，保证最新评论及时送达
+                try:
+                    self._queue.get_nowait()
+                    self.comments_dropped += 1
+                    if self.comments_dropped % 1000 == 1:
+                        logger.warning("评论处理跟不上，已丢弃 {} 条旧评论", self.comments_dropped)
+                except queue.Empty:
+                    pass
+
+    def _dispatch_loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                comment = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            for listener in list(self._listeners):
+                try:
+                    listener(comment)
+                except Exception:  # noqa: BLE001
+                    logger.exception("评论监听者处理失败")
@@ -0,0 +1,293 @@
+"""讲解播放列表模块，负责加载播放列表并编译为讲解队列。
+
+播放列表支持 YAML 与 CSV 两种格式，每一项包含：
+
+- ``sku``：商品 SKU（必填）；
+- ``duration``：讲解时长/秒（可选，缺省使用界面中的讲解时间）；
+- ``material``：素材覆盖，本地图片路径或图片 URL（可选），相对路径以播放列表文件所在目录为基准；
+- ``priority``：优先级，数值越大越靠前（可选，默认 0）。
+
+YAML 示例::
+
+    items:
+      - sku: "100012345678"
+        duration: 20
+        priority: 10
+      - sku: "100087654321"
+        material: "D:/素材/爆款.jpg"
+
+CSV 示例（首行为表头）::
+
+    sku,duration,material,priority
+    100012345678,20,,10
+"""
+
+from __future__ import annotations
+
+import csv
+import random
+from collections import deque
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+import yaml
+from loguru import logger
+
+
+ORDER_SEQUENTIAL = "sequential"
+ORDER_SHUFFLE = "shuffle"
+ORDER_WEIGHTED = "weighted"
+ORDERS = (ORDER_SEQUENTIAL, ORDER_SHUFFLE, ORDER_WEIGHTED)
+
+
+class PlaylistError(Exception):
+    """播放列表格式异常。"""
+
+
+@dataclass(frozen=True)
+class PlaylistEntry:
+    """播放列表中的一项配置。"""
+
+    sku: str
+    duration: Optional[float] = None
+    material: Optional[str] = None
+    priority: int = 0
+
+
+@dataclass(frozen=True)
+class PlaylistStep:
+    """编译后的讲解步骤。"""
+
+    sku: str
+    item_index: Any
+    duration: float
+    material: Optional[str] = None
+    priority: int = 0
+
+    @property
+    def label(self) -> str:
+        return f"编号 {self.item_index if self.item_index is not None else '无编号'} (SKU: {self.sku})"
+
+
+def item_index_key(item: Mapping[str, Any]) -> Tuple[int, Any]:
+    """按商品编号升序排序的键：数字编号在前，无法解析的编号其次，无编号最后。"""
+
+    item_index = item.get("itemIndex")
+    if isinstance(item_index, (int, float)):
+        return (0, item_index)
+    if isinstance(item_index, str):
+        try:
+            return (0, int(item_index))
+        except ValueError:
+            return (1, item_index)
+    return (2, 0)
+
+
+class ExplanationQueue:
+    """讲解队列，按编译好的顺序逐个取出步骤，每步 O(1)。"""
+
+    def __init__(self, steps: Iterable[PlaylistStep] = ()) -> None:
+        self._steps: Deque[PlaylistStep] = deque(steps)
+
+    def next(self) -> Optional[PlaylistStep]:
+        """取出下一个讲解步骤，队列为空时返回 None。"""
+
+        return self._steps.popleft() if self._steps else None
+
+    def push_front(self, step: PlaylistStep) -> None:
+        """将步骤插回队首（用于重试或插播）。"""
+
+        self._steps.appendleft(step)
+
+    def promote(self, sku: str) -> bool:
+        """将队列中指定 SKU 的步骤移到队首，SKU 不在队列中时返回 False。"""
+
+        for position, step in enumerate(self._steps):
+            if step.sku == sku:
+                if position:
+                    del self._steps[position]
+                    self._steps.appendleft(step)
+                return True
+        return False
+
+    def update(self, func: Callable[[PlaylistStep], PlaylistStep]) -> None:
+        """用 ``func`` 的结果替换队列中的每个步骤，顺序不变。"""
+
+        self._steps = deque(func(step) for step in self._steps)
+
+    def peek(self) -> Optional[PlaylistStep]:
+        return self._steps[0] if self._steps else None
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    def __iter__(self) -> Iterator[PlaylistStep]:
+        return iter(self._steps)
+
+
+class Playlist:
+    """讲解播放列表，加载一次后可多次与商品快照合并编译。"""
+
+    def __init__(self, entries: Iterable[PlaylistEntry] = (), include_unlisted: bool = True) -> None:
+        self.entries: List[PlaylistEntry] = list(entries)
+        self.include_unlisted = include_unlisted
+        self._by_sku: Dict[str, PlaylistEntry] = {entry.sku: entry for entry in self.entries}
+        # 按优先级降序、文件顺序升序预先排好，编译时无需再次排序
+        self._ordered: List[PlaylistEntry] = [
+            entry
+            for _, entry in sorted(enumerate(self.entries), key=lambda pair: (-pair[1].priority, pair[0]))
+        ]
+
+    @classmethod
+    def load(cls, path: Path, include_unlisted: bool = True) -> "Playlist":
+        """从 YAML 或 CSV 文件加载播放列表。"""
+
+        if not path.exists():
+            raise PlaylistError(f"播放列表文件不存在：{path}")
+
+        if path.suffix.lower() == ".csv":
+            with path.open("r", encoding="utf-8-sig", newline="") as fh:
+                rows: List[Dict[str, Any]] = list(csv.DictReader(fh))
+        else:
+            with path.open("r", encoding="utf-8") as fh:
+                data = yaml.safe_load(fh) or []
+            if isinstance(data, dict):
+                data = data.get("items", [])
+            if not isinstance(data, list):
+                raise PlaylistError("播放列表格式错误：应为列表或包含 items 的映射")
+            rows = data
+
+        entries: List[PlaylistEntry] = []
+        seen: set = set()
+        for line_no, row in enumerate(rows, start=1):
+            entry = _parse_entry(row, line_no, path.parent)
+            if entry.sku in seen:
+                logger.warning("播放列表第 {} 项 SKU {} 重复，已忽略", line_no, entry.sku)
+                continue
+            seen.add(entry.sku)
+            entries.append(entry)
+
+        logger.info("加载播放列表 {}：共 {} 项", path, len(entries))
+        return cls(entries, include_unlisted=include_unlisted)
+
+    def compile(
+        self,
+        goods: Iterable[Mapping[str, Any]],
+        default_duration: float,
+        order: str = ORDER_SEQUENTIAL,
+        avoid_first: Optional[str] = None,
+        rng: Optional[random.Random] = None,
+    ) -> ExplanationQueue:
+        """将播放列表与当前商品快照合并，生成讲解队列。
+
+        播放列表中的商品按优先级排在前面；其余商品（``include_unlisted`` 为真时）
+        按商品编号升序追加在后。快照中不存在的播放列表项会被跳过。
+
+        ``order`` 为 ``shuffle`` 时随机打乱顺序；为 ``weighted`` 时按优先级加权随机，
+        优先级越高越可能靠前。``avoid_first`` 指定的 SKU 不会排在队首，
+        用于循环模式下避免同一商品连续讲解两次。
+        """
+
+        by_sku: Dict[str, Mapping[str, Any]] = {}
+        for item in goods:
+            sku = str(item.get("sku") or "")
+            if sku and sku not in by_sku:
+                by_sku[sku] = item
+
+        steps: List[PlaylistStep] = []
+        listed: set = set()
+        missing: List[str] = []
+        for entry in self._ordered:
+            item = by_sku.get(entry.sku)
+            if item is None:
+                missing.append(entry.sku)
+                continue
+            listed.add(entry.sku)
+            steps.append(self.step_for(item, default_duration))
+
+        if self.include_unlisted:
+            unlisted = sorted((item for sku, item in by_sku.items() if sku not in listed), key=item_index_key)
+            steps.extend(self.step_for(item, default_duration) for item in unlisted)
+
+        if missing:
+            logger.warning("播放列表中有 {} 个 SKU 不在当前商品列表中: {}", len(missing), ", ".join(missing[:10]))
+        steps = _reorder(steps, order, rng or random)
+        if avoid_first and len(steps) > 1 and steps[0].sku == avoid_first:
+            steps.append(steps.pop(0))
+        return ExplanationQueue(steps)
+
+    def step_for(self, item: Mapping[str, Any], default_duration: float) -> PlaylistStep:
+        """为快照中的单个商品生成讲解步骤，播放列表中有配置时使用其时长与素材。"""
+
+        sku = str(item.get("sku") or "")
+        entry = self._by_sku.get(sku)
+        if entry is None:
+            return PlaylistStep(sku=sku, item_index=item.get("itemIndex"), duration=default_duration)
+        return PlaylistStep(
+            sku=sku,
+            item_index=item.get("itemIndex"),
+            duration=entry.duration or default_duration,
+            material=entry.material,
+            priority=entry.priority,
+        )
+
+    def retime(self, queue: ExplanationQueue, default_duration: float) -> None:
+        """默认讲解时长变化后，更新队列中未在播放列表中单独指定时长的步骤。"""
+
+        def retimed(step: PlaylistStep) -> PlaylistStep:
+            entry = self._by_sku.get(step.sku)
+            if entry is not None and entry.duration:
+                return step
+            return replace(step, duration=default_duration)
+
+        queue.update(retimed)
+
+
+def _reorder(steps: List[PlaylistStep], order: str, rng: Any) -> List[PlaylistStep]:
+    if order == ORDER_SHUFFLE:
+        rng.shuffle(steps)
+    elif order == ORDER_WEIGHTED:
+        # 加权无放回抽样（Efraimidis-Spirakis）：按 u^(1/w) 降序排列
+        steps.sort(key=lambda step: rng.random() ** (1.0 / (max(step.priority, 0) + 1)), reverse=True)
+    elif order != ORDER_SEQUENTIAL:
+        logger.warning("未知的讲解顺序 {}，按顺序讲解", order)
+    return steps
+
+
+def _parse_entry(row: Any, line_no: int, base_dir: Path) -> PlaylistEntry:
+    if not isinstance(row, Mapping):
+        # 允许 YAML 中直接写 SKU 字符串
+        if isinstance(row, (str, int)):
+            return PlaylistEntry(sku=str(row).strip())
+        raise PlaylistError(f"播放列表第 {line_no} 项格式错误")
+
+    sku = str(row.get("sku") or "").strip()
+    if not sku:
+        raise PlaylistError(f"播放列表第 {line_no} 项缺少 sku")
+
+    duration: Optional[float] = None
+    raw_duration = row.get("duration")
+    if raw_duration not in (None, ""):
+        try:
+            duration = float(raw_duration)
+        except (TypeError, ValueError) as exc:
+            raise PlaylistError(f"播放列表第 {line_no} 项 duration 不是数字") from exc
+        if duration <= 0:
+            raise PlaylistError(f"播放列表第 {line_no} 项 duration 必须大于 0")
+
+    priority = 0
+    raw_priority = row.get("priority")
+    if raw_priority not in (None, ""):
+        try:
+            priority = int(raw_priority)
+        except (TypeError, ValueError) as exc:
+            raise PlaylistError(f"播放列表第 {line_no} 项 priority 不是整数") from exc
+
+    material = str(row.get("material") or "").strip() or None
+    if material and urlparse(material).scheme not in ("http", "https"):
+        # 本地素材的相对路径相对于播放列表文件，而不是程序的工作目录
+        source = Path(material).expanduser()
+        material = str(source if source.is_absolute() else base_dir / source)
+    return PlaylistEntry(sku=sku, duration=duration, material=material, priority=priority)
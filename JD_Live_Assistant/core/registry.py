@@ -0,0 +1,260 @@
+"""卡密注册表：查询接口、存储后端与文件格式。
+
+:class:`LicenseManager` 通过 :class:`KeyRegistry` 接口按卡密查询到期日，后端包括：
+
+- :class:`DictRegistry`：源码中的小型字典（``DEFAULT_KEY_REGISTRY``）；
+- :class:`SqliteRegistry`：SQLite 文件，主键点查；
+- :class:`SortedFileRegistry`：有序二进制文件，内存映射后二分查找；
+- :class:`ChainRegistry`：按顺序查询多个注册表。
+
+文件后端在第一次查询时才打开，启动时不加载任何卡密，卡密数量对内存与启动
+时间没有影响。大批量发放的注册表卡密导出为以下两种文件之一：
+
+- SQLite 注册表（``.sqlite`` / ``.db``）：``keys(key TEXT PRIMARY KEY, expiry TEXT)``，
+  ``WITHOUT ROWID`` 表，按主键点查；
+- 有序二进制注册表（``.jdkr``）：定长记录按卡密升序排列，可内存映射后二分查找。
+
+二进制格式::
+
+    头部  magic(8) | key_size(uint16) | record_size(uint16) | count(uint32)   小端
+    记录  key(key_size 字节，ASCII 大写，右侧补 0) | expiry(uint32，自 1970-01-01 起的天数)
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from loguru import logger
+
+REGISTRY_MAGIC = b"JDKREG1\x00"
+HEADER = struct.Struct("<8sHHI")
+EXPIRY = struct.Struct("<I")
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+Entry = Tuple[str, str]
+
+
+class RegistryFormatError(Exception):
+    """注册表文件格式错误。"""
+
+
+def encode_expiry(expiry_date: str) -> int:
+    """``YYYY-MM-DD`` -> 自 1970-01-01 起的天数。"""
+
+    return datetime.strptime(expiry_date, "%Y-%m-%d").date().toordinal() - EPOCH_ORDINAL
+
+
+def decode_expiry(days: int) -> str:
+    return date.fromordinal(days + EPOCH_ORDINAL).isoformat()
+
+
+def is_sqlite_path(path: Path) -> bool:
+    return path.suffix.lower() in SQLITE_SUFFIXES
+
+
+def write_registry(path: Path, entries: Iterable[Entry]) -> int:
+    """按文件后缀写出 SQLite 或有序二进制注册表，返回写入的卡密数量。"""
+
+    if is_sqlite_path(path):
+        return write_sqlite_registry(path, entries)
+    return write_sorted_registry(path, list(entries))
+
+
+def write_sorted_registry(path: Path, entries: Sequence[Entry]) -> int:
+    """写出有序二进制注册表，重复的卡密只保留最后一次出现的到期日。"""
+
+    records = {}
+    for key, expiry_date in entries:
+        records[key.strip().upper().encode("ascii")] = encode_expiry(expiry_date)
+    ordered: List[bytes] = sorted(records)
+    key_size = max((len(key) for key in ordered), default=1)
+    record_size = key_size + EXPIRY.size
+    if key_size > 0xFFFF or len(ordered) > 0xFFFFFFFF:
+        raise RegistryFormatError("卡密过长或数量超出注册表容量")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with tmp_path.open("wb") as fh:
+        fh.write(HEADER.pack(REGISTRY_MAGIC, key_size, record_size, len(ordered)))
+        chunk: List[bytes] = []
+        for key in ordered:
+            chunk.append(key.ljust(key_size, b"\x00") + EXPIRY.pack(records[key]))
+            if len(chunk) >= 65536:
+                fh.write(b"".join(chunk))
+                chunk.clear()
+        fh.write(b"".join(chunk))
+    os.replace(tmp_path, path)
+    return len(ordered)
+
+
+def write_sqlite_registry(path: Path, entries: Iterable[Entry], batch_size: int = 50000) -> int:
+    """写出（或追加到）SQLite 注册表，已存在的卡密以新的到期日覆盖。"""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("CREATE TABLE IF NOT EXISTS keys (key TEXT PRIMARY KEY, expiry TEXT NOT NULL) WITHOUT ROWID")
+        written = 0
+        batch: List[Entry] = []
+        for key, expiry_date in entries:
+            encode_expiry(expiry_date)
+            batch.append((key.strip().upper(), expiry_date))
+            if len(batch) >= batch_size:
+                conn.executemany("INSERT OR REPLACE INTO keys (key, expiry) VALUES (?, ?)", batch)
+                written += len(batch)
+                batch.clear()
+        conn.executemany("INSERT OR REPLACE INTO keys (key, expiry) VALUES (?, ?)", batch)
+        written += len(batch)
+        conn.commit()
+    finally:
+        conn.close()
+    return written
+
+
+class KeyRegistry:
+    """卡密注册表接口。"""
+
+    def lookup(self, key: str) -> Optional[str]:
+        """返回卡密（已转为大写）对应的到期日 ``YYYY-MM-DD``，不存在时返回 None。"""
+
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """释放文件句柄，之后再次查询会重新打开。"""
+
+
+class DictRegistry(KeyRegistry):
+    """基于字典的注册表，不复制字典；只有存在非大写的卡密时才在首次查询时建立索引。"""
+
+    def __init__(self, mapping: Mapping[str, str]) -> None:
+        self._mapping = mapping
+        self._normalized: Optional[Mapping[str, str]] = None
+
+    def lookup(self, key: str) -> Optional[str]:
+        if self._normalized is None:
+            if all(k == k.upper() for k in self._mapping):
+                self._normalized = self._mapping
+            else:
+                self._normalized = {k.upper(): v for k, v in self._mapping.items()}
+        return self._normalized.get(key)
+
+
+class SqliteRegistry(KeyRegistry):
+    """SQLite 注册表，只读打开，按主键点查。"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Optional[str]:
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            row = self._conn.execute("SELECT expiry FROM keys WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class SortedFileRegistry(KeyRegistry):
+    """有序二进制注册表，内存映射后二分查找，每次查询 O(log n) 次定长读取。"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._map: Optional[mmap.mmap] = None
+        self._key_size = 0
+        self._record_size = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Optional[str]:
+        try:
+            target = key.encode("ascii")
+        except UnicodeEncodeError:
+            return None
+        with self._lock:
+            data = self._open()
+            if len(target) > self._key_size:
+                return None
+            target = target.ljust(self._key_size, b"\x00")
+            low, high = 0, self._count
+            while low < high:
+                middle = (low + high) // 2
+                offset = HEADER.size + middle * self._record_size
+                current = data[offset : offset + self._key_size]
+                if current < target:
+                    low = middle + 1
+                elif current > target:
+                    high = middle
+                else:
+                    (days,) = EXPIRY.unpack_from(data, offset + self._key_size)
+                    return decode_expiry(days)
+        return None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+    def _open(self) -> mmap.mmap:
+        if self._map is not None:
+            return self._map
+        with self.path.open("rb") as fh:
+            data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, key_size, record_size, count = HEADER.unpack_from(data, 0)
+        if magic != REGISTRY_MAGIC or record_size != key_size + EXPIRY.size:
+            data.close()
+            raise RegistryFormatError(f"不是有效的卡密注册表文件：{self.path}")
+        if len(data) < HEADER.size + count * record_size:
+            data.close()
+            raise RegistryFormatError(f"卡密注册表文件不完整：{self.path}")
+        self._map, self._key_size, self._record_size, self._count = data, key_size, record_size, count
+        return data
+
+
+class ChainRegistry(KeyRegistry):
+    """依次查询多个注册表，返回第一个命中的结果；单个注册表出错时跳过。"""
+
+    def __init__(self, *registries: KeyRegistry) -> None:
+        self.registries = list(registries)
+
+    def lookup(self, key: str) -> Optional[str]:
+        for registry in self.registries:
+            try:
+                expiry = registry.lookup(key)
+            except (OSError, sqlite3.Error, RegistryFormatError, struct.error) as exc:
+                logger.error("查询卡密注册表失败: {}", exc)
+                continue
+            if expiry:
+                return expiry
+        return None
+
+    def close(self) -> None:
+        for registry in self.registries:
+            registry.close()
+
+
+def open_registry(source: Union[KeyRegistry, Mapping[str, str], Path]) -> KeyRegistry:
+    """将字典、注册表文件路径或已有注册表统一为 :class:`KeyRegistry`（文件延迟打开）。"""
+
+    if isinstance(source, KeyRegistry):
+        return source
+    if isinstance(source, Path):
+        return SqliteRegistry(source) if is_sqlite_path(source) else SortedFileRegistry(source)
+    return DictRegistry(source)
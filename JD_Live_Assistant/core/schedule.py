@@ -1,51 +1,226 @@
-"""定时任务管理模块，基于 APScheduler 实现。"""
+"""定时任务管理模块，基于 APScheduler 实现。
+
+定时任务保存在应用目录下的 SQLite 任务库中，程序重启后依然有效。持久化
+任务不能直接引用界面对象的方法（无法序列化），因此统一通过模块级的
+:func:`run_action` 按名称分发到已注册的动作。
+
+错过触发时间（程序未运行、电脑休眠）的任务在 ``misfire_grace_time`` 秒内
+恢复时会立即补执行一次；多次错过的触发会合并为一次（``coalesce``），
+同一任务同时最多只运行一个实例。这两项可在运行中通过 :meth:`ScheduleManager.configure`
+修改，任务库中已有的任务会一并更新。
+
+APScheduler 在第一次使用调度器时才导入，不影响程序启动速度。
+"""
 
 from __future__ import annotations
 
-from datetime import time
-from typing import Callable, Dict, Optional
+from contextlib import contextmanager
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Union
 
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
 from loguru import logger
 
+if TYPE_CHECKING:  # pragma: no cover
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.triggers.base import BaseTrigger
+
+TIMEZONE = "Asia/Shanghai"
+# 持久化任务统一引用该函数，由其按名称分发到已注册的动作
+ACTION_REF = f"{__name__}:run_action"
+VOLATILE_STORE = "volatile"
+
+_ACTIONS: Dict[str, Callable[..., None]] = {}
+
+
+def register_action(name: str, func: Callable[..., None]) -> None:
+    """注册可被定时任务调用的动作。"""
+
+    _ACTIONS[name] = func
+
+
+def run_action(name: str, **params: Any) -> None:
+    """定时任务入口：执行名称对应的动作。"""
+
+    func = _ACTIONS.get(name)
+    if func is None:
+        logger.warning("定时任务动作 {} 未注册，已跳过", name)
+        return
+    logger.info("执行定时任务动作: {} {}", name, params or "")
+    func(**params)
+
 
 class ScheduleManager:
     """包装 APScheduler，提供简单的定时任务管理接口。"""
 
-    def __init__(self) -> None:
-        self._scheduler = BackgroundScheduler(timezone="Asia/Shanghai")
-        self._jobs: Dict[str, str] = {}
+    def __init__(
+        self,
+        store_path: Optional[Path] = None,
+        misfire_grace_time: int = 300,
+        coalesce: bool = True,
+    ) -> None:
+        """
+        初始化调度器。
+
+        Args:
+            store_path: SQLite 任务库路径，为空时任务只保存在内存中
+            misfire_grace_time: 错过触发时间后仍允许补执行的秒数
+            coalesce: 多次错过的触发是否合并为一次
+        """
+        self.store_path = store_path
+        self.misfire_grace_time = misfire_grace_time
+        self.coalesce = coalesce
+
+    @cached_property
+    def _scheduler(self) -> BackgroundScheduler:
+        from apscheduler.jobstores.memory import MemoryJobStore
+        from apscheduler.schedulers.background import BackgroundScheduler
+
+        try:  # SQLAlchemy 为可选依赖，缺失时退化为内存任务库
+            from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+        except ImportError:  # pragma: no cover - 依赖缺失时不持久化
+            SQLAlchemyJobStore = None  # type: ignore[assignment,misc]
+
+        jobstores: Dict[str, Any] = {VOLATILE_STORE: MemoryJobStore()}
+        if self.store_path is not None and SQLAlchemyJobStore is not None:
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            jobstores["default"] = SQLAlchemyJobStore(url=f"sqlite:///{self.store_path.as_posix()}")
+            logger.debug("定时任务库: {}", self.store_path)
+        else:
+            if self.store_path is not None:
+                logger.warning("未安装 SQLAlchemy，定时任务将不会持久化")
+            jobstores["default"] = MemoryJobStore()
+
+        return BackgroundScheduler(
+            timezone=TIMEZONE,
+            jobstores=jobstores,
+            job_defaults={
+                "misfire_grace_time": self.misfire_grace_time,
+                "coalesce": self.coalesce,
+                "max_instances": 1,
+            },
+        )
 
     def start(self) -> None:
         if not self._scheduler.running:
             logger.debug("启动定时任务调度器")
             self._scheduler.start()
 
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """在暂停处理任务期间登记/移除任务，退出时恢复；尚未启动时以暂停状态启动。
+
+        程序启动时任务库中可能留有已关闭或已变更的任务，先调整再开始处理，
+        这些任务不会在 misfire 宽限期内误触发一次。
+        """
+
+        if self._scheduler.running:
+            self._scheduler.pause()
+        else:
+            logger.debug("启动定时任务调度器（暂停）")
+            self._scheduler.start(paused=True)
+        try:
+            yield
+        finally:
+            self._scheduler.resume()
+
+    def configure(self, misfire_grace_time: int, coalesce: bool) -> None:
+        """修改补执行宽限期与合并规则，新登记的任务与任务库中已有的任务都按新值处理。"""
+
+        self.misfire_grace_time = misfire_grace_time
+        self.coalesce = coalesce
+        if "_scheduler" not in self.__dict__:
+            return
+        # 持久化任务保存了登记时的取值，调度器的 job_defaults 只影响之后新建的任务
+        for job in self._scheduler.get_jobs():
+            if job.misfire_grace_time != misfire_grace_time or job.coalesce != coalesce:
+                logger.debug("更新定时任务 {} 的补执行规则", job.id)
+                job.modify(misfire_grace_time=misfire_grace_time, coalesce=coalesce)
+
     def shutdown(self) -> None:
+        if "_scheduler" not in self.__dict__:
+            return
         if self._scheduler.running:
             logger.debug("关闭定时任务调度器")
             self._scheduler.shutdown(wait=False)
 
-    def add_daily_job(self, job_id: str, at_time: str, func: Callable, *args, **kwargs) -> None:
-        """添加每天固定时间执行的任务。"""
+    def add_daily_job(self, job_id: str, at_time: str, func: Union[str, Callable], *args, **kwargs) -> None:
+        """添加每天固定时间执行的任务。
+
+        ``func`` 为字符串时视为已注册的动作名称，任务会持久化；为可调用对象时
+        任务只保存在内存中。
+        """
+
+        from apscheduler.triggers.cron import CronTrigger
 
-        self.remove(job_id)
         hh, mm = at_time.split(":")
-        trigger = CronTrigger(hour=int(hh), minute=int(mm))
-        job = self._scheduler.add_job(func, trigger, args=args, kwargs=kwargs, id=job_id, replace_existing=True)
-        self._jobs[job_id] = job.id
+        trigger = CronTrigger(hour=int(hh), minute=int(mm), timezone=TIMEZONE)
+        if isinstance(func, str):
+            self.add_action(job_id, trigger, func, **kwargs)
+        else:
+            self._scheduler.add_job(
+                func,
+                trigger,
+                args=args,
+                kwargs=kwargs,
+                id=job_id,
+                jobstore=VOLATILE_STORE,
+                misfire_grace_time=self.misfire_grace_time,
+                coalesce=self.coalesce,
+                replace_existing=True,
+            )
         logger.info("新增每日定时任务: {} -> {}", job_id, at_time)
 
+    def add_action(self, job_id: str, trigger: BaseTrigger, action: str, **params: Any) -> None:
+        """添加按 ``trigger`` 触发、执行已注册动作的持久化任务。
+
+        任务库中已有相同触发器与参数的任务时保留原任务，使重启前错过的触发
+        仍能按 misfire 规则补执行。
+        """
+
+        if self.has_action(job_id, trigger, action, **params):
+            return
+        self.remove(job_id)
+        self._scheduler.add_job(
+            ACTION_REF,
+            trigger,
+            args=(action,),
+            kwargs=params,
+            id=job_id,
+            name=action,
+            misfire_grace_time=self.misfire_grace_time,
+            coalesce=self.coalesce,
+            replace_existing=True,
+        )
+
+    def has_action(self, job_id: str, trigger: BaseTrigger, action: str, **params: Any) -> bool:
+        """任务库中是否已有相同触发器、动作与参数的任务 ``job_id``。"""
+
+        existing = self._scheduler.get_job(job_id)
+        return (
+            existing is not None
+            and existing.func_ref == ACTION_REF
+            and str(existing.trigger) == str(trigger)
+            and tuple(existing.args) == (action,)
+            and dict(existing.kwargs) == params
+        )
+
     def remove(self, job_id: str) -> None:
-        job_key = self._jobs.pop(job_id, None)
-        if job_key and self._scheduler.get_job(job_key):
+        if self._scheduler.get_job(job_id):
             logger.debug("移除定时任务: {}", job_id)
-            self._scheduler.remove_job(job_key)
+            self._scheduler.remove_job(job_id)
 
     def get_job(self, job_id: str) -> Optional[str]:
-        return self._jobs.get(job_id)
+        job = self._scheduler.get_job(job_id)
+        return job.id if job else None
+
+    def job_ids(self, prefix: str = "") -> List[str]:
+        return [job.id for job in self._scheduler.get_jobs() if job.id.startswith(prefix)]
+
+    def next_run_time(self, job_id: str) -> Optional[datetime]:
+        job = self._scheduler.get_job(job_id)
+        return getattr(job, "next_run_time", None) if job else None
 
     def __del__(self) -> None:
         self.shutdown()
-
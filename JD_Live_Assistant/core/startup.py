@@ -0,0 +1,193 @@
+"""启动耗时统计模块。
+
+程序启动分为若干阶段（导入界面、读取配置、创建窗口、首帧显示、后台子系统），
+:class:`StartupTimer` 记录每个阶段的耗时并写入日志，便于在直播电脑上定位
+启动慢的原因。
+
+以 ``--profile-startup`` 启动时，另外在子进程中以 ``python -X importtime``
+重新导入界面模块，把累计耗时最长的模块汇总写入日志（打包后的程序不支持）。
+
+设置环境变量 ``JDLA_STARTUP_REPORT`` 时，启动完成后把各阶段耗时、关键时间点
+（墙钟时间）与峰值内存写入该 JSON 文件；再设置 ``JDLA_STARTUP_CONNECT_PORT``
+时，首帧后自动绑定该端口的浏览器并记录“已连接”时间点。
+``scripts/benchmark_startup.py`` 通过这两个变量测量启动性能。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+REPORT_ENV = "JDLA_STARTUP_REPORT"
+CONNECT_PORT_ENV = "JDLA_STARTUP_CONNECT_PORT"
+MARK_FIRST_FRAME = "首帧"
+MARK_CONNECTED = "已连接"
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """当前进程的峰值常驻内存（字节），无法获取时返回 None。"""
+
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class _Counters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = _Counters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+        return int(counters.PeakWorkingSetSize)
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+class StartupTimer:
+    """记录启动各阶段的耗时，时间以创建计时器的时刻为原点。"""
+
+    def __init__(self, origin: Optional[float] = None, report_path: Optional[Path] = None) -> None:
+        self.origin = time.perf_counter() if origin is None else origin
+        # perf_counter 原点对应的墙钟时间，供其他进程（基准测试脚本）换算
+        self.wall_origin = time.time() - (time.perf_counter() - self.origin)
+        # (名称, 开始时刻, 耗时)，单位秒；耗时为 0 的为时间点
+        self.spans: List[Tuple[str, float, float]] = []
+        self.finished = False
+        if report_path is None and os.environ.get(REPORT_ENV):
+            report_path = Path(os.environ[REPORT_ENV])
+        self.report_path = report_path
+
+    @property
+    def connect_port(self) -> Optional[int]:
+        """基准测试要求自动绑定的浏览器端口，未要求时返回 None。"""
+
+        value = os.environ.get(CONNECT_PORT_ENV, "").strip()
+        return int(value) if value.isdigit() else None
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((name, started - self.origin, time.perf_counter() - started))
+
+    def mark(self, name: str) -> float:
+        """记录一个时间点，返回距原点的秒数。"""
+
+        elapsed = time.perf_counter() - self.origin
+        self.spans.append((name, elapsed, 0.0))
+        return elapsed
+
+    def summary(self) -> str:
+        parts = [
+            f"{name} {duration * 1000:.0f}ms" if duration else f"{name}@{offset * 1000:.0f}ms"
+            for name, offset, duration in self.spans
+        ]
+        return "启动耗时：" + "，".join(parts)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "wall_origin": self.wall_origin,
+            "spans": [
+                {"name": name, "offset": round(offset, 6), "duration": round(duration, 6)}
+                for name, offset, duration in self.spans
+            ],
+            "marks": {name: self.wall_origin + offset for name, offset, duration in self.spans if not duration},
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+
+    def write_report(self) -> None:
+        """把当前统计写入 ``report_path``（整体替换，读取方不会读到半个文件）。"""
+
+        if self.report_path is None:
+            return
+        tmp_path = self.report_path.with_name(f".{self.report_path.name}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(self.report(), ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, self.report_path)
+        except OSError as exc:
+            logger.debug("写入启动统计失败: {}", exc)
+
+    def finish(self) -> None:
+        """启动完成时写入日志，只写一次。"""
+
+        if not self.finished:
+            self.finished = True
+            logger.info(self.summary())
+            self.write_report()
+
+
+def importtime_summary(module: str, top: int = 15, timeout: float = 60.0) -> List[Tuple[str, int, int]]:
+    """在子进程中以 ``-X importtime`` 导入 ``module``，返回累计耗时最长的顶层包。
+
+    Returns:
+        ``(包名, 自身耗时 us, 累计耗时 us)`` 列表，按累计耗时降序
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    packages = {}
+    for line in result.stderr.splitlines():
+        # 格式：import time:  self [us] | cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        # 缩进表示嵌套导入，只统计顶层（无缩进）模块，避免重复计数
+        if name.startswith("  "):
+            continue
+        package = name.strip().split(".")[0]
+        self_us, cumulative_us = int(fields[0]), int(fields[1])
+        total_self, total_cumulative = packages.get(package, (0, 0))
+        packages[package] = (total_self + self_us, total_cumulative + cumulative_us)
+    ranked = sorted(packages.items(), key=lambda item: item[1][1], reverse=True)
+    return [(package, self_us, cumulative_us) for package, (self_us, cumulative_us) in ranked[:top]]
+
+
+def log_importtime(module: str, top: int = 15) -> None:
+    """记录 ``module`` 的导入耗时汇总，失败时只写调试日志。"""
+
+    if getattr(sys, "frozen", False):
+        logger.info("打包后的程序不支持 -X importtime 统计")
+        return
+    try:
+        rows = importtime_summary(module, top=top)
+    except (OSError, subprocess.SubprocessError) as exc:
+        logger.debug("统计导入耗时失败: {}", exc)
+        return
+    lines = [f"{package:<24} 累计 {cumulative / 1000:8.1f}ms  自身 {own / 1000:8.1f}ms" for package, own, cumulative in rows]
+    logger.info("导入耗时（-X importtime，{}）：\n{}", module, "\n".join(lines))
@@ -0,0 +1,177 @@
+"""讲解节奏计时模块，按单调时钟上的绝对截止时间安排每个商品。
+
+原先每个商品的周期为"讲解时间 + 点击/弹窗/页面稳定等未计量的耗时 + 间隔 +
+额外等待"，两小时下来会与主播的节奏相差数分钟。本模块以首个商品开始讲解的
+时刻为原点，第 N 个商品的计划开始时间为::
+
+    origin + Σ(duration_i + interval)   (i < N)
+
+讲解等待到计划的讲解截止时间为止；间隔等待会扣除实测的"开讲前准备耗时"
+（间隔结束到下一商品真正开讲之间的点击、下载、页面稳定，取滑动平均），
+使下一个商品尽量在计划时刻开讲。每个商品开讲时记录与计划的偏差。
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from loguru import logger
+
+# 准备耗时滑动平均的权重，新样本占比
+LEAD_SMOOTHING = 0.3
+
+
+@dataclass(frozen=True)
+class StepTiming:
+    """单个商品的开讲时间记录（相对原点的秒数）。"""
+
+    index: int
+    planned: float
+    actual: float
+
+    @property
+    def drift(self) -> float:
+        return self.actual - self.planned
+
+
+class ExplanationTimer:
+    """基于 ``time.monotonic()`` 截止时间的讲解计时器。"""
+
+    def __init__(
+        self,
+        interval: float,
+        compensate: bool = True,
+        tolerance: float = 1.0,
+        min_explain_fraction: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        初始化计时器。
+
+        Args:
+            interval: 商品之间的间隔时间（秒）
+            compensate: 是否用截止时间补偿额外耗时；关闭时只记录偏差
+            tolerance: 偏差超过该值（秒）时写入提示日志
+            min_explain_fraction: 落后于计划时，讲解时间最多压缩到原时长的该比例
+            clock: 单调时钟，便于替换
+        """
+        self.interval = interval
+        self.compensate = compensate
+        self.tolerance = tolerance
+        self.min_explain_fraction = min_explain_fraction
+        self._clock = clock
+        self._origin: Optional[float] = None
+        self._next_start = 0.0
+        self._explain_deadline = 0.0
+        self._interval_done: Optional[float] = None
+        self._lead: Optional[float] = None
+        self.history: List[StepTiming] = []
+        self.steps = 0
+        self.max_drift = 0.0
+        self._drift_total = 0.0
+
+    @property
+    def started(self) -> bool:
+        return self._origin is not None
+
+    def mark_explaining(self, duration: float) -> StepTiming:
+        """商品实际开讲时调用，记录偏差并确定本次讲解的截止时间。"""
+
+        now = self._clock()
+        if self._origin is None:
+            self._origin = now
+            self._next_start = now
+        if self._interval_done is not None:
+            sample = max(now - self._interval_done, 0.0)
+            self._lead = sample if self._lead is None else self._lead + LEAD_SMOOTHING * (sample - self._lead)
+            self._interval_done = None
+
+        planned = self._next_start
+        timing = StepTiming(index=self.steps + 1, planned=planned - self._origin, actual=now - self._origin)
+        self._record(timing)
+
+        if self.compensate:
+            # 落后时压缩本次讲解以追回进度，但不少于原时长的一定比例
+            self._explain_deadline = max(planned + duration, now + duration * self.min_explain_fraction)
+        else:
+            self._explain_deadline = now + duration
+        self._next_start = planned + duration + self.interval
+        return timing
+
+    def explain_remaining(self) -> float:
+        """距离本次讲解截止的秒数。"""
+
+        return max(self._explain_deadline - self._clock(), 0.0)
+
+    def interval_remaining(self) -> float:
+        """间隔等待的秒数，已扣除下一个商品开讲前的准备耗时。"""
+
+        if not self.compensate:
+            return self.interval
+        lead = self._lead or 0.0
+        return max(self._next_start - lead - self._clock(), 0.0)
+
+    def interval_done(self) -> None:
+        """间隔等待结束时调用，用于测量下一个商品开讲前的准备耗时。"""
+
+        self._interval_done = self._clock()
+
+    def rebase(self, keep_interval: bool = True) -> None:
+        """讲解或间隔被提前结束（跳过、插播、等待重试）后，以当前时刻重新安排后续计划。
+
+        讲解提前结束时仍保留完整的间隔，下一个商品在 ``now + interval`` 开讲
+        （准备耗时在间隔等待时扣除）；间隔等待本身被打断时传入
+        ``keep_interval=False``，下一个商品立即准备开讲。
+
+        >>> clock = iter([0.0, 3.0, 3.0]).__next__
+        >>> timer = ExplanationTimer(interval=5.0, clock=clock)
+        >>> _ = timer.mark_explaining(10.0)
+        >>> timer.rebase()
+        >>> timer.interval_remaining()
+        5.0
+        """
+
+        if self._origin is None:
+            return
+        now = self._clock()
+        if keep_interval:
+            self._next_start = now + self.interval
+            self._interval_done = now + self.interval
+        else:
+            self._next_start = now + (self._lead or 0.0)
+            self._interval_done = now
+        self._explain_deadline = now
+
+    def shift(self, seconds: float) -> None:
+        """暂停或追加时间推迟了本次等待，后续计划整体顺延，间隔保持不变。"""
+
+        if self._origin is None or seconds <= 0:
+            return
+        self._explain_deadline += seconds
+        self._next_start += seconds
+
+    def summary(self) -> str:
+        if not self.steps:
+            return "未记录讲解节奏。"
+        mean = self._drift_total / self.steps
+        return f"讲解节奏：共 {self.steps} 个商品，平均偏差 {mean:+.1f} 秒，最大偏差 {self.max_drift:+.1f} 秒"
+
+    def _record(self, timing: StepTiming) -> None:
+        self.steps += 1
+        # 只保留最近的记录，长时间直播下内存有界
+        self.history.append(timing)
+        if len(self.history) > 500:
+            del self.history[:-500]
+        self._drift_total += timing.drift
+        if abs(timing.drift) > abs(self.max_drift):
+            self.max_drift = timing.drift
+        if abs(timing.drift) > self.tolerance:
+            logger.info(
+                "第 {} 个商品开讲偏差 {:+.1f} 秒（计划 {:.1f}s，实际 {:.1f}s）",
+                timing.index,
+                timing.drift,
+                timing.planned,
+                timing.actual,
+            )
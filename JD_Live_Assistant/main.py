@@ -2,21 +2,32 @@
 
 from __future__ import annotations
 
+import sys
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Final
 
-import sys
+# 启动计时的原点必须早于第三方与项目模块的导入，以下导入因此放在赋值之后
+_STARTED = time.perf_counter()
 
-from loguru import logger
+from loguru import logger  # noqa: E402
 
-from JD_Live_Assistant.core import (
+from JD_Live_Assistant.core import (  # noqa: E402
     BrowserController,
+    ConfigError,
     ConfigManager,
     HotkeyManager,
     LicenseManager,
     ScheduleManager,
 )
-from JD_Live_Assistant.ui.main_window import MainWindow
+from JD_Live_Assistant.core.license import DEFAULT_KEY_REGISTRY  # noqa: E402
+from JD_Live_Assistant.core.registry import ChainRegistry, DictRegistry, open_registry  # noqa: E402
+from JD_Live_Assistant.core.startup import StartupTimer, log_importtime  # noqa: E402
+
+REGISTRY_FILES: Final = ("keys.jdkr", "keys.sqlite")
+PROFILE_FLAG: Final = "--profile-startup"
 
 
 def get_app_dir() -> Path:
@@ -40,19 +51,70 @@ def setup_logging(base_dir: Path) -> None:
     logger.info("日志系统初始化完成。")
 
 
-def main() -> None:
-    base_dir = get_app_dir()
-    setup_logging(base_dir)
+@dataclass
+class AppServices:
+    """主窗口依赖的各个管理器。"""
+
+    config_manager: ConfigManager
+    license_manager: LicenseManager
+    controller: BrowserController
+    scheduler: ScheduleManager
+    hotkeys: HotkeyManager
+
+
+def create_services(base_dir: Path, startup: StartupTimer) -> AppServices:
+    """读取配置与授权并创建各管理器（不创建窗口，启动基准测试的无界面模式也使用）。"""
 
     config_path = base_dir / "config" / "settings.yaml"
     config_manager = ConfigManager(config_path)
+    with startup.span("读取配置"):
+        try:
+            config_manager.load()
+        except ConfigError as exc:
+            logger.error("{}", exc)
+            raise SystemExit(f"配置文件 {config_path} 无效，请修正后重新启动：\n{exc}") from exc
     license_path = base_dir / "config" / "license.json"
-    license_manager = LicenseManager(license_path)
-    controller = BrowserController()
-    scheduler = ScheduleManager()
-    hotkeys = HotkeyManager()
+    # 批量发放的卡密放在 config 目录下的注册表文件中，首次验证卡密时才打开
+    registry_files = [path for path in (base_dir / "config" / name for name in REGISTRY_FILES) if path.exists()]
+    registry = ChainRegistry(DictRegistry(DEFAULT_KEY_REGISTRY), *(open_registry(path) for path in registry_files))
+    with startup.span("读取授权"):
+        license_manager = LicenseManager(license_path, registry=registry)
+    schedule_config = config_manager.snapshot.get("schedule", {})
+    scheduler = ScheduleManager(
+        base_dir / "config" / "schedule.sqlite",
+        misfire_grace_time=int(schedule_config.get("misfire_grace_seconds", 300)),
+        coalesce=bool(schedule_config.get("coalesce", True)),
+    )
+    return AppServices(config_manager, license_manager, BrowserController(), scheduler, HotkeyManager())
+
 
-    app = MainWindow(controller, scheduler, hotkeys, config_manager, license_manager)
+def main() -> None:
+    startup = StartupTimer(origin=_STARTED)
+    base_dir = get_app_dir()
+    setup_logging(base_dir)
+    if PROFILE_FLAG in sys.argv:
+        # 子进程统计导入耗时，不阻塞窗口显示
+        threading.Thread(
+            target=log_importtime,
+            args=("JD_Live_Assistant.ui.main_window",),
+            name="importtime",
+            daemon=True,
+        ).start()
+
+    # 界面模块依赖 tkinter 与大量业务模块，放到日志初始化之后导入以便计时
+    with startup.span("导入界面"):
+        from JD_Live_Assistant.ui.main_window import MainWindow
+
+    services = create_services(base_dir, startup)
+    with startup.span("创建窗口"):
+        app = MainWindow(
+            services.controller,
+            services.scheduler,
+            services.hotkeys,
+            services.config_manager,
+            services.license_manager,
+            startup=startup,
+        )
     app.mainloop()
 
 
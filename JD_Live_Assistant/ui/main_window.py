@@ -2,25 +2,70 @@
 
 from __future__ import annotations
 
+import hashlib
 import queue
+import shutil
 import threading
 import time
 import tkinter as tk
+from collections import ChainMap
+from concurrent.futures import Future
+from functools import partial
+from itertools import chain, islice
 from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
-from typing import Any, Callable, Dict, List, Optional
-from urllib.error import URLError
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional
 from urllib.parse import urljoin, urlparse
-from urllib.request import Request, urlopen
 
 from loguru import logger
-from playwright.sync_api import Page
 
-from JD_Live_Assistant.core.automation import BrowserController
-from JD_Live_Assistant.core.config import ConfigManager
+from JD_Live_Assistant.core.actions import GoodsActions
+from JD_Live_Assistant.core.analytics import CommentAnalytics, ExplanationWindow
+from JD_Live_Assistant.core.automation import BrowserController, timeout_error
+from JD_Live_Assistant.core.config import ConfigChange, ConfigError, ConfigManager
+from JD_Live_Assistant.core.control import REASON_INTERRUPT, REASON_REPLAY, TaskCancelled, TaskControl, WaitOutcome
+from JD_Live_Assistant.core.broadcast import EVENT_START, BroadcastCalendar, CalendarError
+from JD_Live_Assistant.core.commands import CommandExecutor
+from JD_Live_Assistant.core.demand import DemandDetector
+from JD_Live_Assistant.core.diagnostics import PageDiagnostics
+from JD_Live_Assistant.core.goods import GOODS_DELTA_SCRIPT, LIST_AUTO, LIST_STATIC, GoodsCatalog, GoodsMirror
 from JD_Live_Assistant.core.hotkeys import HotkeyManager
+from JD_Live_Assistant.core.imagefetch import ImageFetcher, ImageFetchError
+from JD_Live_Assistant.core.imageproc import FORMAT_JPEG, ImageNormalizer, NormalizeOptions
+from JD_Live_Assistant.core.keywords import KeywordEngine, KeywordHit
 from JD_Live_Assistant.core.license import LicenseError, LicenseManager
-from JD_Live_Assistant.core.schedule import ScheduleManager
+from JD_Live_Assistant.core.modals import EVENT_CONFIRMED, ModalAutoConfirmer, ModalRules
+from JD_Live_Assistant.core.monitor import DEFAULT_TEXT_FIELDS, DEFAULT_USER_FIELDS, CommentDecoder, CommentMonitor
+from JD_Live_Assistant.core.playlist import (
+    ORDER_SEQUENTIAL,
+    ExplanationQueue,
+    Playlist,
+    PlaylistError,
+    PlaylistStep,
+)
+from JD_Live_Assistant.core.schedule import ScheduleManager, register_action
+from JD_Live_Assistant.core.startup import MARK_CONNECTED, MARK_FIRST_FRAME, StartupTimer
+from JD_Live_Assistant.core.timing import ExplanationTimer
+
+if TYPE_CHECKING:  # pragma: no cover
+    from playwright.sync_api import Page
+
+# 讲解控制类热键，回调只向任务线程发送命令
+TASK_CONTROL_HOTKEYS = ("skip_product", "replay_product", "pause_task", "extend_product")
+# 停止任务后检查任务线程是否退出的间隔（毫秒），超过提示时间仍未退出时提示一次
+STOP_POLL_MS = 50
+STOP_NOTICE_SECONDS = 2.0
+# 退出程序时最多等待任务线程退出的秒数（任务线程为守护线程，超时后随进程结束）
+CLOSE_WAIT_SECONDS = 5.0
+
+
+def _is_explainable(button_text: str) -> bool:
+    """按钮文本为"讲解"（且不含"取消"、"结束"）时视为可讲解。"""
+
+    text = (button_text or "").strip()
+    if text == "讲解":
+        return True
+    return "讲解" in text and "取消" not in text and "结束" not in text
 
 
 class MainWindow(tk.Tk):
@@ -33,6 +78,7 @@ class MainWindow(tk.Tk):
         hotkeys: HotkeyManager,
         config_manager: ConfigManager,
         license_manager: LicenseManager,
+        startup: Optional[StartupTimer] = None,
     ) -> None:
         super().__init__()
         self.title("卡点讲解自动化助手")
@@ -44,14 +90,60 @@ class MainWindow(tk.Tk):
         self.hotkeys = hotkeys
         self.config_manager = config_manager
         self.license_manager = license_manager
-        self.config = self.config_manager.data
+        self.startup = startup or StartupTimer()
+        # 定时任务、热键与配置监视在首帧显示后才启动，见 _start_subsystems
+        self._subsystems_started = False
 
         self.log_queue: "queue.Queue[str]" = queue.Queue()
         self.control_widgets: List[tk.Widget] = []
         self.task_thread: Optional[threading.Thread] = None
-        self.task_stop_event = threading.Event()
+        # 已确认退出、正在等待任务线程结束
+        self._closing = False
+        # 任务线程的控制通道：停止、跳过、重播、暂停与追加讲解时间
+        self.task_control = TaskControl()
+        # 定时时段启动的任务：所属时段名称与覆盖 task 配置的参数
+        self.active_slot: Optional[str] = None
+        self.task_overrides: Dict[str, Any] = {}
+        self.calendar = BroadcastCalendar()
         self.is_task_running = False
         self.controls_enabled = True
+        # 浏览器跳转、刷新、绑定等阻塞操作在命令线程中串行执行，结果切回界面线程
+        self.commands = CommandExecutor(
+            name="browser-command",
+            on_result=lambda key, result, error: self.after(0, lambda: self._on_command_done(key, result, error)),
+        )
+        image_config = self.config.get("image", {})
+        self.image_fetcher = ImageFetcher(
+            max_workers=int(image_config.get("fetch_workers", 4)),
+            timeout=float(image_config.get("timeout_seconds", 8)),
+        )
+        monitor_config = self.config.get("monitor", {})
+        self.comment_monitor = CommentMonitor(
+            maxsize=int(monitor_config.get("queue_size", 5000)),
+            decoder=CommentDecoder(
+                text_fields=monitor_config.get("text_fields") or DEFAULT_TEXT_FIELDS,
+                user_fields=monitor_config.get("user_fields") or DEFAULT_USER_FIELDS,
+            ),
+            url_keyword=str(monitor_config.get("url_keyword", "")),
+        )
+        self.keyword_engine = KeywordEngine(monitor_config.get("keywords") or [])
+        self.keyword_alert_cooldown = float(monitor_config.get("alert_cooldown_seconds", 30))
+        self._keyword_alerted: Dict[str, float] = {}
+        self.analytics = CommentAnalytics(window_history=int(monitor_config.get("window_history", 200)))
+        self.comment_monitor.add_listener(self.analytics.record_comment)
+        self.comment_monitor.add_listener(self.keyword_engine.process)
+        self.keyword_engine.add_listener(self.analytics.record_keyword)
+        self.keyword_engine.add_listener(self._on_keyword_hit)
+        demand_config = monitor_config.get("demand", {})
+        self.demand_detector = DemandDetector(
+            threshold=int(demand_config.get("threshold", 5)),
+            window_seconds=float(demand_config.get("window_seconds", 30)),
+            cooldown_seconds=float(demand_config.get("cooldown_seconds", 120)),
+            aliases=demand_config.get("aliases") or {},
+        )
+        self.demand_min_dwell = float(demand_config.get("min_dwell_seconds", 5))
+        if demand_config.get("enabled", True):
+            self.comment_monitor.add_listener(self.demand_detector.process)
 
         self._setup_variables()
         self._build_ui()
@@ -60,25 +152,49 @@ class MainWindow(tk.Tk):
 
         self.protocol("WM_DELETE_WINDOW", self._on_close)
         self.after(200, self._poll_log_queue)
+        self.after_idle(self._start_subsystems)
+
+    def _start_subsystems(self) -> None:
+        """首帧绘制完成后启动定时任务、全局热键与配置监视，缩短窗口出现前的等待。"""
+
+        if self._subsystems_started:
+            return
+        self.update_idletasks()
+        self.startup.mark(MARK_FIRST_FRAME)
+        self._subsystems_started = True
+        with self.startup.span("定时任务"):
+            self._setup_schedule()
+        if self.license_manager.is_valid:
+            with self.startup.span("热键"):
+                self._bind_hotkeys()
+        # 监视 settings.yaml，修改后无需重启即可生效；回调切回界面线程处理
+        with self.startup.span("配置监视"):
+            self.config_manager.subscribe(lambda change: self.after(0, lambda: self._on_config_changed(change)))
+            self.config_manager.watch()
+        self.startup.finish()
+        port = self.startup.connect_port
+        if port is not None:
+            self.commands.submit("connect", lambda: self._startup_connect_command(port))
+
+    @property
+    def config(self) -> Mapping[str, Any]:  # type: ignore[override]
+        """当前配置的只读快照，配置文件重新加载后自动指向新内容。"""
+
+        return self.config_manager.snapshot
 
     # UI 构建 -----------------------------------------------------------------
     def _setup_variables(self) -> None:
         license_info = self.license_manager.info
         self.port_var = tk.StringVar(value=str(self.config["app"].get("default_port", 9222)))
-        task_config = self.config.setdefault(
-            "task",
-            {
-                "duration_seconds": 8,
-                "interval_seconds": 2,
-                "material_path": "",
-            },
-        )
+        task_config = self.config["task"]
         self.duration_var = tk.StringVar(value=str(task_config.get("duration_seconds", 8)))
         self.interval_var = tk.StringVar(value=str(task_config.get("interval_seconds", 2)))
         self.material_path_var = tk.StringVar(value=task_config.get("material_path", ""))  # type: ignore[arg-type]
+        self.continuous_var = tk.BooleanVar(value=bool(task_config.get("continuous", False)))
         self.license_var = tk.StringVar(value=license_info.key if license_info else "")
         self.license_status_var = tk.StringVar(value="未授权，功能已锁定")
         self.hotkey_summary_var = tk.StringVar(value="")
+        self.calendar_summary_var = tk.StringVar(value="暂无直播日程。")
 
     def _build_ui(self) -> None:
         main_frame = ttk.Frame(self, padding=16)
@@ -120,8 +236,11 @@ class MainWindow(tk.Tk):
         browse_material_btn = ttk.Button(task_frame, text="浏览", command=self._on_browse_material)
         browse_material_btn.grid(row=1, column=6, sticky=tk.W, pady=(12, 0))
 
+        continuous_check = ttk.Checkbutton(task_frame, text="循环讲解", variable=self.continuous_var)
+        continuous_check.grid(row=2, column=1, columnspan=5, sticky=tk.W, padx=(8, 16), pady=(8, 0))
+
         button_column = ttk.Frame(task_frame)
-        button_column.grid(row=0, column=7, rowspan=2, sticky="ns", padx=(16, 0))
+        button_column.grid(row=0, column=7, rowspan=3, sticky="ns", padx=(16, 0))
 
         connect_btn = ttk.Button(button_column, text="绑定浏览器", command=self._on_connect)
         connect_btn.pack(fill=tk.X)
@@ -170,6 +289,10 @@ class MainWindow(tk.Tk):
         hotkey_frame.pack(fill=tk.X, pady=(0, 12))
         ttk.Label(hotkey_frame, textvariable=self.hotkey_summary_var).pack(anchor=tk.W)
 
+        calendar_frame = ttk.LabelFrame(home_tab, text="直播日程", padding=12)
+        calendar_frame.pack(fill=tk.X, pady=(0, 12))
+        ttk.Label(calendar_frame, textvariable=self.calendar_summary_var).pack(anchor=tk.W)
+
         log_frame = ttk.LabelFrame(home_tab, text="运行日志", padding=12)
         log_frame.pack(fill=tk.BOTH, expand=True)
 
@@ -201,6 +324,7 @@ class MainWindow(tk.Tk):
                 interval_entry,
                 material_entry,
                 browse_material_btn,
+                continuous_check,
                 connect_btn,
                 disconnect_btn,
                 self.start_task_btn,
@@ -213,13 +337,20 @@ class MainWindow(tk.Tk):
         self._refresh_hotkey_summary()
 
     def _bind_hotkeys(self) -> None:
-        handlers: Dict[str, Callable[[], None]] = {
-            "start_live": self._open_live_page,
-            "stop_live": self._stop_live_placeholder,
-            "refresh": self._refresh_page,
+        # 热键回调在命令线程中执行，不能直接操作界面
+        handlers: Dict[str, Callable[[], Any]] = {
+            "start_live": self._live_page_command,
+            "stop_live": self._stop_live_command,
+            "refresh": self._refresh_command,
+            "skip_product": self._skip_product_command,
+            "replay_product": self._replay_product_command,
+            "pause_task": self._pause_task_command,
+            "extend_product": self._extend_product_command,
         }
+        self.hotkeys.executor = self.commands
         self.hotkeys.clear()
-        self.hotkeys.bind_from_mapping(self.config.get("hotkeys", {}), handlers)
+        # 讲解控制命令只设置标志，直接在钩子线程上执行，不排在浏览器命令之后
+        self.hotkeys.bind_from_mapping(self.config.get("hotkeys", {}), handlers, immediate=TASK_CONTROL_HOTKEYS)
         self.hotkeys.start()
 
     def _refresh_hotkey_summary(self) -> None:
@@ -228,6 +359,10 @@ class MainWindow(tk.Tk):
             "start_live": "开播",
             "stop_live": "结束直播",
             "refresh": "刷新页面",
+            "skip_product": "跳过商品",
+            "replay_product": "重播上一个",
+            "pause_task": "暂停/继续",
+            "extend_product": "延长讲解",
         }
         if not mapping:
             summary = "暂无快捷键配置。"
@@ -236,6 +371,63 @@ class MainWindow(tk.Tk):
             summary = " | ".join(summary_items)
         self.hotkey_summary_var.set(summary)
 
+    def _on_config_changed(self, change: ConfigChange) -> None:
+        """配置文件重新加载后，把变化推送到热键、定时任务、弹幕分析与运行中的任务。"""
+
+        self._log(f"配置文件已更新：{', '.join(change.changes)}")
+        if change.touched("hotkeys"):
+            self._refresh_hotkey_summary()
+            if self.license_manager.is_valid:
+                self._bind_hotkeys()
+        if change.touched("schedule", "calendar"):
+            self._register_schedule()
+
+        monitor_config = self.config.get("monitor", {})
+        if change.touched("monitor.keywords"):
+            self.keyword_engine.update(monitor_config.get("keywords") or [])
+        if change.touched("monitor.alert_cooldown_seconds"):
+            self.keyword_alert_cooldown = float(monitor_config.get("alert_cooldown_seconds", 30))
+        if change.touched("monitor.demand"):
+            demand_config = monitor_config.get("demand", {})
+            self.demand_detector.configure(
+                threshold=int(demand_config.get("threshold", 5)),
+                window_seconds=float(demand_config.get("window_seconds", 30)),
+                cooldown_seconds=float(demand_config.get("cooldown_seconds", 120)),
+                aliases=demand_config.get("aliases") or {},
+            )
+            self.demand_min_dwell = float(demand_config.get("min_dwell_seconds", 5))
+
+        task_config = self.config.get("task", {})
+        if change.touched("app.default_port"):
+            self.port_var.set(str(self.config["app"].get("default_port", 9222)))
+        if change.touched("task"):
+            self.duration_var.set(str(task_config.get("duration_seconds", 8)))
+            self.interval_var.set(str(task_config.get("interval_seconds", 2)))
+            self.material_path_var.set(task_config.get("material_path", ""))
+            self.continuous_var.set(bool(task_config.get("continuous", False)))
+
+        if self.task_thread and self.task_thread.is_alive():
+            # 定时时段指定的参数优先，不被配置文件覆盖；手动启动的任务以配置文件中的修改为准
+            slot = self.calendar.get(self.active_slot) if self.active_slot else None
+            pinned = set(self.task_overrides) if slot is not None else set()
+            if slot is not None:
+                pinned.update(
+                    key
+                    for key, value in (("duration_seconds", slot.duration), ("interval_seconds", slot.interval))
+                    if value is not None
+                )
+            settings: Dict[str, Any] = {}
+            for key, name in (
+                ("duration_seconds", "duration"),
+                ("interval_seconds", "interval"),
+                ("continuous", "continuous"),
+                ("continuous_order", "continuous_order"),
+            ):
+                if change.touched(f"task.{key}") and key not in pinned and key in task_config:
+                    settings[name] = task_config[key]
+            if settings:
+                self.task_control.update_settings(**settings)
+
     def _parse_positive_float(self, var: tk.StringVar, field: str, allow_zero: bool = False) -> Optional[float]:
         try:
             value = float(var.get())
@@ -261,20 +453,10 @@ class MainWindow(tk.Tk):
             messagebox.showerror("输入错误", "请输入合法的数字端口号。")
             return
 
-        def worker() -> None:
-            try:
-                self.controller.connect(port)
-                self._log(f"绑定浏览器成功：端口 {port}")
-            except Exception as exc:  # noqa: BLE001
-                logger.exception("绑定浏览器失败")
-                self._log(f"绑定失败：{exc}")
-                messagebox.showerror("绑定失败", str(exc))
-
-        threading.Thread(target=worker, daemon=True).start()
+        self.commands.submit("connect", lambda: self._connect_command(port))
 
     def _on_disconnect(self) -> None:
-        self.controller.disconnect()
-        self._log("浏览器连接已断开。")
+        self.commands.submit("disconnect", self._disconnect_command)
 
     def _open_live_page(self) -> None:
         if not self._ensure_license():
@@ -283,26 +465,95 @@ class MainWindow(tk.Tk):
         if not url:
             messagebox.showwarning("缺少地址", "请先在配置文件中填写直播后台地址。")
             return
-        try:
-            self.controller.navigate(url)
-            self._log(f"打开直播后台：{url}")
-        except Exception as exc:  # noqa: BLE001
-            logger.exception("跳转直播后台失败")
-            self._log(f"跳转失败：{exc}")
-            messagebox.showerror("跳转失败", str(exc))
+        self.commands.submit("start_live", self._live_page_command)
 
     def _refresh_page(self) -> None:
         if not self._ensure_license():
             return
-        try:
-            self.controller.perform(lambda page: page.reload())
-            self._log("刷新直播页面完成。")
-        except Exception as exc:  # noqa: BLE001
-            logger.exception("刷新页面失败")
-            self._log(f"刷新失败：{exc}")
+        self.commands.submit("refresh", self._refresh_command)
+
+    # 命令（在命令线程中执行，返回需要记录的日志） ------------------------------
+    def _require_license(self) -> None:
+        if not self.license_manager.is_valid:
+            raise LicenseError("当前卡密未激活或已过期，请先验证授权。")
+
+    def _connect_command(self, port: int) -> str:
+        self.controller.connect(port)
+        return f"绑定浏览器成功：端口 {port}"
+
+    def _startup_connect_command(self, port: int) -> str:
+        """启动基准测试：首帧后自动绑定浏览器并记录连接完成的时间点。"""
+
+        result = self._connect_command(port)
+        self.startup.mark(MARK_CONNECTED)
+        self.startup.write_report()
+        return result
+
+    def _disconnect_command(self) -> str:
+        self.controller.disconnect()
+        return "浏览器连接已断开。"
+
+    def _live_page_command(self) -> str:
+        self._require_license()
+        url = self.config["app"].get("live_url", "").strip()
+        if not url:
+            raise ValueError("请先在配置文件中填写直播后台地址。")
+        self.controller.navigate(url)
+        return f"打开直播后台：{url}"
+
+    def _refresh_command(self) -> str:
+        self._require_license()
+        self.controller.perform(lambda page: page.reload())
+        return "刷新直播页面完成。"
+
+    def _stop_live_command(self) -> str:
+        return "收到结束直播指令，可在此接入实际逻辑。"
+
+    def _task_is_running(self) -> bool:
+        thread = self.task_thread
+        if thread and thread.is_alive():
+            return True
+        self._log("当前没有正在运行的讲解任务。")
+        return False
 
-    def _stop_live_placeholder(self) -> None:
-        self._log("收到结束直播指令，可在此接入实际逻辑。")
+    def _skip_product_command(self) -> None:
+        if self._task_is_running():
+            self.task_control.skip()
+            self._log("收到跳过指令，结束当前商品的讲解。")
+
+    def _replay_product_command(self) -> None:
+        if self._task_is_running():
+            self.task_control.replay()
+            self._log("收到重播指令，重新讲解上一个商品。")
+
+    def _pause_task_command(self) -> None:
+        if self._task_is_running():
+            paused = self.task_control.toggle_pause()
+            self._log("讲解计时已暂停。" if paused else "讲解计时已继续。")
+
+    def _extend_product_command(self) -> None:
+        if self._task_is_running():
+            seconds = float(self.config.get("task", {}).get("extend_seconds", 30))
+            self.task_control.extend(seconds)
+            self._log(f"收到延长指令，当前商品追加讲解 {seconds:g} 秒。")
+
+    def _on_command_done(self, key: str, result: Any, error: Optional[BaseException]) -> None:
+        """命令执行完成后在界面线程中记录结果。"""
+
+        if error is None:
+            if result:
+                self._log(str(result))
+            return
+        labels = {
+            "connect": ("绑定失败", "绑定浏览器"),
+            "start_live": ("跳转失败", "跳转直播后台"),
+            "refresh": (None, "刷新页面"),
+            "disconnect": (None, "断开连接"),
+        }
+        title, action = labels.get(key, (None, key))
+        self._log(f"{action}失败：{error}")
+        if title:
+            messagebox.showerror(title, str(error))
 
     def _on_start_task(self) -> None:
         if not self._ensure_license():
@@ -334,18 +585,38 @@ class MainWindow(tk.Tk):
             if not proceed:
                 return
 
-        task_config = self.config.setdefault("task", {})
-        task_config["duration_seconds"] = duration
-        task_config["interval_seconds"] = interval
-        task_config["material_path"] = str(directory)
-
-        self.task_stop_event.clear()
         try:
             port = int(self.port_var.get())
         except ValueError:
             messagebox.showerror("输入错误", "端口必须为整数。")
             return
 
+        self._start_task(directory, duration, interval, port)
+
+    def _start_task(
+        self,
+        directory: Path,
+        duration: float,
+        interval: float,
+        port: int,
+        overrides: Optional[Dict[str, Any]] = None,
+        slot: Optional[str] = None,
+    ) -> None:
+        """启动讲解任务线程，参数须已校验。
+
+        ``overrides`` 为定时时段的任务参数；手动启动时为界面上的参数。两者都只作用于
+        本次任务，不写回配置，保存配置请使用“保存配置”。
+        """
+
+        if self._closing:
+            # 正在退出：等待任务线程结束期间到点的定时任务不再启动
+            return
+        if overrides is None:
+            overrides = {"material_path": str(directory), "continuous": self.continuous_var.get()}
+        self.task_overrides = dict(overrides)
+        self.active_slot = slot
+
+        self.task_control.reset()
         self.task_thread = threading.Thread(
             target=self._task_worker,
             args=(directory, duration, interval, port),
@@ -353,26 +624,160 @@ class MainWindow(tk.Tk):
         )
         self.task_thread.start()
         self._log("自动讲解任务开始执行。")
+        monitor_config = self.config.get("monitor", {})
+        if monitor_config.get("enabled", False) and self.controller.is_connected:
+            self.keyword_engine.update(monitor_config.get("keywords") or [])
+            self.comment_monitor.start(port)
+            self._log("弹幕监控已启动。")
         self._set_task_running(True)
 
+    # 定时任务 ----------------------------------------------------------------
+    def _setup_schedule(self) -> None:
+        """注册定时动作并按 schedule 配置登记每日开播任务。"""
+
+        # 调度线程触发的动作切回界面线程执行
+        register_action("start_task", lambda **params: self.after(0, lambda: self._run_scheduled_task(**params)))
+        register_action("stop_task", lambda **params: self.after(0, lambda: self._run_scheduled_stop(**params)))
+        self._register_schedule()
+
+    def _register_schedule(self) -> None:
+        """按当前 schedule 与 calendar 配置登记定时任务，配置变化后可重复调用。
+
+        调度器在登记期间暂停，任务库中已关闭或已变更的旧任务先被移除/替换，不会误触发。
+        """
+
+        schedule_config = self.config.get("schedule", {})
+        try:
+            with self.scheduler.paused():
+                self.scheduler.configure(
+                    misfire_grace_time=int(schedule_config.get("misfire_grace_seconds", 300)),
+                    coalesce=bool(schedule_config.get("coalesce", True)),
+                )
+                self._register_daily_job()
+                self._register_calendar()
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("初始化定时任务失败")
+            self._log(f"定时任务初始化失败：{exc}")
+            return
+        if self.calendar.slots:
+            self._log(f"已登记直播日程：{len(self.calendar.slots)} 个时段")
+        self._refresh_calendar_summary()
+
+    def _register_daily_job(self) -> None:
+        schedule_config = self.config.get("schedule", {})
+        at_time = str(schedule_config.get("daily_start_time", "")).strip()
+        if schedule_config.get("enabled", False) and at_time:
+            self.scheduler.add_daily_job("daily_start_task", at_time, "start_task")
+            self._log(f"已启用每日定时讲解：{at_time}，下次执行 {self.scheduler.next_run_time('daily_start_task')}")
+        else:
+            self.scheduler.remove("daily_start_task")
+
+    def _register_calendar(self) -> None:
+        try:
+            self.calendar = BroadcastCalendar.from_config(self.config.get("calendar", []))
+            self.calendar.register(self.scheduler)
+        except CalendarError as exc:
+            self._log(f"直播日程配置无效：{exc}")
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("登记直播日程失败")
+            self._log(f"登记直播日程失败：{exc}")
+
+    def _refresh_calendar_summary(self) -> None:
+        events = self.calendar.upcoming(limit=4)
+        if not events:
+            self.calendar_summary_var.set("暂无直播日程。")
+            return
+        labels = [
+            f"{fire_time:%m-%d %H:%M} {'开始' if event == EVENT_START else '结束'} {slot.name}"
+            for fire_time, slot, event in events
+        ]
+        self.calendar_summary_var.set(" | ".join(labels))
+
+    def _run_scheduled_task(self, **params: Any) -> None:
+        """定时任务入口，未指定的参数取当前配置，不弹出任何对话框。"""
+
+        slot = params.get("slot")
+        if slot:
+            self._refresh_calendar_summary()
+        if self.task_thread and self.task_thread.is_alive():
+            self._log("定时讲解触发时已有任务在运行，本次跳过。")
+            return
+        if not self.license_manager.is_valid:
+            self._log("定时讲解未执行：卡密未激活或已过期。")
+            return
+
+        task_config = self.config.get("task", {})
+        try:
+            duration = float(params.get("duration") or task_config.get("duration_seconds", 8))
+            interval = float(params.get("interval", task_config.get("interval_seconds", 2)))
+            port = int(params.get("port") or self.config["app"].get("default_port", 9222))
+        except (TypeError, ValueError) as exc:
+            self._log(f"定时讲解参数无效：{exc}")
+            return
+        material_path = str(params.get("material_path") or task_config.get("material_path", "")).strip()
+        directory = Path(material_path).expanduser().resolve() if material_path else None
+        if directory is None or not directory.is_dir():
+            self._log("定时讲解未执行：素材文件夹无效，请先在界面中选择并保存。")
+            return
+
+        overrides = {key: params[key] for key in ("playlist_path", "continuous") if key in params}
+        self._log(f"直播时段 {slot} 开始，启动讲解任务。" if slot else "定时讲解任务触发。")
+        self._start_task(directory, duration, interval, port, overrides=overrides if slot else None, slot=slot)
+
+    def _run_scheduled_stop(self, slot: Optional[str] = None, **_: Any) -> None:
+        """时段结束：只停止由该时段启动的任务，手动启动的任务不受影响。"""
+
+        self._refresh_calendar_summary()
+        if not (self.task_thread and self.task_thread.is_alive()):
+            return
+        if self.active_slot != slot:
+            self._log(f"直播时段 {slot} 结束，当前任务不属于该时段，继续运行。")
+            return
+        self._log(f"直播时段 {slot} 结束，正在停止讲解任务...")
+        self.task_control.stop()
+
     def _on_stop_task(self) -> None:
         thread = self.task_thread
         if not thread or not thread.is_alive():
             self._log("当前没有正在运行的任务。")
             return
 
+        if self.task_control.is_stopped():
+            self._log("任务正在停止，请稍候...")
+            return
         self._log("正在停止自动讲解任务...")
-        self.task_stop_event.set()
-        thread.join(timeout=10)
-        if thread.is_alive():
-            self._log("任务停止超时，请稍后再试。")
+        self.task_control.stop()
+        self.stop_task_btn.configure(state=tk.DISABLED)
+        # 不在界面线程中 join，轮询任务线程退出后再断开连接
+        self._await_task_stop(thread, time.monotonic())
+
+    def _await_task_stop(
+        self,
+        thread: threading.Thread,
+        requested: float,
+        noticed: bool = False,
+        on_stopped: Optional[Callable[[], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """轮询任务线程是否退出，退出（或超过 ``timeout`` 秒）后调用 ``on_stopped``，默认断开浏览器连接。"""
+
+        elapsed = time.monotonic() - requested
+        if thread.is_alive() and (timeout is None or elapsed < timeout):
+            if not noticed and elapsed >= STOP_NOTICE_SECONDS:
+                self._log("任务仍在停止中，正在等待当前页面操作结束...")
+                noticed = True
+            self.after(STOP_POLL_MS, lambda: self._await_task_stop(thread, requested, noticed, on_stopped, timeout))
             return
 
-        self.controller.disconnect()
-        self._log("任务已停止，并已断开浏览器连接。")
+        if on_stopped is not None:
+            on_stopped()
+            return
+        self.commands.submit("disconnect", self._disconnect_command)
+        self._log(f"任务已停止（{elapsed * 1000:.0f}ms），正在断开浏览器连接。")
 
     def _task_worker(self, directory: Path, duration: float, interval: float, port: int) -> None:
         controller = BrowserController()
+        confirmer: Optional[ModalAutoConfirmer] = None
         # 商品项选择器 - 支持新的表格结构
         # 新结构：商品在 <tr class="ant-table-row"> 中，容器是 skuContainer
         # 旧结构：商品在 div.wrapper 中
@@ -381,6 +786,8 @@ class MainWindow(tk.Tk):
         image_selector = "img.antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-img"
         # 按钮选择器 - 查找包含"讲解"文本的按钮
         button_selector = ".antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-selectBtn"
+        # 诊断仅在查找商品列表失败后执行，级别由 diagnostics.level 控制
+        diagnostics = PageDiagnostics(self.config.get("diagnostics", {}).get("level", "summary"), log=self._log)
 
         try:
             try:
@@ -391,15 +798,22 @@ class MainWindow(tk.Tk):
                 self._log(f"任务启动失败：{exc}")
                 self.after(0, lambda e=exc: messagebox.showerror("执行失败", str(e)))
                 return
+            self.task_control.check()
+            wait_timeout = timeout_error()
+
+            def page_wait(call: Callable[..., Any], seconds: float) -> Any:
+                """可取消的页面等待：以 ``timeout=毫秒`` 分片调用，任务停止后立即中止。"""
+
+                return self.task_control.sliced(lambda part: call(timeout=part * 1000), seconds, retry_on=wait_timeout)
 
             def with_context(callback: Callable[[Page], Optional[Any]], require_selector: bool = True) -> Optional[Any]:
                 def run(page: Page) -> Optional[Any]:
                     # 先尝试主页面
                     try:
                         # 等待页面加载完成
-                        page.wait_for_load_state("networkidle", timeout=10000)
+                        page_wait(partial(page.wait_for_load_state, "networkidle"), 10)
                         if require_selector:
-                            page.wait_for_selector(item_selector, timeout=10000, state="attached")
+                            page_wait(partial(page.wait_for_selector, item_selector, state="attached"), 10)
                         return callback(page)
                     except Exception:
                         if not require_selector:
@@ -412,7 +826,7 @@ class MainWindow(tk.Tk):
                         frames = page.frames
                         for candidate in frames:
                             try:
-                                candidate.wait_for_selector(item_selector, timeout=5000, state="attached")
+                                page_wait(partial(candidate.wait_for_selector, item_selector, state="attached"), 5)
                                 return callback(candidate)
                             except Exception:
                                 continue
@@ -427,310 +841,14 @@ class MainWindow(tk.Tk):
             try:
                 self._log("等待页面加载完成...")
                 # 等待页面加载状态
-                with_context(lambda ctx: ctx.wait_for_load_state("networkidle", timeout=15000), require_selector=False)
+                with_context(lambda ctx: page_wait(partial(ctx.wait_for_load_state, "networkidle"), 15), require_selector=False)
                 # 额外等待，确保React应用完全渲染
-                time.sleep(3)
+                self.task_control.delay(3)
                 self._log("页面加载完成，开始查找商品列表...")
             except Exception as exc:  # noqa: BLE001
                 logger.exception("页面加载失败")
                 self._log(f"页面加载失败：{exc}")
 
-            # 先检查页面状态，获取诊断信息
-            self._log("检查页面状态...")
-            page_info = None
-            try:
-                # 首先检查所有frames的信息
-                try:
-                    frames_info = controller.perform(
-                        lambda page: {
-                            "main_url": page.url,
-                            "main_title": page.title,
-                            "frame_count": len(page.frames),
-                            "frames": [
-                                {
-                                    "url": frame.url,
-                                    "name": frame.name or "",
-                                    "title": frame.title() if hasattr(frame, 'title') else "",
-                                    "is_main": frame == page.main_frame
-                                }
-                                for frame in page.frames[:10]  # 限制最多10个frames
-                            ]
-                        }
-                    )
-                    if frames_info:
-                        self._log(f"页面框架信息：")
-                        self._log(f"  - 主页面URL: {frames_info.get('main_url', '未知')}")
-                        self._log(f"  - 主页面标题: {frames_info.get('main_title', '未知')}")
-                        self._log(f"  - 框架总数: {frames_info.get('frame_count', 0)}")
-                        for idx, frame_info in enumerate(frames_info.get('frames', [])[:5]):
-                            frame_type = "主框架" if frame_info.get('is_main') else "子框架"
-                            self._log(f"  - 框架{idx+1} ({frame_type}): {frame_info.get('url', '未知')[:100]}")
-                except Exception as frame_exc:
-                    logger.debug("检查frames失败: {}", frame_exc)
-                    self._log(f"检查frames失败: {frame_exc}")
-                
-                page_info = controller.perform(
-                    lambda page: page.evaluate("""
-                        () => {
-                            // 检查页面加载状态
-                            const readyState = document.readyState;
-                            const hasBody = !!document.body;
-                            const bodyChildren = hasBody ? document.body.children.length : 0;
-                            
-                            // 检查是否有加载动画
-                            const loadingElements = document.querySelectorAll('.ant-spin-spinning, .page-loading-warp, [class*="loading"], [class*="spin"]');
-                            const hasLoading = loadingElements.length > 0;
-                            
-                            // 检查iframe数量
-                            const iframes = document.querySelectorAll('iframe');
-                            
-                            // 检查表格行（新结构）
-                            const tableRows = document.querySelectorAll('tr.ant-table-row');
-                            
-                            // 检查表格（更通用的选择器）
-                            const tables = document.querySelectorAll('table');
-                            const antTables = document.querySelectorAll('table.ant-table, .ant-table');
-                            
-                            // 检查商品容器（新结构）
-                            const skuContainers = document.querySelectorAll('div.antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-skuContainer');
-                            
-                            // 检查旧结构的商品容器
-                            const oldWrappers = document.querySelectorAll('div.antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-wrapper');
-                            
-                            // 检查是否有商品相关的元素
-                            const goodsElements = document.querySelectorAll('[class*="goods"], [class*="sku"], [class*="item"]');
-                            
-                            // 获取所有包含"讲解"文本的按钮
-                            const explainButtons = Array.from(document.querySelectorAll('button, a, span, div')).filter(el => {
-                                const text = (el.textContent || '').trim();
-                                return text === '讲解' || text.includes('讲解');
-                            });
-                            
-                            // 检查tbody
-                            const tbody = document.querySelector('tbody.ant-table-tbody');
-                            const allTbodies = document.querySelectorAll('tbody');
-                            
-                            // 检查所有tr元素
-                            const allTrs = document.querySelectorAll('tr');
-                            const trsWithAntTableRow = Array.from(allTrs).filter(tr => {
-                                const className = tr.className || '';
-                                return typeof className === 'string' && className.includes('ant-table-row');
-                            });
-                            
-                            // 查找包含"讲解"按钮的父容器
-                            const goodsContainers = new Set();
-                            const explainButtonDetails = [];
-                            explainButtons.forEach((btn, idx) => {
-                                const btnText = (btn.textContent || '').trim();
-                                const btnTag = btn.tagName || '';
-                                const btnClass = (btn.className || '').toString();
-                                
-                                explainButtonDetails.push({
-                                    index: idx,
-                                    tag: btnTag,
-                                    class: btnClass.substring(0, 100),
-                                    text: btnText.substring(0, 50)
-                                });
-                                
-                                let parent = btn.parentElement;
-                                let depth = 0;
-                                while (parent && depth < 10) {
-                                    if (parent.tagName === 'TR' || (parent.classList && parent.classList.length > 0)) {
-                                        const className = parent.className;
-                                        if (typeof className === 'string' && className.trim()) {
-                                            goodsContainers.add(className.split(' ')[0]);
-                                        } else if (parent.tagName === 'TR') {
-                                            goodsContainers.add('TR');
-                                        }
-                                    }
-                                    parent = parent.parentElement;
-                                    depth++;
-                                }
-                            });
-                            
-                            // 检查页面是否有内容
-                            const hasContent = document.body && document.body.innerHTML && document.body.innerHTML.length > 100;
-                            
-                            // 检查是否有React根元素
-                            const reactRoots = document.querySelectorAll('[id*="root"], [id*="app"], [class*="root"], [class*="app"]');
-                            
-                            return {
-                                readyState: readyState,
-                                hasBody: hasBody,
-                                bodyChildren: bodyChildren,
-                                hasContent: hasContent,
-                                hasLoading: hasLoading,
-                                loadingCount: loadingElements.length,
-                                iframeCount: iframes.length,
-                                tableCount: tables.length,
-                                antTableCount: antTables.length,
-                                tableRowCount: tableRows.length,
-                                allTrCount: allTrs.length,
-                                trsWithAntTableRowCount: trsWithAntTableRow.length,
-                                skuContainerCount: skuContainers.length,
-                                oldWrapperCount: oldWrappers.length,
-                                goodsCount: goodsElements.length,
-                                explainButtonCount: explainButtons.length,
-                                explainButtonDetails: explainButtonDetails.slice(0, 5), // 只返回前5个按钮的详情
-                                hasTbody: !!tbody,
-                                tbodyCount: allTbodies.length,
-                                reactRootCount: reactRoots.length,
-                                url: window.location.href,
-                                title: document.title,
-                                containerClasses: Array.from(goodsContainers).slice(0, 10),
-                                bodyHtmlLength: hasBody ? document.body.innerHTML.length : 0
-                            };
-                        }
-                    """)
-                )
-                
-                if page_info:
-                    self._log(f"页面状态：")
-                    self._log(f"  - 当前URL: {page_info.get('url', '未知')}")
-                    self._log(f"  - 页面标题: {page_info.get('title', '未知')}")
-                    self._log(f"  - 页面readyState: {page_info.get('readyState', '未知')}")
-                    self._log(f"  - 是否有body: {page_info.get('hasBody', False)}")
-                    self._log(f"  - body子元素数量: {page_info.get('bodyChildren', 0)}")
-                    self._log(f"  - body HTML长度: {page_info.get('bodyHtmlLength', 0)} 字符")
-                    self._log(f"  - 是否有内容: {page_info.get('hasContent', False)}")
-                    self._log(f"  - React根元素数量: {page_info.get('reactRootCount', 0)}")
-                    self._log(f"  - iframe数量: {page_info.get('iframeCount', 0)}")
-                    self._log(f"  - 是否有加载动画: {page_info.get('hasLoading', False)} (数量: {page_info.get('loadingCount', 0)})")
-                    self._log(f"  - 表格数量: {page_info.get('tableCount', 0)}")
-                    self._log(f"  - Ant Design表格数量: {page_info.get('antTableCount', 0)}")
-                    self._log(f"  - tbody数量: {page_info.get('tbodyCount', 0)}")
-                    self._log(f"  - 所有tr元素数量: {page_info.get('allTrCount', 0)}")
-                    self._log(f"  - 包含'ant-table-row'类的tr数量: {page_info.get('trsWithAntTableRowCount', 0)}")
-                    self._log(f"  - 表格行数量 (tr.ant-table-row): {page_info.get('tableRowCount', 0)}")
-                    self._log(f"  - 商品容器数量 (skuContainer): {page_info.get('skuContainerCount', 0)}")
-                    self._log(f"  - 旧容器数量 (wrapper): {page_info.get('oldWrapperCount', 0)}")
-                    self._log(f"  - 商品相关元素数量: {page_info.get('goodsCount', 0)}")
-                    self._log(f"  - '讲解'按钮数量: {page_info.get('explainButtonCount', 0)}")
-                    self._log(f"  - 是否有tbody.ant-table-tbody: {page_info.get('hasTbody', False)}")
-                    
-                    # 显示"讲解"按钮的详细信息
-                    explain_button_details = page_info.get('explainButtonDetails', [])
-                    if explain_button_details:
-                        self._log(f"  - '讲解'按钮详情（前{len(explain_button_details)}个）:")
-                        for btn_detail in explain_button_details:
-                            self._log(f"    按钮{btn_detail.get('index', 0)+1}: 标签={btn_detail.get('tag', '')}, 类名={btn_detail.get('class', '')[:50]}, 文本={btn_detail.get('text', '')}")
-                    
-                    container_classes = page_info.get('containerClasses', [])
-                    if container_classes:
-                        self._log(f"  - 检测到的商品容器类名: {', '.join(container_classes[:5])}")
-                    
-                    # 诊断建议
-                    if not page_info.get('hasBody'):
-                        self._log("⚠️ 警告: 页面没有body元素，可能页面还未加载")
-                    elif page_info.get('bodyHtmlLength', 0) < 100:
-                        self._log("⚠️ 警告: body内容很少，可能页面内容未加载")
-                    elif page_info.get('readyState') != 'complete':
-                        self._log(f"⚠️ 警告: 页面readyState为'{page_info.get('readyState')}'，可能还在加载中")
-                    
-                    if page_info.get('hasLoading'):
-                        self._log("页面仍在加载中，等待加载完成...")
-                        time.sleep(5)
-                    
-                    # 如果找到表格行，直接使用表格行作为选择器
-                    if page_info.get('tableRowCount', 0) > 0:
-                        self._log(f"✓ 检测到 {page_info.get('tableRowCount')} 个表格行，将优先使用表格行选择器")
-                    elif page_info.get('allTrCount', 0) > 0:
-                        self._log(f"⚠️ 找到 {page_info.get('allTrCount')} 个tr元素，但都不包含'ant-table-row'类")
-                    
-                    # 如果找到"讲解"按钮，尝试通过按钮定位商品容器
-                    if page_info.get('explainButtonCount', 0) > 0:
-                        self._log(f"✓ 找到 {page_info.get('explainButtonCount')} 个'讲解'按钮")
-                    else:
-                        self._log("⚠️ 未找到'讲解'按钮，可能页面结构已改变或页面未完全加载")
-                    
-                    logger.info(
-                        "页面状态诊断 -> url={}, readyState={}, tr.ant-table-row={}, skuContainer={}, explainButtons={}, goodsElements={}, hasLoading={}, iframeCount={}",
-                        page_info.get('url'),
-                        page_info.get('readyState'),
-                        page_info.get('tableRowCount'),
-                        page_info.get('skuContainerCount'),
-                        page_info.get('explainButtonCount'),
-                        page_info.get('goodsCount'),
-                        page_info.get('hasLoading'),
-                        page_info.get('iframeCount'),
-                    )
-            except Exception as e:
-                logger.warning("页面状态检查失败: {}", e)
-                self._log(f"页面状态检查失败: {e}")
-            
-            # 如果页面状态检查成功，但没找到元素，尝试在所有frames中查找
-            if page_info and page_info.get('tableRowCount', 0) == 0 and page_info.get('skuContainerCount', 0) == 0:
-                self._log("页面状态检查显示未找到表格行和容器，尝试在所有frames中查找...")
-                try:
-                    frames_check = controller.perform(
-                        lambda page: {
-                            "main_frame": {
-                                "url": page.url,
-                                "tr_count": len(page.query_selector_all("tr")),
-                                "table_row_count": len(page.query_selector_all("tr.ant-table-row")),
-                                "explain_button_count": len([el for el in page.query_selector_all("button, a, span, div") if "讲解" in (el.inner_text() or "")])
-                            },
-                            "other_frames": [
-                                {
-                                    "url": frame.url,
-                                    "name": frame.name or "",
-                                    "tr_count": len(frame.query_selector_all("tr")) if hasattr(frame, 'query_selector_all') else 0,
-                                    "table_row_count": len(frame.query_selector_all("tr.ant-table-row")) if hasattr(frame, 'query_selector_all') else 0,
-                                    "explain_button_count": len([el for el in frame.query_selector_all("button, a, span, div") if "讲解" in (el.inner_text() or "")]) if hasattr(frame, 'query_selector_all') else 0
-                                }
-                                for frame in page.frames[1:6]  # 检查前5个子frames
-                            ]
-                        }
-                    )
-                    if frames_check:
-                        main_info = frames_check.get("main_frame", {})
-                        self._log(f"主框架: URL={main_info.get('url', '未知')[:80]}, tr数量={main_info.get('tr_count', 0)}, 表格行数量={main_info.get('table_row_count', 0)}, 讲解按钮数量={main_info.get('explain_button_count', 0)}")
-                        for idx, frame_info in enumerate(frames_check.get("other_frames", [])):
-                            if frame_info.get('tr_count', 0) > 0 or frame_info.get('explain_button_count', 0) > 0:
-                                self._log(f"子框架{idx+1}: URL={frame_info.get('url', '未知')[:80]}, tr数量={frame_info.get('tr_count', 0)}, 表格行数量={frame_info.get('table_row_count', 0)}, 讲解按钮数量={frame_info.get('explain_button_count', 0)}")
-                    logger.info(
-                        "frame诊断 -> main(url={}, tr={}, tr_ant={}, explain={}), 子frame数量={}",
-                        main_info.get('url'),
-                        main_info.get('tr_count'),
-                        main_info.get('table_row_count'),
-                        main_info.get('explain_button_count'),
-                        len(frames_check.get("other_frames", [])),
-                    )
-                except Exception as frames_exc:
-                    logger.debug("检查frames失败: {}", frames_exc)
-                    self._log(f"检查frames失败: {frames_exc}")
-                
-                # 尝试直接使用JavaScript查找所有可能的元素
-                self._log("尝试直接查找所有tr元素...")
-                try:
-                    all_trs = controller.perform(
-                        lambda page: page.evaluate("""
-                            () => {
-                                const allTrs = document.querySelectorAll('tr');
-                                return {
-                                    total: allTrs.length,
-                                    withClass: Array.from(allTrs).filter(tr => tr.className && tr.className.includes('ant-table-row')).length,
-                                    firstTrClass: allTrs.length > 0 ? (allTrs[0].className || '') : '',
-                                    firstTrHtml: allTrs.length > 0 ? (allTrs[0].outerHTML || '').substring(0, 200) : ''
-                                };
-                            }
-                        """)
-                    )
-                    if all_trs:
-                        self._log(f"  找到 {all_trs.get('total', 0)} 个tr元素，其中 {all_trs.get('withClass', 0)} 个包含'ant-table-row'类")
-                        if all_trs.get('firstTrClass'):
-                            self._log(f"  第一个tr的类名: {all_trs.get('firstTrClass')}")
-                        if all_trs.get('firstTrHtml'):
-                            self._log(f"  第一个tr的HTML片段: {all_trs.get('firstTrHtml')}")
-                        logger.info(
-                            "all_tr诊断 -> total={}, with_ant={}, first_tr_class={}",
-                            all_trs.get('total', 0),
-                            all_trs.get('withClass', 0),
-                            all_trs.get('firstTrClass'),
-                        )
-                except Exception as tr_exc:
-                    logger.debug("查找tr元素失败: {}", tr_exc)
-            
             # 尝试多种选择器策略，增加等待时间
             # 优先尝试通过"讲解"按钮定位商品（使用JavaScript方式）
             alternative_selectors = [
@@ -754,7 +872,7 @@ class MainWindow(tk.Tk):
             for attempt in range(5):  # 最多尝试5次
                 if attempt > 0:
                     self._log(f"第 {attempt + 1} 次尝试查找商品列表...")
-                    time.sleep(2)  # 每次尝试之间等待2秒
+                    self.task_control.delay(2)  # 每次尝试之间等待2秒
                 
                 for alt_selector in alternative_selectors:
                     try:
@@ -764,7 +882,7 @@ class MainWindow(tk.Tk):
                             result = controller.perform(
                                 lambda page, selector=alt_selector: (
                                     # 先等待选择器出现
-                                    page.wait_for_selector(selector, timeout=5000, state="attached"),
+                                    page_wait(partial(page.wait_for_selector, selector, state="attached"), 5),
                                     len(page.query_selector_all(selector))
                                 )
                             )
@@ -927,7 +1045,7 @@ class MainWindow(tk.Tk):
                                     try:
                                         result = controller.perform(
                                             lambda page, sel=js_selector: (
-                                                page.wait_for_selector(sel, timeout=5000, state="attached"),
+                                                page_wait(partial(page.wait_for_selector, sel, state="attached"), 5),
                                                 len(page.query_selector_all(sel))
                                             )
                                         )
@@ -941,87 +1059,14 @@ class MainWindow(tk.Tk):
                         logger.debug("JavaScript查找失败: {}", js_e)
 
             if not found_selector:
-                # 如果所有选择器都失败，尝试输出页面内容用于诊断
-                logger.exception("等待讲解列表加载失败")
-                self._log("未检测到可讲解商品，尝试输出页面 HTML 片段用于诊断。")
+                logger.warning("等待讲解列表加载失败")
+                self._log("未检测到可讲解商品。")
                 try:
-                    snippet = with_context(lambda ctx: ctx.inner_html("body"), require_selector=False)
-                    if snippet:
-                        debug_path = directory / "debug-snippet.html"
-                        try:
-                            debug_path.write_text(snippet, encoding="utf-8")
-                            self._log(f"已将页面内容写入：{debug_path}")
-                            
-                            # 检查页面是否还在加载中
-                            loading_check = controller.perform(
-                                lambda page: page.evaluate("""
-                                    () => {
-                                        // 检查是否有加载动画
-                                        const loadingElements = document.querySelectorAll('.ant-spin-spinning, .page-loading-warp, [class*="loading"], [class*="spin"]');
-                                        const hasLoading = loadingElements.length > 0;
-                                        
-                                        // 检查是否有商品相关的元素
-                                        const goodsElements = document.querySelectorAll('[class*="goods"], [class*="sku"], [class*="item"]');
-                                        
-                                        // 获取所有包含"讲解"文本的元素
-                                        const explainElements = Array.from(document.querySelectorAll('*')).filter(el => {
-                                            const text = el.textContent || '';
-                                            return text.includes('讲解');
-                                        });
-                                        
-                                        return {
-                                            hasLoading: hasLoading,
-                                            loadingCount: loadingElements.length,
-                                            goodsCount: goodsElements.length,
-                                            explainCount: explainElements.length,
-                                            url: window.location.href
-                                        };
-                                    }
-                                """)
-                            )
-                            
-                            if loading_check:
-                                self._log(f"页面状态检查：")
-                                self._log(f"  - 当前URL: {loading_check.get('url', '未知')}")
-                                self._log(f"  - 是否有加载动画: {loading_check.get('hasLoading', False)}")
-                                self._log(f"  - 加载元素数量: {loading_check.get('loadingCount', 0)}")
-                                self._log(f"  - 商品相关元素数量: {loading_check.get('goodsCount', 0)}")
-                                self._log(f"  - 包含'讲解'的元素数量: {loading_check.get('explainCount', 0)}")
-                                
-                                if loading_check.get('hasLoading'):
-                                    self._log("页面仍在加载中，请等待页面完全加载后再试。")
-                                elif loading_check.get('goodsCount', 0) == 0:
-                                    self._log("页面已加载，但未找到商品列表元素。")
-                                    self._log("请确认：")
-                                    self._log("1. 是否已打开正确的直播后台页面（商品列表页面）")
-                                    self._log("2. 页面是否需要登录")
-                                    self._log("3. 商品列表是否需要手动刷新")
-                            
-                            # 尝试查找页面中的所有可能的选择器
-                            selectors_found = controller.perform(
-                                lambda page: page.evaluate("""
-                                    () => {
-                                        const allDivs = Array.from(document.querySelectorAll('div[class]'));
-                                        const classNames = new Set();
-                                        allDivs.forEach(div => {
-                                            if (div.className && typeof div.className === 'string') {
-                                                classNames.add(div.className);
-                                            }
-                                        });
-                                        return Array.from(classNames).slice(0, 50);
-                                    }
-                                """)
-                            )
-                            if selectors_found:
-                                debug_selector_path = directory / "debug-selectors.txt"
-                                debug_selector_path.write_text("\n".join(selectors_found), encoding="utf-8")
-                                self._log(f"已保存页面中的类名到：{debug_selector_path}")
-                        except OSError as write_exc:
-                            self._log(f"写入调试文件失败：{write_exc}")
+                    controller.perform(lambda page: diagnostics.report_failure(page, directory))
                 except Exception as debug_exc:  # noqa: BLE001
                     logger.exception("获取调试信息失败")
                     self._log(f"获取调试信息失败：{debug_exc}")
-                
+
                 self._log("未检测到可讲解商品，请检查：")
                 self._log("1. 是否已打开直播后台页面")
                 self._log("2. 页面是否已完全加载")
@@ -1087,370 +1132,182 @@ class MainWindow(tk.Tk):
                 self._log(f"选择器匹配到 {total_count} 个元素，过滤后找到 {goods_count} 个可讲解商品。")
             self._log(f"共检测到 {goods_count} 个可讲解商品，开始依次处理。")
 
+            # 播放列表只加载一次，与首个商品快照合并编译为讲解队列，之后每步 O(1) 取出
+            task_config = {**self.config.get("task", {}), **self.task_overrides}
+            playlist = self._load_playlist(task_config)
+            if playlist is None:
+                return
+            explain_queue: Optional[ExplanationQueue] = None
+            continuous = bool(task_config.get("continuous", False))
+            continuous_order = str(task_config.get("continuous_order", ORDER_SEQUENTIAL))
+            # 按单调时钟上的计划开讲时间安排每个商品，扣除点击、页面稳定等额外耗时
+            timer = ExplanationTimer(
+                interval,
+                compensate=bool(task_config.get("drift_compensation", True)),
+                tolerance=float(task_config.get("drift_tolerance_seconds", 1.0)),
+            )
+            lap = 0
+            last_sku: Optional[str] = None
+            last_step: Optional[PlaylistStep] = None
+            # 商品列表的本地镜像，每次只从页面读取变化的行
+            goods = GoodsMirror()
+            demand_catalog: Optional[List[Dict[str, Any]]] = None
+            # 分页或虚拟滚动的商品列表：每轮开始时逐页/逐屏读取的完整目录
+            list_mode = str(task_config.get("goods_list_mode", LIST_AUTO))
+            catalog: Optional[GoodsCatalog] = None
+            # 读取目录会翻页/滚动，之后需要重新读取一次增量才能使用镜像中的 DOM 索引
+            catalog_moved = False
+
+            # 图片在后台线程池中预取（当前商品及其后若干个），与点击、等待并行
+            image_config = self.config.get("image", {})
+            prefetch_depth = max(int(image_config.get("prefetch_depth", 2)), 0)
+            cache_dir = directory / ".image-cache"
+            normalizer = self._build_normalizer(cache_dir)
+            prefetched: Dict[str, "Future[Path]"] = {}
+            base_url: Optional[str] = None
+
+            def prefetch_ahead(current: PlaylistStep, rows: Mapping[str, Dict[str, Any]]) -> None:
+                nonlocal base_url
+                for upcoming in chain((current,), islice(explain_queue or (), prefetch_depth)):
+                    if upcoming.sku in prefetched or upcoming.material:
+                        continue
+                    row = rows.get(upcoming.sku)
+                    url = row.get("imageUrl") if row else None
+                    if not url:
+                        continue
+                    if not urlparse(url).netloc:
+                        if base_url is None:
+                            base_url = with_context(lambda ctx: ctx.url, require_selector=False) or "https://live.jd.com"
+                        url = urljoin(base_url, url)
+                    prefetched[upcoming.sku] = self._prefetch_image(url, cache_dir, upcoming.sku, normalizer)
+
             processed_count = 0
-            max_attempts = goods_count * 2  # 最多尝试次数，防止无限循环
-            attempt = 0
-            modal_handled = False  # 标记是否已经处理过模态框
-            processed_indices = set()  # 记录已处理过的商品索引，避免重复处理
-            processed_skus = set()  # 记录已处理过的商品SKU，避免重复处理
-            last_processed_index = -1  # 记录上次处理的商品索引
-            last_processed_sku = None  # 记录上次处理的商品SKU
-
-            while processed_count < goods_count and attempt < max_attempts:
-                attempt += 1
-                if self.task_stop_event.is_set():
-                    break
+            modal_config = self.config.get("modal", {})
+            if modal_config.get("auto_confirm", True):
+                # 页面中常驻的确认框自动确认，只处理本程序点击讲解/结束后弹出的确认框
+                confirmer = ModalAutoConfirmer(ModalRules.from_config(modal_config), on_event=self._on_modal_event)
+                try:
+                    controller.perform(confirmer.install)
+                    self._log("已启用确认框自动确认。")
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("安装确认框自动确认失败")
+                    self._log(f"确认框自动确认启用失败：{exc}")
+                    confirmer = None
+            actions = GoodsActions(
+                item_selector,
+                button_selector,
+                control=self.task_control,
+                before_click=confirmer.arm if confirmer is not None else None,
+            )
 
-                # 每次循环都重新查询商品列表，因为点击后页面可能变化
-                # 等待一下，确保页面状态已更新
-                time.sleep(1)  # 增加等待时间，确保页面状态更新
-                
-                current_items = with_context(
-                    lambda ctx: ctx.evaluate(
-                        """
-                        ({ itemSelector, buttonSelector }) => {
-                            const items = Array.from(document.querySelectorAll(itemSelector));
-                            return items.map((item, idx) => {
-                                // 查找"讲解"按钮 - 排除下拉菜单的触发按钮（三个点...）
-                                let button = null;
-                                
-                                // 辅助函数：检查是否是下拉菜单的触发按钮（三个点）
-                                const isDropdownTrigger = (node) => {
-                                    if (!node) return false;
-                                    const text = (node.textContent || node.innerText || '').trim();
-                                    // 检查是否是三个点（但排除文本为"讲解"的情况）
-                                    if (text === '讲解') {
-                                        return false; // "讲解"按钮不是下拉菜单触发按钮
-                                    }
-                                    // 检查是否是三个点或包含下拉菜单相关的类名
-                                    if (text === '...' || text === '⋯' || text === '⋮' || (text.length <= 2 && text !== '讲解')) {
-                                        return true;
-                                    }
-                                    // 检查是否包含下拉菜单相关的类名
-                                    const className = node.className || '';
-                                    if (typeof className === 'string') {
-                                        if (className.includes('dropdown') || className.includes('more') || 
-                                            className.includes('menu') || className.includes('trigger')) {
-                                            return true;
-                                        }
-                                    }
-                                    // 检查父元素是否是下拉菜单
-                                    let parent = node.parentElement;
-                                    let checkCount = 0;
-                                    while (parent && checkCount < 3) {
-                                        const parentClass = parent.className || '';
-                                        if (typeof parentClass === 'string') {
-                                            if (parentClass.includes('dropdown') || parentClass.includes('menu')) {
-                                                return true;
-                                            }
-                                        }
-                                        parent = parent.parentElement;
-                                        checkCount++;
-                                    }
-                                    return false;
-                                };
-                                
-                                // 辅助函数：获取元素的完整文本（包括内部所有子元素的文本）
-                                const getFullText = (node) => {
-                                    if (!node) return '';
-                                    // 先尝试获取 textContent（包含所有子元素的文本）
-                                    let text = (node.textContent || '').trim();
-                                    // 如果 textContent 为空，尝试获取 innerText
-                                    if (!text) {
-                                        text = (node.innerText || '').trim();
-                                    }
-                                    // 如果还是为空，尝试查找内部的 span 等元素
-                                    if (!text) {
-                                        const innerSpan = node.querySelector('span');
-                                        if (innerSpan) {
-                                            text = (innerSpan.textContent || innerSpan.innerText || '').trim();
-                                        }
-                                    }
-                                    return text;
-                                };
-                                
-                                // 方式1: 查找包含"讲解"文本的span，且类名包含selectBtn
-                                // 根据HTML结构：<span class="antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-selectBtn">讲解</span>
-                                const selectBtnSpans = Array.from(item.querySelectorAll('span.antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-selectBtn'));
-                                button = selectBtnSpans.find((span) => {
-                                    const text = getFullText(span);
-                                    // 严格匹配：文本必须是"讲解"
-                                    return text === "讲解";
-                                });
-                                
-                                // 方式2: 如果没找到，查找包含"讲解"文本的span，但排除下拉菜单
-                                if (!button) {
-                                    const allSpans = Array.from(item.querySelectorAll('span'));
-                                    button = allSpans.find((span) => {
-                                        const text = getFullText(span);
-                                        // 严格匹配：文本必须是"讲解"，不能是下拉菜单触发按钮
-                                        return text === "讲解" && !isDropdownTrigger(span);
-                                    });
-                                }
-                                
-                                // 方式3: 如果还是没找到，在整个item中查找，但排除下拉菜单
-                                if (!button) {
-                                    const allButtons = Array.from(item.querySelectorAll('button, span, div, a'));
-                                    button = allButtons.find((node) => {
-                                        const text = getFullText(node);
-                                        // 严格匹配：文本必须是"讲解"，不能是下拉菜单触发按钮
-                                        return text === "讲解" && !isDropdownTrigger(node);
-                                    });
-                                }
-                                
-                                // 获取按钮文本（使用完整文本获取函数）
-                                const buttonText = button ? getFullText(button) : '';
-                                // 判断是否已处理：按钮文本不是"讲解"或包含"取消"、"结束"等
-                                const isProcessed = !button || (
-                                    buttonText !== "讲解" && 
-                                    !buttonText.includes("讲解") &&
-                                    (buttonText.includes("取消") || buttonText.includes("结束"))
-                                );
-                                
-                                // 获取商品编号（index）
-                                // 根据HTML结构：<span class="antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-index">08</span>
-                                let itemIndex = null;
-                                const indexSpan = item.querySelector('span.antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-index');
-                                if (indexSpan) {
-                                    const indexText = (indexSpan.textContent || indexSpan.innerText || '').trim();
-                                    // 尝试解析为数字
-                                    const indexNum = parseInt(indexText, 10);
-                                    if (!isNaN(indexNum)) {
-                                        itemIndex = indexNum;
-                                    } else {
-                                        // 如果无法解析为数字，使用文本
-                                        itemIndex = indexText;
-                                    }
-                                }
-                                
-                                // 尝试获取SKU信息 - 多种方式
-                                let sku = null;
-                                
-                                // 方式1: 查找包含"SKU:"文本的元素，提取SKU后面的数字
-                                const allTextElements = Array.from(item.querySelectorAll('*'));
-                                for (const el of allTextElements) {
-                                    const text = el.textContent || '';
-                                    // 查找包含"SKU:"或"SKU："的文本
-                                    const skuMatch = text.match(/SKU[：:]\s*(\\d+)/i);
-                                    if (skuMatch && skuMatch[1]) {
-                                        sku = skuMatch[1];
-                                        break;
-                                    }
-                                }
-                                
-                                // 方式2: 查找包含SKU的元素（data-sku, data-id等属性）
-                                if (!sku) {
-                                    const skuElements = Array.from(item.querySelectorAll('[data-sku], [data-id], [data-product-id], [class*="sku"]'));
-                                    for (const el of skuElements) {
-                                        const skuValue = el.getAttribute('data-sku') || 
-                                                        el.getAttribute('data-id') || 
-                                                        el.getAttribute('data-product-id') ||
-                                                        el.getAttribute('id');
-                                        if (skuValue && skuValue.length > 0 && skuValue !== '商品图') {
-                                            // 如果是纯数字，直接使用；否则尝试提取数字
-                                            if (/^\\d+$/.test(skuValue)) {
-                                                sku = skuValue;
-                                                break;
-                                            } else {
-                                                const numMatch = skuValue.match(/\\d{10,}/);
-                                                if (numMatch) {
-                                                    sku = numMatch[0];
-                                                    break;
-                                                }
-                                            }
-                                        }
-                                    }
-                                }
-                                
-                                // 方式3: 从图片URL中提取SKU（京东商品URL通常包含SKU）
-                                if (!sku) {
-                                    const images = Array.from(item.querySelectorAll('img'));
-                                    for (const img of images) {
-                                        const imgSrc = img.src || img.getAttribute('data-src') || '';
-                                        if (imgSrc) {
-                                            // 尝试从URL中提取SKU（多种格式）
-                                            // 格式1: /jfs/t1/数字/数字/数字/数字/xxx.jpg
-                                            let skuMatch = imgSrc.match(/[\\/]jfs[\\/]t\\d+[\\/](\\d+)[\\/]/);
-                                            if (skuMatch && skuMatch[1]) {
-                                                sku = skuMatch[1];
-                                                break;
-                                            }
-                                            // 格式2: /数字/数字.jpg 或 /数字数字数字.jpg
-                                            skuMatch = imgSrc.match(/[\\/](\\d{8,})[\\/]/);
-                                            if (skuMatch && skuMatch[1]) {
-                                                sku = skuMatch[1];
-                                                break;
-                                            }
-                                            // 格式3: 查找URL中的长数字串（10位以上）
-                                            skuMatch = imgSrc.match(/[\\/](\\d{10,})/);
-                                            if (skuMatch && skuMatch[1]) {
-                                                sku = skuMatch[1];
-                                                break;
-                                            }
-                                        }
-                                    }
-                                }
-                                
-                                // 方式4: 在整个item的文本中查找长数字串（可能是SKU）
-                                if (!sku) {
-                                    const itemText = item.textContent || '';
-                                    // 查找13位数字（京东SKU通常是13位）
-                                    const skuMatch = itemText.match(/\\d{13}/);
-                                    if (skuMatch) {
-                                        sku = skuMatch[0];
-                                    } else {
-                                        // 如果没找到13位，尝试10位以上的数字
-                                        const longNumMatch = itemText.match(/\\d{10,}/);
-                                        if (longNumMatch) {
-                                            sku = longNumMatch[0];
-                                        }
-                                    }
-                                }
-                                
-                                // 方式5: 查找商品标题作为唯一标识
-                                if (!sku) {
-                                    const titleEl = item.querySelector('[class*="title"], [class*="name"], [title]');
-                                    if (titleEl) {
-                                        const title = titleEl.textContent?.trim() || titleEl.getAttribute('title') || '';
-                                        if (title && title.length > 0 && title !== '商品图') {
-                                            sku = title.substring(0, 100); // 使用完整标题作为标识
-                                        }
-                                    }
-                                }
-                                
-                                // 方式6: 使用索引+按钮文本作为后备方案（不使用时间戳，确保同一商品每次获取的SKU相同）
-                                if (!sku) {
-                                    sku = `item_${idx}_${buttonText}`;
-                                }
-                                
-                                return {
-                                    index: idx, // DOM索引
-                                    itemIndex: itemIndex, // 商品编号（从页面获取的编号，如08）
-                                    hasButton: !!button,
-                                    buttonText: buttonText,
-                                    isProcessed: isProcessed,
-                                    sku: sku // 确保有值
-                                };
-                            });
-                        }
-                        """,
-                        {
-                            "itemSelector": item_selector,
-                            "buttonSelector": button_selector,
-                        },
+            while True:
+                if self.task_control.is_stopped():
+                    break
+                settings = self.task_control.take_settings()
+                if settings:
+                    # 配置文件热加载：新的时长与间隔从下一个商品开始生效
+                    if "duration" in settings:
+                        duration = settings["duration"]
+                        if explain_queue is not None:
+                            playlist.retime(explain_queue, duration)
+                    if "interval" in settings:
+                        interval = settings["interval"]
+                        timer.interval = interval
+                    continuous = settings.get("continuous", continuous)
+                    continuous_order = settings.get("continuous_order", continuous_order)
+                    self._log(f"讲解参数已更新：讲解 {duration:g} 秒，间隔 {interval:g} 秒")
+
+                # 每次循环都重新查询商品列表，因为点击后页面可能变化；
+                # 上一个商品的结束操作已等到页面状态更新，这里无需再等待
+                # 页面只返回上次读取后发生变化的商品行，合并到本地镜像
+                goods.apply(with_context(lambda ctx: ctx.evaluate(GOODS_DELTA_SCRIPT, goods.request(item_selector))))
+                # 镜像未变化时 rows() 返回同一个列表，评论需求索引无需重建
+                current_items = goods.rows()
+                rows_by_sku = goods.by_sku
+                # 目录中还包含未渲染的商品；已渲染的行信息更新，优先使用
+                known_items = catalog.rows() if catalog is not None else current_items
+                known_by_sku = ChainMap(rows_by_sku, catalog) if catalog is not None else rows_by_sku
+                if self.comment_monitor.is_running:
+                    if demand_catalog is not known_items:
+                        self.demand_detector.set_catalog(known_items)
+                        demand_catalog = known_items
+                    demanded = self.demand_detector.poll(exclude=last_sku)
+                    demanded_row = known_by_sku.get(demanded) if demanded else None
+                    if explain_queue is not None and demanded_row and _is_explainable(demanded_row.get("buttonText", "")):
+                        # 评论需求插播：队列中有则提前，已讲过的商品重新插入队首
+                        if not explain_queue.promote(demanded):
+                            explain_queue.push_front(playlist.step_for(demanded_row, duration))
+                        self._log(f"评论集中提到商品 {demanded_row.get('itemIndex', '无编号')} (SKU: {demanded})，插播讲解。")
+                step = explain_queue.next() if explain_queue is not None else None
+                if step is None and (explain_queue is None or continuous):
+                    # 首轮或循环模式下新一轮：基于最新快照重新编译队列，
+                    # 连接、frame 与选择器沿用当前任务中已有的结果，不再重新发现
+                    lap += 1
+                    if list_mode != LIST_STATIC:
+                        catalog = with_context(
+                            lambda ctx: GoodsCatalog.open(ctx, item_selector, list_mode, checkpoint=self.task_control.check)
+                        )
+                        if catalog is not None:
+                            known_items = catalog.rows()
+                            known_by_sku = ChainMap(rows_by_sku, catalog)
+                            catalog_moved = True
+                    explain_queue = playlist.compile(
+                        (row for row in known_items if _is_explainable(row.get("buttonText", ""))),
+                        duration,
+                        order=continuous_order if lap > 1 else ORDER_SEQUENTIAL,
+                        avoid_first=last_sku,
                     )
-                ) or []
-
-                # 按商品编号（itemIndex）升序排序
-                # 先过滤出有编号的商品，然后按编号排序
-                items_with_index = []
-                items_without_index = []
-                
-                for item_info in current_items:
-                    item_index = item_info.get("itemIndex")
-                    if item_index is not None:
-                        items_with_index.append(item_info)
-                    else:
-                        items_without_index.append(item_info)
-                
-                # 按编号升序排序（编号可能是数字或字符串）
-                def sort_key(item):
-                    item_index = item.get("itemIndex")
-                    if isinstance(item_index, (int, float)):
-                        return (0, item_index)  # 数字排在前面
-                    elif isinstance(item_index, str):
-                        # 尝试解析字符串中的数字
-                        try:
-                            num = int(item_index)
-                            return (0, num)
-                        except ValueError:
-                            return (1, item_index)  # 无法解析的字符串排在后面
-                    else:
-                        return (2, 0)  # 没有编号的排在最后
-                
-                items_with_index.sort(key=sort_key)
-                
-                # 合并：有编号的在前（已排序），没有编号的在后
-                current_items = items_with_index + items_without_index
-                
-                # 找到第一个未处理的商品（按钮文本是"讲解"），按编号顺序
-                next_item = None
-                self._log(f"查询商品列表，共 {len(current_items)} 个商品（已按编号升序排序）")
-                
-                # 输出所有商品的状态，用于调试
-                for item_info in current_items:
-                    idx = item_info.get("index", -1)
-                    item_index = item_info.get("itemIndex", "无编号")
-                    btn_text = item_info.get("buttonText", "")
-                    sku = item_info.get("sku", "")
-                    is_proc = item_info.get("isProcessed", False)
-                    is_in_processed = idx in processed_indices
-                    is_sku_processed = sku in processed_skus
-                    self._log(f"  商品编号 {item_index} (DOM索引 {idx}): SKU='{sku}', 按钮文本='{btn_text}', 已处理={is_proc}, 索引已记录={is_in_processed}, SKU已记录={is_sku_processed}")
-                
-                for item_info in current_items:
-                    index = item_info.get("index", 0)
-                    button_text = item_info.get("buttonText", "").strip()
-                    sku = item_info.get("sku", "")
-                    
-                    # 跳过已经处理过的商品（通过SKU判断，更可靠）
-                    if sku and sku in processed_skus:
-                        self._log(f"跳过商品 {index} (SKU: {sku})：SKU已在已处理列表中")
-                        continue
-                    
-                    # 跳过已经处理过的商品（通过索引判断，作为后备）
-                    if index in processed_indices:
-                        self._log(f"跳过商品 {index}：索引已在已处理列表中")
-                        continue
-                    
-                    # 跳过上次处理的商品（通过SKU判断）
-                    if sku and sku == last_processed_sku:
-                        self._log(f"跳过商品 {index} (SKU: {sku})：这是上次处理的商品")
-                        continue
-                    
-                    # 跳过上次处理的商品（通过索引判断，作为后备）
-                    if index == last_processed_index:
-                        self._log(f"跳过商品 {index}：这是上次处理的商品（索引）")
-                        continue
-                    
-                    # 只选择按钮文本确实是"讲解"的商品（不包含"取消"或"结束"）
-                    item_index = item_info.get("itemIndex", "无编号")
-                    if button_text == "讲解":
-                        next_item = item_info
-                        self._log(f"找到未处理的商品：编号 {item_index}, DOM索引 {index}, SKU: {sku}")
+                    goods_count = len(explain_queue)
+                    processed_count = 0
+                    if not goods_count:
+                        if continuous and lap > 1:
+                            # 循环模式下商品可能正在上下架，稍后基于新快照重试
+                            self._log("暂无可讲解的商品，5 秒后重试。")
+                            if self.task_control.sleep(5):
+                                break
+                            timer.rebase(keep_interval=False)
+                            continue
+                        self._log("没有找到可讲解的商品。")
                         break
-                    elif button_text and "讲解" in button_text:
-                        # 如果包含"讲解"但还包含其他文本，需要检查
-                        if "取消" not in button_text and "结束" not in button_text:
-                            next_item = item_info
-                            self._log(f"找到未处理的商品：编号 {item_index}, DOM索引 {index}, SKU: {sku}")
-                            break
-
-                if not next_item:
-                    self._log("所有商品都已处理完成或没有找到可讲解的商品。")
+                    order = " → ".join(str(step.item_index) for step in islice(explain_queue, 20))
+                    lap_label = f"第 {lap} 轮" if continuous else "讲解队列"
+                    self._log(f"{lap_label}已生成，共 {goods_count} 个商品，顺序：{order}{' …' if goods_count > 20 else ''}")
+                    step = explain_queue.next()
+
+                if step is None:
+                    self._log("所有商品都已处理完成。")
                     break
 
+                sku = step.sku
+                prefetch_ahead(step, known_by_sku)
+                image_future = prefetched.pop(sku, None)
+                if catalog_moved:
+                    # 读取目录时翻过页/滚动过，本轮开头读取的镜像已过期，DOM 索引以当前页面为准
+                    goods.apply(with_context(lambda ctx: ctx.evaluate(GOODS_DELTA_SCRIPT, goods.request(item_selector))))
+                    rows_by_sku = goods.by_sku
+                    catalog_moved = False
+                next_item = rows_by_sku.get(sku)
+                if next_item is None and catalog is not None and sku in catalog:
+                    # 商品不在当前页/屏：翻页或滚动到它所在的位置，再读取一次增量
+                    if with_context(lambda ctx: catalog.reveal(ctx, sku)):
+                        goods.apply(with_context(lambda ctx: ctx.evaluate(GOODS_DELTA_SCRIPT, goods.request(item_selector))))
+                        rows_by_sku = goods.by_sku
+                        next_item = rows_by_sku.get(sku)
+                if next_item is None:
+                    self._log(f"跳过商品 {step.label}：已不在商品列表中")
+                    processed_count += 1
+                    continue
+
                 index = next_item.get("index", 0)
                 item_index = next_item.get("itemIndex", "无编号")
                 button_text = next_item.get("buttonText", "")
-                sku = next_item.get("sku", "")
                 self._log(f"准备处理第 {processed_count + 1} 个商品（商品编号: {item_index}, DOM索引: {index}, SKU: {sku}，按钮文本: '{button_text}'）")
                 
                 # 再次确认：确保按钮文本确实是"讲解"
-                if button_text.strip() != "讲解":
-                    if "取消" in button_text or "结束" in button_text:
-                        self._log(f"跳过商品 {index}：按钮文本已改变（'{button_text}'），可能已处理过")
-                        processed_indices.add(index)  # 记录到已处理列表
-                        processed_count += 1
-                        continue
-                    elif "讲解" not in button_text:
-                        self._log(f"跳过商品 {index}：按钮文本不是'讲解'（'{button_text}'）")
-                        processed_indices.add(index)  # 记录到已处理列表
-                        processed_count += 1
-                        continue
-                
-                # 注意：在处理完成后才添加索引，避免处理失败时误标记
-                # 这里先不添加，等处理完成后再添加
+                if not _is_explainable(button_text):
+                    self._log(f"跳过商品 {index}：按钮文本不是'讲解'（'{button_text}'），可能已处理过")
+                    processed_count += 1
+                    continue
                 
                 # 先下载图片
                 info = with_context(
@@ -1694,669 +1551,469 @@ class MainWindow(tk.Tk):
                 self._log(f"  - className: {image_class_name}")
                 self._log(f"  - 父元素文本: {image_parent_text}")
                 
-                # 尝试多种方式获取图片URL
-                image_url = info.get("imageUrl") or info.get("imageDataSrc")
+                # 使用固定文件名 1.jpg，后面的图片会覆盖前面的
+                destination = directory / "1.jpg"
+                if step.material:
+                    # 播放列表指定了素材覆盖，直接使用该素材，不再解析商品图片
+                    self._log(f"使用播放列表素材：{step.material}")
+                    if not self._apply_material(step.material, destination):
+                        self._log(f"素材处理失败，跳过讲解：{title}")
+                        processed_count += 1
+                        continue
+                elif self._publish_prefetched(image_future, destination):
+                    self._log(f"[{processed_count + 1}/{goods_count}] 已使用预取图片：{title}")
+                else:
+                    # 尝试多种方式获取图片URL
+                    image_url = info.get("imageUrl") or info.get("imageDataSrc")
                 
-                # 如果没有直接URL，尝试从srcset中提取
-                if not image_url:
-                    srcset = info.get("imageSrcset")
-                    if srcset:
-                        # srcset格式通常是 "url1 size1, url2 size2"，取第一个URL
-                        first_url = srcset.split(',')[0].strip().split()[0]
-                        if first_url:
-                            image_url = first_url
+                    # 如果没有直接URL，尝试从srcset中提取
+                    if not image_url:
+                        srcset = info.get("imageSrcset")
+                        if srcset:
+                            # srcset格式通常是 "url1 size1, url2 size2"，取第一个URL
+                            first_url = srcset.split(',')[0].strip().split()[0]
+                            if first_url:
+                                image_url = first_url
                 
-                # 如果还是没有URL，尝试重新查找图片
-                if not image_url:
-                    self._log("未从商品信息中获取到图片URL，尝试重新查找...")
-                    try:
-                        image_info = with_context(
-                            lambda ctx, idx=index: ctx.evaluate(
-                                """
-                                ({ itemSelector, imageSelector, index }) => {
-                                    const items = Array.from(document.querySelectorAll(itemSelector));
-                                    const item = items[index];
-                                    if (!item) {
-                                        return null;
-                                    }
+                    # 如果还是没有URL，尝试重新查找图片
+                    if not image_url:
+                        self._log("未从商品信息中获取到图片URL，尝试重新查找...")
+                        try:
+                            image_info = with_context(
+                                lambda ctx, idx=index: ctx.evaluate(
+                                    """
+                                    ({ itemSelector, imageSelector, index }) => {
+                                        const items = Array.from(document.querySelectorAll(itemSelector));
+                                        const item = items[index];
+                                        if (!item) {
+                                            return null;
+                                        }
                                     
-                                    // 查找图片 - 只选择alt为"商品图"的图片，排除"AI手卡图片"等其他图片
-                                    let image = null;
+                                        // 查找图片 - 只选择alt为"商品图"的图片，排除"AI手卡图片"等其他图片
+                                        let image = null;
                                     
-                                    // 辅助函数：检查图片是否是"AI手卡"图片
-                                    const isAIShoukaImage = (img) => {
-                                        const alt = (img.alt || '').trim();
-                                        const src = (img.src || img.getAttribute('data-src') || '').toLowerCase();
-                                        const title = (img.title || '').trim();
+                                        // 辅助函数：检查图片是否是"AI手卡"图片
+                                        const isAIShoukaImage = (img) => {
+                                            const alt = (img.alt || '').trim();
+                                            const src = (img.src || img.getAttribute('data-src') || '').toLowerCase();
+                                            const title = (img.title || '').trim();
                                         
-                                        // 检查alt、src、title中是否包含"AI"和"手卡"
-                                        if (alt.includes('AI') && alt.includes('手卡')) return true;
-                                        if (src.includes('ai') && (src.includes('shouka') || src.includes('手卡'))) return true;
-                                        if (title.includes('AI') && title.includes('手卡')) return true;
+                                            // 检查alt、src、title中是否包含"AI"和"手卡"
+                                            if (alt.includes('AI') && alt.includes('手卡')) return true;
+                                            if (src.includes('ai') && (src.includes('shouka') || src.includes('手卡'))) return true;
+                                            if (title.includes('AI') && title.includes('手卡')) return true;
                                         
-                                        // 检查父元素或兄弟元素的文本中是否包含"AI手卡"
-                                        let parent = img.parentElement;
-                                        let checkCount = 0;
-                                        while (parent && checkCount < 3) {
-                                            const parentText = (parent.textContent || '').trim();
-                                            if (parentText.includes('AI') && parentText.includes('手卡')) {
-                                                return true;
+                                            // 检查父元素或兄弟元素的文本中是否包含"AI手卡"
+                                            let parent = img.parentElement;
+                                            let checkCount = 0;
+                                            while (parent && checkCount < 3) {
+                                                const parentText = (parent.textContent || '').trim();
+                                                if (parentText.includes('AI') && parentText.includes('手卡')) {
+                                                    return true;
+                                                }
+                                                parent = parent.parentElement;
+                                                checkCount++;
                                             }
-                                            parent = parent.parentElement;
-                                            checkCount++;
-                                        }
                                         
-                                        return false;
-                                    };
+                                            return false;
+                                        };
                                     
-                                    // 方式1: 使用特定选择器，检查alt是否为"商品图"，且不是"AI手卡"图片
-                                    image = item.querySelector(imageSelector);
-                                    if (image && (isAIShoukaImage(image) || (image.alt || '').trim() !== '商品图')) {
-                                        image = null;
-                                    }
+                                        // 方式1: 使用特定选择器，检查alt是否为"商品图"，且不是"AI手卡"图片
+                                        image = item.querySelector(imageSelector);
+                                        if (image && (isAIShoukaImage(image) || (image.alt || '').trim() !== '商品图')) {
+                                            image = null;
+                                        }
                                     
-                                    // 方式2: 查找item中所有img，只选择alt为"商品图"的图片，排除"AI手卡"图片
-                                    if (!image) {
-                                        const images = Array.from(item.querySelectorAll("img"));
-                                        image = images.find(img => {
-                                            const alt = (img.alt || '').trim();
-                                            const src = img.src || img.getAttribute('data-src') || '';
-                                            // 必须是"商品图"，且不是"AI手卡"图片
-                                            return src && src.trim() !== '' && 
-                                                   alt === '商品图' && 
-                                                   !isAIShoukaImage(img);
-                                        });
-                                    }
+                                        // 方式2: 查找item中所有img，只选择alt为"商品图"的图片，排除"AI手卡"图片
+                                        if (!image) {
+                                            const images = Array.from(item.querySelectorAll("img"));
+                                            image = images.find(img => {
+                                                const alt = (img.alt || '').trim();
+                                                const src = img.src || img.getAttribute('data-src') || '';
+                                                // 必须是"商品图"，且不是"AI手卡"图片
+                                                return src && src.trim() !== '' && 
+                                                       alt === '商品图' && 
+                                                       !isAIShoukaImage(img);
+                                            });
+                                        }
                                     
-                                    // 方式3: 如果还是没找到alt为"商品图"的，选择第一个有src的图片（作为后备），但要排除"AI手卡"图片
-                                    // 注意：如果找不到alt为"商品图"的图片，说明可能没有商品图，不应该使用后备方案
-                                    // 这样可以避免下载"AI手卡"图片
-                                    // if (!image) {
-                                    //     const images = Array.from(item.querySelectorAll("img"));
-                                    //     image = images.find(img => {
-                                    //         const src = img.src || img.getAttribute('data-src') || '';
-                                    //         return src && src.trim() !== '' && !isAIShoukaImage(img);
-                                    //     });
-                                    // }
+                                        // 方式3: 如果还是没找到alt为"商品图"的，选择第一个有src的图片（作为后备），但要排除"AI手卡"图片
+                                        // 注意：如果找不到alt为"商品图"的图片，说明可能没有商品图，不应该使用后备方案
+                                        // 这样可以避免下载"AI手卡"图片
+                                        // if (!image) {
+                                        //     const images = Array.from(item.querySelectorAll("img"));
+                                        //     image = images.find(img => {
+                                        //         const src = img.src || img.getAttribute('data-src') || '';
+                                        //         return src && src.trim() !== '' && !isAIShoukaImage(img);
+                                        //     });
+                                        // }
                                     
-                                    return {
-                                        imageUrl: image ? image.src : null,
-                                        imageSrcset: image ? image.srcset : null,
-                                        imageDataSrc: image ? image.getAttribute('data-src') : null,
-                                        imageAlt: image ? (image.alt || '') : null,
-                                        imageTitle: image ? (image.title || '') : null,
-                                        imageSrc: image ? image.src : null,
-                                        imageClassName: image ? image.className : null,
-                                        imageParentText: image && image.parentElement ? (image.parentElement.textContent || '').substring(0, 100) : null
-                                    };
-                                }
-                                """,
-                                {
-                                    "itemSelector": item_selector,
-                                    "imageSelector": image_selector,
-                                    "index": idx,
-                                },
+                                        return {
+                                            imageUrl: image ? image.src : null,
+                                            imageSrcset: image ? image.srcset : null,
+                                            imageDataSrc: image ? image.getAttribute('data-src') : null,
+                                            imageAlt: image ? (image.alt || '') : null,
+                                            imageTitle: image ? (image.title || '') : null,
+                                            imageSrc: image ? image.src : null,
+                                            imageClassName: image ? image.className : null,
+                                            imageParentText: image && image.parentElement ? (image.parentElement.textContent || '').substring(0, 100) : null
+                                        };
+                                    }
+                                    """,
+                                    {
+                                        "itemSelector": item_selector,
+                                        "imageSelector": image_selector,
+                                        "index": idx,
+                                    },
+                                )
                             )
-                        )
-                        if image_info:
-                            image_url = image_info.get("imageUrl") or image_info.get("imageDataSrc")
-                            if not image_url and image_info.get("imageSrcset"):
-                                srcset = image_info.get("imageSrcset")
-                                first_url = srcset.split(',')[0].strip().split()[0]
-                                if first_url:
-                                    image_url = first_url
+                            if image_info:
+                                image_url = image_info.get("imageUrl") or image_info.get("imageDataSrc")
+                                if not image_url and image_info.get("imageSrcset"):
+                                    srcset = image_info.get("imageSrcset")
+                                    first_url = srcset.split(',')[0].strip().split()[0]
+                                    if first_url:
+                                        image_url = first_url
                             
-                            # 记录重新查找的图片信息
-                            if image_info.get("imageAlt"):
-                                self._log(f"重新查找的图片alt: {image_info.get('imageAlt')}")
-                            if image_info.get("imageParentText"):
-                                self._log(f"重新查找的图片父元素文本: {image_info.get('imageParentText')}")
-                    except Exception as img_exc:  # noqa: BLE001
-                        logger.exception("重新查找图片时发生异常")
-                        self._log(f"重新查找图片异常：{img_exc}")
-
-                if not image_url:
-                    self._log(f"[{processed_count + 1}/{goods_count}] 未获取到图片URL，跳过下载。")
-                    self._log(f"图片信息：alt={image_alt}, title={image_title}, src={image_src}")
-                    processed_count += 1
-                    continue
-                
-                # 处理相对URL
-                if not urlparse(image_url).netloc:
-                    # 获取当前页面URL作为基础URL
-                    base_url = with_context(lambda ctx: ctx.url) or "https://live.jd.com"
-                    image_url = urljoin(base_url, image_url)
-                
-                # 检查图片URL和alt属性，排除"AI手卡图片"等非商品图片
-                image_alt_check = info.get("imageAlt", "")
-                if image_alt_check:
-                    self._log(f"图片alt属性: {image_alt_check}")
-                    if 'AI' in image_alt_check and '手卡' in image_alt_check:
-                        self._log(f"警告：图片alt同时包含'AI'和'手卡'关键词，跳过下载：{image_alt_check}")
+                                # 记录重新查找的图片信息
+                                if image_info.get("imageAlt"):
+                                    self._log(f"重新查找的图片alt: {image_info.get('imageAlt')}")
+                                if image_info.get("imageParentText"):
+                                    self._log(f"重新查找的图片父元素文本: {image_info.get('imageParentText')}")
+                        except Exception as img_exc:  # noqa: BLE001
+                            logger.exception("重新查找图片时发生异常")
+                            self._log(f"重新查找图片异常：{img_exc}")
+
+                    if not image_url:
+                        self._log(f"[{processed_count + 1}/{goods_count}] 未获取到图片URL，跳过下载。")
+                        self._log(f"图片信息：alt={image_alt}, title={image_title}, src={image_src}")
                         processed_count += 1
                         continue
                 
-                # 检查图片URL是否包含"AI"或"手卡"等关键词
-                if 'AI' in image_url.upper() and ('手卡' in image_url or 'shouka' in image_url.lower() or 'aishouka' in image_url.lower()):
-                    self._log(f"警告：图片URL同时包含'AI'和'手卡'关键词，跳过下载：{image_url}")
-                    processed_count += 1
-                    continue
+                    # 处理相对URL
+                    if not urlparse(image_url).netloc:
+                        # 获取当前页面URL作为基础URL
+                        base_url = with_context(lambda ctx: ctx.url) or "https://live.jd.com"
+                        image_url = urljoin(base_url, image_url)
                 
-                # 检查父元素文本
-                if image_parent_text and 'AI' in image_parent_text and '手卡' in image_parent_text:
-                    self._log(f"警告：图片父元素文本同时包含'AI'和'手卡'关键词，跳过下载：{image_parent_text}")
-                    processed_count += 1
-                    continue
+                    # 检查图片URL和alt属性，排除"AI手卡图片"等非商品图片
+                    image_alt_check = info.get("imageAlt", "")
+                    if image_alt_check:
+                        self._log(f"图片alt属性: {image_alt_check}")
+                        if 'AI' in image_alt_check and '手卡' in image_alt_check:
+                            self._log(f"警告：图片alt同时包含'AI'和'手卡'关键词，跳过下载：{image_alt_check}")
+                            processed_count += 1
+                            continue
                 
-                # 使用固定文件名 1.jpg，后面的图片会覆盖前面的
-                destination = directory / "1.jpg"
+                    # 检查图片URL是否包含"AI"或"手卡"等关键词
+                    if 'AI' in image_url.upper() and ('手卡' in image_url or 'shouka' in image_url.lower() or 'aishouka' in image_url.lower()):
+                        self._log(f"警告：图片URL同时包含'AI'和'手卡'关键词，跳过下载：{image_url}")
+                        processed_count += 1
+                        continue
                 
-                self._log(f"[{processed_count + 1}/{goods_count}] 开始下载图片：{title}")
-                self._log(f"图片URL: {image_url}")
-                self._log(f"保存路径: {destination}")
-                if not self._download_image(image_url, destination):
-                    self._log(f"下载失败，跳过讲解：{title}")
-                    processed_count += 1
-                    continue
-                self._log("下载完成。")
+                    # 检查父元素文本
+                    if image_parent_text and 'AI' in image_parent_text and '手卡' in image_parent_text:
+                        self._log(f"警告：图片父元素文本同时包含'AI'和'手卡'关键词，跳过下载：{image_parent_text}")
+                        processed_count += 1
+                        continue
+                
+                    self._log(f"[{processed_count + 1}/{goods_count}] 开始下载图片：{title}")
+                    self._log(f"图片URL: {image_url}")
+                    self._log(f"保存路径: {destination}")
+                    if not self._download_image(image_url, destination, normalizer, sku):
+                        self._log(f"下载失败，跳过讲解：{title}")
+                        processed_count += 1
+                        continue
+                    self._log("下载完成。")
 
-                # 使用JavaScript查找并点击"讲解"按钮
-                clicked = False
+                # 通过定位器点击"讲解"按钮，等到该商品出现"结束"按钮（需要时先点击确认框）
                 try:
-                    clicked = with_context(
-                        lambda ctx, idx=index: ctx.evaluate(
-                            """
-                            ({ itemSelector, buttonSelector, index }) => {
-                                const items = Array.from(document.querySelectorAll(itemSelector));
-                                const item = items[index];
-                                if (!item) {
-                                    return false;
-                                }
-                                
-                                const isDropdownTrigger = (node) => {
-                                    if (!node) return false;
-                                    const text = (node.textContent || '').trim();
-                                    if (text === '...' || text === '⋯' || text === '⋮' || (text.length <= 2 && text !== '讲解')) {
-                                        return true;
-                                    }
-                                    const className = node.className || '';
-                                    if (typeof className === 'string') {
-                                        const lower = className.toLowerCase();
-                                        if (lower.includes('dropdown') || lower.includes('more') || lower.includes('trigger')) {
-                                            return true;
-                                        }
-                                    }
-                                    let parent = node.parentElement;
-                                    let depth = 0;
-                                    while (parent && depth < 3) {
-                                        const parentClass = parent.className || '';
-                                        if (typeof parentClass === 'string') {
-                                            const lower = parentClass.toLowerCase();
-                                            if (lower.includes('dropdown') || lower.includes('menu')) {
-                                                return true;
-                                            }
-                                        }
-                                        parent = parent.parentElement;
-                                        depth++;
-                                    }
-                                    return false;
-                                };
-                                
-                                const getFullText = (node) => {
-                                    if (!node) return '';
-                                    let text = (node.textContent || '').trim();
-                                    if (!text) {
-                                        text = (node.innerText || '').trim();
-                                    }
-                                    if (!text) {
-                                        const span = node.querySelector('span');
-                                        if (span) {
-                                            text = (span.textContent || span.innerText || '').trim();
-                                        }
-                                    }
-                                    return text;
-                                };
-                                
-                                let button = null;
-                                
-                                if (buttonSelector) {
-                                    const buttons = Array.from(item.querySelectorAll(buttonSelector));
-                                    button = buttons.find((node) => getFullText(node) === '讲解');
-                                }
-                                
-                                if (!button) {
-                                    const candidates = Array.from(item.querySelectorAll('button, span, div, a'));
-                                    button = candidates.find((node) => getFullText(node) === '讲解' && !isDropdownTrigger(node));
-                                }
-                                
-                                if (!button) {
-                                    return false;
-                                }
-                                
-                                try {
-                                    button.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                                } catch (e) {}
-                                
-                                try {
-                                    button.click();
-                                    return true;
-                                } catch (e) {
-                                    try {
-                                        const clickEvent = new MouseEvent('click', {
-                                            bubbles: true,
-                                            cancelable: true,
-                                            view: window,
-                                        });
-                                        button.dispatchEvent(clickEvent);
-                                        return true;
-                                    } catch (e2) {
-                                        return false;
-                                    }
-                                }
-                            }
-                            """,
-                            {
-                                "itemSelector": item_selector,
-                                "buttonSelector": button_selector,
-                                "index": index,
-                            },
-                        ),
-                        require_selector=False,
-                    )
+                    result = with_context(lambda ctx, idx=index: actions.explain(ctx, idx, sku))
                 except Exception as exc:  # noqa: BLE001
                     logger.exception("点击讲解按钮时发生异常")
                     self._log(f"点击按钮异常：{exc}")
-                    clicked = False
-
-                if not clicked:
-                    self._log(f"未找到第 {processed_count + 1} 个商品的讲解按钮，跳过。")
-                    processed_indices.add(index)
-                    if sku:
-                        processed_skus.add(sku)
+                    result = None
+                if not result or not result.ok:
+                    reason = f"：{result.detail}" if result and result.detail else ""
+                    self._log(f"第 {processed_count + 1} 个商品未能开始讲解{reason}，跳过。")
                     processed_count += 1
                     continue
-
-                self._log(f"已点击讲解按钮：{title}")
-                
-                # 只在第一次点击时等待并处理确认模态框
-                if not modal_handled:
-                    try:
-                        self._log("检查是否需要确认（仅第一次）...")
-                        # 等待模态框出现（最多等待2秒）
-                        modal_confirmed = False
-                        for wait_attempt in range(20):  # 20次，每次100ms，共2秒
-                            if self.task_stop_event.is_set():
-                                break
-                            try:
-                                modal_confirmed = with_context(
-                                    lambda ctx: ctx.evaluate(
-                                        """
-                                        () => {
-                                            // 查找确认模态框/弹出框
-                                            // 优先在 ant-popover 中查找
-                                            const popover = document.querySelector('.ant-popover');
-                                            if (popover) {
-                                                const popoverButtons = Array.from(popover.querySelectorAll('button'));
-                                                const confirmButton = popoverButtons.find((node) => {
-                                                    // 获取按钮文本（包括内部span的文本）
-                                                    const text = (node.textContent || '').trim().replace(/\s+/g, '');
-                                                    // 查找包含"确定"且是 primary 类型的按钮
-                                                    return (text === "确定" || text.includes("确定")) && 
-                                                           node.classList.contains('ant-btn-primary');
-                                                });
-                                                
-                                                if (confirmButton) {
-                                                    // 滚动到按钮位置
-                                                    confirmButton.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                                                    // 等待一下
-                                                    const startTime = Date.now();
-                                                    while (Date.now() - startTime < 200) {}
-                                                    
-                                                    // 点击确定按钮
-                                                    try {
-                                                        confirmButton.click();
-                                                        return true;
-                                                    } catch (e) {
-                                                        try {
-                                                            const clickEvent = new MouseEvent('click', {
-                                                                bubbles: true,
-                                                                cancelable: true,
-                                                                view: window
-                                                            });
-                                                            confirmButton.dispatchEvent(clickEvent);
-                                                            return true;
-                                                        } catch (e2) {
-                                                            return false;
-                                                        }
-                                                    }
-                                                }
-                                            }
-                                            
-                                            // 如果没找到popover，尝试查找所有包含"确定"的primary按钮
-                                            const allButtons = Array.from(document.querySelectorAll('button.ant-btn-primary'));
-                                            const confirmButton = allButtons.find((node) => {
-                                                const text = (node.textContent || '').trim().replace(/\s+/g, '');
-                                                return text === "确定" || text.includes("确定");
-                                            });
-                                            
-                                            if (confirmButton) {
-                                                confirmButton.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                                                const startTime = Date.now();
-                                                while (Date.now() - startTime < 200) {}
-                                                
-                                                try {
-                                                    confirmButton.click();
-                                                    return true;
-                                                } catch (e) {
-                                                    try {
-                                                        const clickEvent = new MouseEvent('click', {
-                                                            bubbles: true,
-                                                            cancelable: true,
-                                                            view: window
-                                                        });
-                                                        confirmButton.dispatchEvent(clickEvent);
-                                                        return true;
-                                                    } catch (e2) {
-                                                        return false;
-                                                    }
-                                                }
-                                            }
-                                            
-                                            return false;
-                                        }
-                                        """
-                                    ),
-                                    require_selector=False
-                                )
-                                if modal_confirmed:
-                                    self._log("已点击确认按钮")
-                                    modal_handled = True  # 标记已处理
-                                    # 等待模态框关闭
-                                    time.sleep(0.5)
-                                    break
-                            except Exception:
-                                pass
-                            time.sleep(0.1)
-                        
-                        if not modal_confirmed:
-                            self._log("未检测到确认模态框（这是正常的，不是所有商品都需要确认）")
-                            modal_handled = True  # 即使没找到模态框，也标记为已处理，后续不再检查
-                    except Exception as modal_exc:  # noqa: BLE001
-                        logger.exception("处理确认模态框时发生异常")
-                        self._log(f"处理确认模态框异常：{modal_exc}")
-                        modal_handled = True  # 发生异常也标记为已处理，避免后续重复检查
-                else:
-                    self._log("跳过模态框检查（已处理过）")
-                
-                # 点击"讲解"后，页面可能会重新加载，需要等待页面完全加载
-                self._log("等待页面重新加载（点击讲解后）...")
-                try:
-                    # 等待页面加载完成（如果页面重新加载了）
-                    with_context(lambda ctx: ctx.wait_for_load_state("networkidle", timeout=15000), require_selector=False)
-                    self._log("页面加载完成")
-                except Exception:
-                    self._log("页面可能没有重新加载，继续等待...")
-                
-                # 等待商品列表重新渲染
-                self._log("等待商品列表重新渲染...")
-                time.sleep(3)  # 等待3秒，确保React应用完全渲染
-                
-                # 再次等待网络空闲，确保所有资源加载完成
-                try:
-                    with_context(lambda ctx: ctx.wait_for_load_state("networkidle", timeout=10000), require_selector=False)
-                    time.sleep(1)  # 额外等待1秒
-                except Exception:
-                    pass
-                
-                self._log("页面状态已稳定，开始讲解")
+                if result.confirmed:
+                    self._log("已点击确认按钮")
+                self._log(f"已点击讲解按钮，{result.elapsed * 1000:.0f}ms 后生效：{title}")
                 self._log(f"开始讲解：{title}")
                 
-                # 等待讲解时间
-                if self.task_stop_event.wait(duration):
+                # 等待讲解时间，期间的评论互动计入该商品的讲解窗口
+                self.analytics.begin_window(sku, title)
+                timer.mark_explaining(step.duration)
+                outcome = self._wait_for_control(timer.explain_remaining(), sku)
+                self._report_window(self.analytics.end_window())
+                if outcome.stopped:
                     break
+                if outcome.reason == REASON_REPLAY and explain_queue is not None:
+                    # 重播上一个商品，之后继续讲解被打断的当前商品
+                    explain_queue.push_front(step)
+                    if last_step is not None:
+                        explain_queue.push_front(last_step)
+                if outcome.cut_short:
+                    # 跳过、重播或插播提前结束了本次讲解，后续计划以当前时刻重新安排
+                    timer.rebase()
+                elif outcome.early:
+                    # 暂停或追加时间只推迟截止时间，间隔保持不变
+                    timer.shift(outcome.extended + outcome.paused)
                 
-                # 在开始下一个商品之前，先停止当前讲解
+                # 在开始下一个商品之前，先停止当前讲解，等到列表中不再有"结束"按钮
                 self._log(f"讲解时间到，准备停止当前讲解：{title}")
                 try:
-                    # 多次尝试查找停止按钮，因为可能需要等待页面更新
-                    stopped = False
-                    for stop_attempt in range(10):  # 最多尝试10次，每次200ms，共2秒
-                        if self.task_stop_event.is_set():
-                            break
-                        try:
-                            stopped = with_context(
-                                lambda ctx: ctx.evaluate(
-                                    """
-                                    () => {
-                                        // 查找"结束"按钮
-                                        // 根据HTML结构，"结束"按钮是一个span元素，在包含"取消｜结束"的容器中
-                                        
-                                        let stopButton = null;
-                                        
-                                        // 方式1: 查找包含"结束"文本的span，且类名包含selectBtn和hover
-                                        // 根据HTML结构：<span class="antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-selectBtn antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-hover">结束</span>
-                                        const allSpans = Array.from(document.querySelectorAll('span'));
-                                        stopButton = allSpans.find((span) => {
-                                            const text = (span.textContent || span.innerText || '').trim();
-                                            // 检查类名：必须同时包含selectBtn和hover类
-                                            const hasSelectBtnClass = span.classList.contains('antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-selectBtn');
-                                            const hasHoverClass = span.classList.contains('antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-hover');
-                                            // 严格匹配：文本必须是"结束"，且必须同时有这两个类
-                                            return text === '结束' && hasSelectBtnClass && hasHoverClass;
-                                        });
-                                        
-                                        // 方式2: 查找包含"结束"文本的span，且父元素包含"取消"和"结束"
-                                        if (!stopButton) {
-                                            stopButton = allSpans.find((span) => {
-                                                const text = (span.textContent || '').trim();
-                                                if (text === '结束') {
-                                                    // 向上查找包含"取消"和"结束"的父容器
-                                                    let parent = span.parentElement;
-                                                    while (parent) {
-                                                        const parentText = (parent.textContent || '').trim();
-                                                        if (parentText.includes('取消') && parentText.includes('结束')) {
-                                                            // 检查父元素是否有selectBtn类
-                                                            if (parent.classList.contains('antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-selectBtn') ||
-                                                                parent.querySelector('.antd-pro-pages-control-panel-goods-components-normal-goods-sku-item-index-selectBtn')) {
-                                                                return true;
-                                                            }
-                                                        }
-                                                        parent = parent.parentElement;
-                                                    }
-                                                }
-                                                return false;
-                                            });
-                                        }
-                                        
-                                        // 方式3: 查找所有包含"结束"文本的span，且在同一容器中有"取消"
-                                        if (!stopButton) {
-                                            stopButton = allSpans.find((span) => {
-                                                const text = (span.textContent || '').trim();
-                                                if (text === '结束') {
-                                                    // 查找最近的包含"取消"的容器
-                                                    const container = span.closest('[class*="selectBtn"], [class*="buttonContainer"]');
-                                                    if (container) {
-                                                        const containerText = container.textContent || '';
-                                                        return containerText.includes('取消') && containerText.includes('结束');
-                                                    }
-                                                }
-                                                return false;
-                                            });
-                                        }
-                                        
-                                        // 方式4: 查找所有包含"结束"文本的元素
-                                        if (!stopButton) {
-                                            const allElements = Array.from(document.querySelectorAll('span'));
-                                            stopButton = allElements.find((node) => {
-                                                const text = (node.textContent || '').trim();
-                                                return text === '结束';
-                                            });
-                                        }
-                                        
-                                        if (stopButton) {
-                                            // 滚动到按钮位置
-                                            stopButton.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                                            // 等待一下
-                                            const startTime = Date.now();
-                                            while (Date.now() - startTime < 500) {}
-                                            
-                                            // 点击停止按钮
-                                            try {
-                                                stopButton.click();
-                                                // 等待点击响应
-                                                const clickWaitTime = Date.now();
-                                                while (Date.now() - clickWaitTime < 200) {}
-                                                return true;
-                                            } catch (e) {
-                                                try {
-                                                    const clickEvent = new MouseEvent('click', {
-                                                        bubbles: true,
-                                                        cancelable: true,
-                                                        view: window
-                                                    });
-                                                    stopButton.dispatchEvent(clickEvent);
-                                                    const clickWaitTime = Date.now();
-                                                    while (Date.now() - clickWaitTime < 200) {}
-                                                    return true;
-                                                } catch (e2) {
-                                                    return false;
-                                                }
-                                            }
-                                        }
-                                        
-                                        return false;
-                                    }
-                                    """
-                                ),
-                                require_selector=False
-                            )
-                            if stopped:
-                                self._log("已点击停止按钮")
-                                time.sleep(1)  # 等待停止操作完成
-                                break
-                        except Exception:
-                            pass
-                        time.sleep(0.2)
-                    
-                    if not stopped:
-                        self._log("未找到停止按钮，尝试继续...")
+                    result = with_context(lambda ctx: actions.stop(ctx))
                 except Exception as stop_exc:  # noqa: BLE001
                     logger.exception("停止讲解时发生异常")
                     self._log(f"停止讲解异常：{stop_exc}")
-                    
+                    result = None
+                if result and result.ok:
+                    self._log(f"已点击停止按钮，{result.elapsed * 1000:.0f}ms 后生效")
+                elif result:
+                    self._log(f"停止讲解未生效：{result.detail}，尝试继续...")
                 self._log(f"讲解结束：{title}")
-                
-                # 停止后，页面可能会重新加载，需要等待页面完全加载
-                self._log("等待页面重新加载...")
-                try:
-                    # 等待页面加载完成（如果页面重新加载了）
-                    with_context(lambda ctx: ctx.wait_for_load_state("networkidle", timeout=15000), require_selector=False)
-                    self._log("页面加载完成")
-                except Exception:
-                    self._log("页面可能没有重新加载，继续等待...")
-                
-                # 等待页面完全稳定，确保商品列表重新渲染
-                self._log("等待商品列表重新渲染...")
-                time.sleep(3)  # 等待3秒，确保React应用完全渲染
-                
-                # 再次等待网络空闲，确保所有资源加载完成
-                try:
-                    with_context(lambda ctx: ctx.wait_for_load_state("networkidle", timeout=10000), require_selector=False)
-                    time.sleep(1)  # 额外等待1秒
-                except Exception:
-                    pass
-                
-                self._log("页面状态已稳定，准备处理下一个商品")
-                
-                # 处理完成后，将索引和SKU添加到已处理列表
-                processed_indices.add(index)
-                if sku:
-                    processed_skus.add(sku)
-                last_processed_index = index  # 记录本次处理的索引
-                last_processed_sku = sku  # 记录本次处理的SKU
-                self._log(f"已记录商品（索引: {index}, SKU: {sku}）到已处理列表（处理完成）")
+
+                self._log(f"已完成商品讲解（索引: {index}, SKU: {sku}）")
+                last_sku = sku
+                last_step = step
                 
                 processed_count += 1
 
                 # 如果还有商品未处理，等待间隔时间
-                if processed_count < goods_count and interval > 0:
-                    self._log(f"等待 {interval} 秒准备下一场。")
-                    if self.task_stop_event.wait(interval):
+                wait_seconds = timer.interval_remaining()
+                if (continuous or len(explain_queue)) and wait_seconds > 0:
+                    self._log(f"等待 {wait_seconds:.1f} 秒准备下一场。")
+                    outcome = self._wait_for_control(wait_seconds, sku, min_dwell=0, extendable=False)
+                    if outcome.stopped:
                         break
-                    
-                    # 间隔等待后，再次确保页面稳定
-                    try:
-                        with_context(lambda ctx: ctx.wait_for_load_state("networkidle", timeout=5000), require_selector=False)
-                        time.sleep(1)  # 增加等待时间，确保页面状态更新
-                    except Exception:
-                        pass
-                
-                # 重要：在下次循环开始前，再次等待一下，确保页面状态完全更新
-                # 这样重新查询商品列表时，第一个商品的状态应该已经更新（不再是"讲解"）
-                time.sleep(0.5)
-
-            if self.task_stop_event.is_set():
+                    if outcome.reason == REASON_REPLAY:
+                        explain_queue.push_front(step)
+                    if outcome.cut_short:
+                        timer.rebase(keep_interval=False)
+                    elif outcome.paused:
+                        timer.shift(outcome.paused)
+
+                timer.interval_done()
+
+            if timer.started:
+                self._log(timer.summary())
+            if self.task_control.is_stopped():
                 self._log("自动讲解任务已被手动停止。")
             else:
                 self._log("自动讲解任务已完成。")
+        except TaskCancelled:
+            # 停止命令中断了页面等待、点击或图片下载
+            self._log("自动讲解任务已被手动停止。")
         finally:
+            self.analytics.end_window()
+            if confirmer is not None:
+                # 任务结束后页面中不再自动确认，运营人员手动操作时的确认框不受影响
+                try:
+                    controller.perform(confirmer.uninstall)
+                except Exception as exc:  # noqa: BLE001
+                    logger.debug("移除确认框自动确认失败: {}", exc)
             controller.disconnect()
-            self.task_thread = None
-            self.task_stop_event.clear()
+            self.comment_monitor.stop()
+            # 未处理的插播需求属于本场任务，不带入下一次任务
+            self.demand_detector.reset()
+            self.active_slot = None
+            self.task_overrides = {}
+            self.task_control.reset()
             self.after(0, lambda: self._set_task_running(False))
+            # 最后才清除线程引用：清理完成前 task_thread 仍指向本线程，不会启动新任务
+            self.task_thread = None
 
-    def _download_image(self, url: str, destination: Path) -> bool:
+    def _on_modal_event(self, event: Dict[str, Any]) -> None:
+        """页面自动确认回报（在任务线程中调用）。"""
+
+        if event.get("event") == EVENT_CONFIRMED:
+            self._log(f"已自动确认：{event.get('text', '')}")
+        else:
+            self._log(f"确认框包含“{event.get('keyword', '')}”，未自动确认：{event.get('text', '')}")
+
+    def _on_keyword_hit(self, hit: KeywordHit) -> None:
+        """关键词命中时写入日志，同一关键词在冷却时间内只提醒一次。"""
+
+        now = time.monotonic()
+        last = self._keyword_alerted.get(hit.keyword)
+        if last is not None and now - last < self.keyword_alert_cooldown:
+            return
+        self._keyword_alerted[hit.keyword] = now
+        user = hit.comment.user or "观众"
+        self._log(f"关键词提醒：[{hit.keyword}] 累计 {hit.total} 次，{user}：{hit.comment.text}")
+
+    def _wait_for_control(
+        self,
+        seconds: float,
+        current_sku: str,
+        min_dwell: Optional[float] = None,
+        extendable: bool = True,
+    ) -> WaitOutcome:
+        """等待指定时间，期间响应控制命令。
+
+        已等待 ``min_dwell`` 秒后若有其他商品的评论插播需求，则提前结束等待。
+        """
+
+        dwell = self.demand_min_dwell if min_dwell is None else min_dwell
+        outcome = self.task_control.wait(
+            seconds,
+            extendable=extendable,
+            # 插播需求只在弹幕监控运行时被取走，监控停止后残留的需求不应打断等待
+            interrupt=lambda elapsed: (
+                elapsed >= dwell
+                and self.comment_monitor.is_running
+                and self.demand_detector.has_pending(exclude=current_sku)
+            ),
+        )
+        if outcome.reason == REASON_INTERRUPT:
+            self._log("检测到评论插播需求，提前结束当前等待。")
+        return outcome
+
+    def _report_window(self, window: Optional[ExplanationWindow]) -> None:
+        if window is None or not self.comment_monitor.is_running:
+            return
+        self._log(
+            f"讲解互动：{window.label}，评论 {window.comments} 条"
+            f"（{window.comments_per_minute:.1f} 条/分钟），独立用户 {window.unique_users}，关键词命中 {window.keyword_hits}"
+        )
+
+    def _load_playlist(self, task_config: Dict[str, Any]) -> Optional[Playlist]:
+        """加载 playlist_path 指定的播放列表，未配置时返回空播放列表。"""
+
+        include_unlisted = bool(task_config.get("playlist_include_unlisted", True))
+        playlist_path = str(task_config.get("playlist_path") or "").strip()
+        if not playlist_path:
+            return Playlist(include_unlisted=True)
+
+        path = Path(playlist_path).expanduser()
+        if not path.is_absolute():
+            path = self.config_manager.path.parent / path
         try:
-            # 清理URL，移除可能的查询参数和片段
-            clean_url = url.split('?')[0].split('#')[0]
-            
-            # 设置更完整的请求头，模拟浏览器
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
-                "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-                "Referer": "https://live.jd.com/",
-            }
-            
-            request = Request(clean_url, headers=headers)
-            with urlopen(request, timeout=30) as response:
-                # 检查响应状态
-                if response.status != 200:
-                    self._log(f"下载图片失败：HTTP状态码 {response.status}")
-                    return False
-                
-                # 检查内容类型
-                content_type = response.headers.get("Content-Type", "").lower()
-                if not content_type.startswith("image/"):
-                    self._log(f"警告：响应不是图片类型，Content-Type: {content_type}")
-                    # 继续尝试下载，因为某些服务器可能不返回正确的Content-Type
-                
-                data = response.read()
-                
-                # 验证数据不为空
-                if not data or len(data) < 100:  # 至少100字节
-                    self._log("下载的图片数据为空或过小")
-                    return False
-                    
-        except URLError as exc:
-            logger.exception("下载图片失败")
-            self._log(f"下载图片失败：{exc}")
-            return False
-        except Exception as exc:  # noqa: BLE001
-            logger.exception("下载图片时发生异常")
-            self._log(f"下载图片异常：{exc}")
+            playlist = Playlist.load(path, include_unlisted=include_unlisted)
+        except (PlaylistError, OSError, ValueError) as exc:
+            logger.exception("加载播放列表失败")
+            self._log(f"加载播放列表失败：{exc}")
+            return None
+        self._log(f"已加载播放列表：{path}（{len(playlist.entries)} 项）")
+        return playlist
+
+    def _apply_material(self, material: str, destination: Path) -> bool:
+        """将播放列表中的素材覆盖写入目标文件，支持图片 URL 与本地路径。"""
+
+        if urlparse(material).scheme in ("http", "https"):
+            return self._download_image(material, destination)
+
+        source = Path(material).expanduser()
+        if not source.is_file():
+            self._log(f"素材文件不存在：{source}")
             return False
+        return self._publish_file(source, destination)
+
+    def _publish_file(self, source: Path, destination: Path) -> bool:
+        """将准备好的图片原子替换到素材位置，避免直播软件读到半个文件。"""
 
         try:
             destination.parent.mkdir(parents=True, exist_ok=True)
-            with destination.open("wb") as file_handle:
-                file_handle.write(data)
-            self._log(f"图片已保存到：{destination}")
+            temp_path = destination.with_name(destination.name + ".tmp")
+            shutil.copyfile(source, temp_path)
+            temp_path.replace(destination)
         except OSError as exc:
-            logger.exception("保存图片失败")
-            self._log(f"保存图片失败：{exc}")
+            logger.exception("写入素材失败")
+            self._log(f"写入素材失败：{exc}")
             return False
+        self._log(f"图片已保存到：{destination}")
+        return True
 
+    def _prefetch_image(
+        self,
+        url: str,
+        cache_dir: Path,
+        sku: str,
+        normalizer: Optional[ImageNormalizer] = None,
+    ) -> "Future[Path]":
+        """提交后台预取，原图按 URL 缓存、规范化结果按 SKU 与 URL 缓存，后续轮次不再重复处理。"""
+
+        # 清理URL，移除可能的查询参数和片段
+        clean_url = url.split('?')[0].split('#')[0]
+        if normalizer is not None:
+            normalized = normalizer.cached(sku, clean_url)
+            if normalized is not None:
+                cached: "Future[Path]" = Future()
+                cached.set_result(normalized)
+                return cached
+
+        suffix = Path(urlparse(clean_url).path).suffix[:8] or ".img"
+        cache_path = cache_dir / f"{hashlib.sha1(clean_url.encode('utf-8')).hexdigest()}{suffix}"
+        postprocess = (lambda path: normalizer.normalize(path, sku, clean_url)) if normalizer is not None else None
+        return self.image_fetcher.submit(clean_url, cache_path, postprocess=postprocess, reuse_existing=True)
+
+    def _build_normalizer(self, cache_dir: Path) -> Optional[ImageNormalizer]:
+        """根据 image.normalize 配置创建图片规范化器，未启用或缺少 Pillow 时返回 None。"""
+
+        normalize_config = self.config.get("image", {}).get("normalize", {}) or {}
+        if not normalize_config.get("enabled", False):
+            return None
+        try:
+            options = NormalizeOptions(
+                width=int(normalize_config.get("width", 800)),
+                height=int(normalize_config.get("height", 800)),
+                image_format=str(normalize_config.get("format", FORMAT_JPEG)).lower(),
+                quality=int(normalize_config.get("quality", 85)),
+                background=str(normalize_config.get("background", "#FFFFFF")),
+                mode=str(normalize_config.get("mode", "contain")),
+            )
+        except (TypeError, ValueError) as exc:
+            self._log(f"图片规范化配置无效，已跳过：{exc}")
+            return None
+        normalizer = ImageNormalizer(cache_dir / "normalized", options)
+        if not normalizer.available:
+            self._log("未安装 Pillow，图片规范化已跳过。")
+            return None
+        self._log(f"图片规范化已启用：{options.width}x{options.height} {options.image_format.upper()}")
+        return normalizer
+
+    def _publish_prefetched(self, future: Optional["Future[Path]"], destination: Path) -> bool:
+        """等待预取结果并发布到素材位置；未预取或预取失败时返回 False。"""
+
+        if future is None:
+            return False
+        try:
+            cached_path = self.task_control.result(future, timeout=self.image_fetcher.timeout)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("预取图片失败: {}", exc)
+            self._log(f"预取图片失败，改为直接下载：{exc}")
+            return False
+        return self._publish_file(cached_path, destination)
+
+    def _download_image(
+        self,
+        url: str,
+        destination: Path,
+        normalizer: Optional[ImageNormalizer] = None,
+        sku: Optional[str] = None,
+    ) -> bool:
+        # 清理URL，移除可能的查询参数和片段
+        clean_url = url.split('?')[0].split('#')[0]
+        try:
+            if normalizer is not None and sku:
+                # 先下载原图再规范化，最后原子替换到素材位置
+                raw_path = normalizer.cache_dir / f"{hashlib.sha1(clean_url.encode('utf-8')).hexdigest()}.raw"
+                self.task_control.result(self.image_fetcher.submit(clean_url, raw_path))
+                return self._publish_file(normalizer.normalize(raw_path, sku, clean_url), destination)
+            # 在下载线程池中下载，任务线程只等待结果，停止时不必等到下载超时
+            self.task_control.result(self.image_fetcher.submit(clean_url, destination))
+        except ImageFetchError as exc:
+            logger.warning("下载图片失败: {}", exc)
+            self._log(f"下载图片失败：{exc}")
+            return False
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("下载图片时发生异常")
+            self._log(f"下载图片异常：{exc}")
+            return False
+        self._log(f"图片已保存到：{destination}")
         return True
 
     def _on_browse_material(self) -> None:
@@ -2397,11 +2054,18 @@ class MainWindow(tk.Tk):
         if interval is None:
             return
 
-        self.config["app"]["default_port"] = port
-        self.config["task"]["duration_seconds"] = duration
-        self.config["task"]["interval_seconds"] = interval
-        self.config["task"]["material_path"] = self.material_path_var.get().strip()
-        self.config_manager.save(self.config)
+        config = self.config_manager.editable()
+        config.setdefault("app", {})["default_port"] = port
+        task_config = config.setdefault("task", {})
+        task_config["duration_seconds"] = duration
+        task_config["interval_seconds"] = interval
+        task_config["material_path"] = self.material_path_var.get().strip()
+        task_config["continuous"] = self.continuous_var.get()
+        try:
+            self.config_manager.save(config)
+        except ConfigError as exc:
+            messagebox.showerror("保存失败", str(exc))
+            return
         self._log("配置保存成功。")
         messagebox.showinfo("保存成功", "配置已写入 settings.yaml。")
 
@@ -2420,7 +2084,7 @@ class MainWindow(tk.Tk):
             messagebox.showerror("验证异常", str(exc))
             return
 
-        self._log(f"授权成功，卡密 {info.key} 有效期至 {info.expiry_date}")
+        self._log(f"授权成功，卡密 {info.subject} 有效期至 {info.expiry_date}")
         messagebox.showinfo("授权成功", f"授权有效期至 {info.expiry_date}")
         self._refresh_license_status()
 
@@ -2431,7 +2095,8 @@ class MainWindow(tk.Tk):
             self.license_status_var.set(f"授权有效，剩余 {remaining} 天（至 {expiry}）")
             self.license_status_label.configure(foreground="#0F730C")
             self._set_controls_enabled(True)
-            self._bind_hotkeys()
+            if self._subsystems_started:
+                self._bind_hotkeys()
         else:
             self.license_status_var.set("未授权或已过期，请输入有效卡密后使用。")
             self.license_status_label.configure(foreground="#B3261E")
@@ -2486,15 +2151,30 @@ class MainWindow(tk.Tk):
         self.after(200, self._poll_log_queue)
 
     def _on_close(self) -> None:
-        if messagebox.askokcancel("退出", "确定要退出程序吗？"):
-            self.task_stop_event.set()
-            if self.task_thread and self.task_thread.is_alive():
-                self.task_thread.join(timeout=5)
-            self.scheduler.shutdown()
-            self.hotkeys.clear()
-            if self.controller.is_connected:
-                try:
-                    self.controller.disconnect()
-                except Exception as exc:  # noqa: BLE001
-                    logger.debug("关闭窗口时断开浏览器连接失败: {}", exc)
-            self.destroy()
+        if self._closing or not messagebox.askokcancel("退出", "确定要退出程序吗？"):
+            return
+        self._closing = True
+        self.task_control.stop()
+        thread = self.task_thread
+        if thread and thread.is_alive():
+            # 不在界面线程中 join，轮询任务线程退出（最多 CLOSE_WAIT_SECONDS 秒）后再释放资源
+            self._log("正在停止自动讲解任务，完成后退出...")
+            self._await_task_stop(thread, time.monotonic(), on_stopped=self._shutdown, timeout=CLOSE_WAIT_SECONDS)
+            return
+        self._shutdown()
+
+    def _shutdown(self) -> None:
+        """释放各管理器与浏览器连接并关闭窗口。"""
+
+        self.config_manager.stop_watching()
+        self.scheduler.shutdown()
+        self.comment_monitor.stop()
+        self.image_fetcher.shutdown()
+        self.hotkeys.clear()
+        if self.controller.is_connected:
+            try:
+                self.commands.call("disconnect", self.controller.disconnect, timeout=5)
+            except Exception as exc:  # noqa: BLE001
+                logger.debug("关闭窗口时断开浏览器连接失败: {}", exc)
+        self.commands.shutdown(timeout=2)
+        self.destroy()
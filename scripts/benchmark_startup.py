@@ -0,0 +1,329 @@
+"""
+启动性能基准测试脚本
+测量程序从启动到首帧显示、到绑定浏览器完成的耗时与峰值内存，结果保存为 JSON，
+与历史结果对比即可发现新增导入等原因造成的启动变慢。
+
+测试对象:
+    source    源码入口（python -m JD_Live_Assistant.main），需要图形界面
+    headless  无界面等价流程：相同的导入、配置、授权与管理器创建，不创建窗口
+    exe       PyInstaller 打包后的程序（单文件模式每次启动都会解压到 _MEIPASS）
+
+用法示例:
+    python benchmark_startup.py --targets source,headless --runs 5
+    python benchmark_startup.py --targets exe --exe dist/JDLiveAssistant.exe --port 9222
+    python benchmark_startup.py --baseline benchmarks/startup-20260101-120000.json --max-regression 0.2
+"""
+
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from JD_Live_Assistant.core.startup import (
+    CONNECT_PORT_ENV,
+    MARK_CONNECTED,
+    MARK_FIRST_FRAME,
+    REPORT_ENV,
+    StartupTimer,
+)
+
+try:  # psutil 为可选依赖，安装后额外统计子进程（Playwright 驱动等）的内存
+    import psutil
+except ImportError:  # pragma: no cover - 可选依赖
+    psutil = None
+
+TARGETS = ("source", "headless", "exe")
+METRICS = ("time_to_first_window", "time_to_connected", "peak_rss_bytes", "peak_tree_rss_bytes")
+DEFAULT_EXE = project_root / "dist" / "JDLiveAssistant.exe"
+DEFAULT_OUTPUT_DIR = project_root / "benchmarks"
+POLL_INTERVAL = 0.05
+
+
+def run_headless_child() -> None:
+    """无界面模式的子进程：执行入口的启动流程（不创建窗口），写出启动统计后退出。"""
+
+    startup = StartupTimer(origin=_STARTED)
+    with startup.span("导入模块"):
+        from JD_Live_Assistant import main as app_main
+
+    base_dir = app_main.get_app_dir()
+    app_main.setup_logging(base_dir)
+    services = app_main.create_services(base_dir, startup)
+    startup.mark(MARK_FIRST_FRAME)
+    startup.finish()
+    port = startup.connect_port
+    if port is not None:
+        services.controller.connect(port)
+        startup.mark(MARK_CONNECTED)
+        startup.write_report()
+        services.controller.disconnect()
+
+
+def build_command(target: str, exe_path: Path) -> List[str]:
+    if target == "source":
+        return [sys.executable, "-m", "JD_Live_Assistant.main"]
+    if target == "headless":
+        return [sys.executable, str(Path(__file__).resolve()), "--headless-child"]
+    return [str(exe_path)]
+
+
+class RssSampler:
+    """周期性采样进程树的常驻内存，记录峰值（需要 psutil）。"""
+
+    def __init__(self, pid: int) -> None:
+        self.peak: Optional[int] = None
+        self._process = None
+        if psutil is not None:
+            try:
+                self._process = psutil.Process(pid)
+            except psutil.Error:
+                self._process = None
+
+    def sample(self) -> None:
+        if self._process is None:
+            return
+        total = 0
+        try:
+            processes = [self._process] + self._process.children(recursive=True)
+        except psutil.Error:
+            return
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        if total and (self.peak is None or total > self.peak):
+            self.peak = total
+
+
+def terminate_tree(proc: subprocess.Popen) -> None:
+    """结束被测进程及其子进程（单文件程序的引导进程会再启动一个子进程）。"""
+
+    if proc.poll() is not None:
+        return
+    if psutil is not None:
+        try:
+            children = psutil.Process(proc.pid).children(recursive=True)
+        except psutil.Error:
+            children = []
+        for child in children:
+            try:
+                child.kill()
+            except psutil.Error:
+                pass
+    elif sys.platform == "win32":
+        subprocess.run(
+            ["taskkill", "/PID", str(proc.pid), "/T", "/F"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    if proc.poll() is None:
+        proc.kill()
+    proc.wait(timeout=10)
+
+
+def read_report(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def run_once(target: str, exe_path: Path, port: Optional[int], timeout: float) -> Dict[str, Any]:
+    """启动一次被测程序，等待统计写出后结束进程，返回本次的指标。"""
+
+    wanted = {MARK_FIRST_FRAME} | ({MARK_CONNECTED} if port is not None else set())
+    with tempfile.TemporaryDirectory(prefix="jdla-startup-") as tmp:
+        report_path = Path(tmp) / "report.json"
+        env = dict(os.environ)
+        env[REPORT_ENV] = str(report_path)
+        env.pop(CONNECT_PORT_ENV, None)
+        if port is not None:
+            env[CONNECT_PORT_ENV] = str(port)
+
+        started = time.time()
+        proc = subprocess.Popen(
+            build_command(target, exe_path),
+            cwd=str(project_root),
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        sampler = RssSampler(proc.pid)
+        report = None
+        try:
+            deadline = started + timeout
+            while time.time() < deadline:
+                sampler.sample()
+                report = read_report(report_path)
+                if report and wanted <= set(report.get("marks", {})):
+                    break
+                if proc.poll() is not None:
+                    report = read_report(report_path)
+                    break
+                time.sleep(POLL_INTERVAL)
+            sampler.sample()
+        finally:
+            terminate_tree(proc)
+
+    marks = (report or {}).get("marks", {})
+    missing = sorted(wanted - set(marks))
+    result: Dict[str, Any] = {
+        "time_to_first_window": _elapsed(marks, MARK_FIRST_FRAME, started),
+        "time_to_connected": _elapsed(marks, MARK_CONNECTED, started),
+        "peak_rss_bytes": (report or {}).get("peak_rss_bytes"),
+        "peak_tree_rss_bytes": sampler.peak,
+        "spans": (report or {}).get("spans", []),
+    }
+    if missing:
+        result["error"] = f"{timeout:.0f} 秒内未记录：{', '.join(missing)}（退出码 {proc.returncode}）"
+    return result
+
+
+def _elapsed(marks: Dict[str, float], name: str, started: float) -> Optional[float]:
+    return round(marks[name] - started, 4) if name in marks else None
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Optional[float]]]:
+    summary: Dict[str, Dict[str, Optional[float]]] = {}
+    for metric in METRICS:
+        values = [run[metric] for run in runs if run.get(metric) is not None]
+        summary[metric] = {
+            "median": statistics.median(values) if values else None,
+            "min": min(values) if values else None,
+            "max": max(values) if values else None,
+        }
+    return summary
+
+
+def git_revision() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=str(project_root),
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """按各指标中位数与基线对比，返回超过允许幅度的退化说明。"""
+
+    regressions = []
+    for target, result in current["results"].items():
+        base = baseline.get("results", {}).get(target)
+        if not base:
+            continue
+        for metric in METRICS:
+            now = result["summary"][metric]["median"]
+            before = base["summary"][metric]["median"]
+            if now is None or not before:
+                continue
+            change = now / before - 1
+            line = f"{target:<9} {metric:<22} {_format(metric, before)} -> {_format(metric, now)} ({change:+.1%})"
+            print(line)
+            if change > max_regression:
+                regressions.append(line)
+    return regressions
+
+
+def _format(metric: str, value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    if metric.endswith("_bytes"):
+        return f"{value / 1024 / 1024:.1f}MB"
+    return f"{value:.3f}s"
+
+
+def print_summary(results: Dict[str, Any]) -> None:
+    for target, result in results.items():
+        parts = [f"{metric}={_format(metric, result['summary'][metric]['median'])}" for metric in METRICS]
+        print(f"{target:<9} " + "  ".join(parts))
+        for index, run in enumerate(result["runs"], 1):
+            if run.get("error"):
+                print(f"    第 {index} 次: {run['error']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="启动耗时与内存基准测试")
+    parser.add_argument("--targets", default="source,headless", help=f"测试对象，逗号分隔：{','.join(TARGETS)}")
+    parser.add_argument("--runs", type=int, default=5, help="每个对象启动的次数，取中位数（默认: 5）")
+    parser.add_argument("--port", type=int, default=None, help="首帧后自动绑定的浏览器调试端口，用于测量连接耗时")
+    parser.add_argument("--exe", default=str(DEFAULT_EXE), help="打包程序路径（默认: dist/JDLiveAssistant.exe）")
+    parser.add_argument("--timeout", type=float, default=60.0, help="单次启动的最长等待秒数（默认: 60）")
+    parser.add_argument("--output", default=None, help="结果 JSON 路径（默认: benchmarks/startup-<时间>.json）")
+    parser.add_argument("--baseline", default=None, help="对比的历史结果 JSON")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="允许的最大退化比例（默认: 0.2）")
+    parser.add_argument("--headless-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.headless_child:
+        run_headless_child()
+        return
+
+    targets = [name.strip() for name in args.targets.split(",") if name.strip()]
+    unknown = [name for name in targets if name not in TARGETS]
+    if unknown:
+        parser.error(f"未知的测试对象：{', '.join(unknown)}")
+    exe_path = Path(args.exe)
+    if "exe" in targets and not exe_path.exists():
+        parser.error(f"找不到打包程序：{exe_path}，请先运行 build_exe.bat")
+
+    results: Dict[str, Any] = {}
+    for target in targets:
+        runs = []
+        for index in range(args.runs):
+            print(f"[{target}] 第 {index + 1}/{args.runs} 次启动...")
+            runs.append(run_once(target, exe_path, args.port, args.timeout))
+        results[target] = {"summary": summarize(runs), "runs": runs}
+
+    document = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "port": args.port,
+        "psutil": psutil is not None,
+        "results": results,
+    }
+    output = Path(args.output) if args.output else DEFAULT_OUTPUT_DIR / f"startup-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print()
+    print_summary(results)
+    print(f"\n结果已保存到: {output}")
+
+    if args.baseline:
+        print(f"\n与基线对比: {args.baseline}")
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(document, baseline, args.max_regression)
+        if regressions:
+            print(f"\n以下指标退化超过 {args.max_regression:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
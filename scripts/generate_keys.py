@@ -4,7 +4,7 @@
 """
 
 import json
-import random
+import secrets
 import string
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -24,7 +24,8 @@ def generate_key(prefix: str = "JD", length: int = 8, use_date: bool = True) ->
         生成的卡密字符串，格式如：JD-XXXX-2025 或 JD-XXXXXXXX
     """
     # 生成随机字符（大写字母和数字）
-    random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
+    alphabet = string.ascii_uppercase + string.digits
+    random_part = ''.join(secrets.choice(alphabet) for _ in range(length))
     
     if use_date:
         year = datetime.now().year
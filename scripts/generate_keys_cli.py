@@ -3,20 +3,62 @@
 用法示例:
     python generate_keys_cli.py --count 10 --expiry 2025-12-31
     python generate_keys_cli.py --count 20 --expiry 2026-06-30 --prefix JD --output keys.json
+    python generate_keys_cli.py --generate-keypair
+    python generate_keys_cli.py --count 10 --expiry 2026-06-30 --kid demo --signing-key <base64私钥>
+
+签名卡密默认使用 Ed25519（EdDSA）：私钥只保存在发卡方，客户端 license.py 的
+DEFAULT_TRUSTED_KEYS 中只登记公钥。HS256 的签名密钥与验证密钥相同，登记到客户端
+即等于公开了发卡能力，只用于服务端校验与测试（客户端需 allow_shared_secret=True）。
+    python generate_keys_cli.py --bulk --count 1000000 --expiry 2026-06-30 --output keys.jsonl --registry keys.jdkr
 """
 
 import argparse
+import base64
+import csv
 import json
-import random
+import secrets
 import string
+import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterator, List, Optional, Set
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from JD_Live_Assistant.core.license import ALG_EDDSA, ALG_HS256, LicenseError, issue_token
+from JD_Live_Assistant.core.registry import write_registry
+
+ALPHABET = string.ascii_uppercase + string.digits
+# 批量模式下把随机字节映射为字符：0-251 均匀映射到 36 个字符，252-255 丢弃，保证分布均匀
+_BYTE_TO_CHAR = bytes(ord(ALPHABET[value % len(ALPHABET)]) for value in range(252)) + bytes(4)
+_REJECTED = bytes(range(252, 256))
+
+
+def generate_keypair() -> Dict[str, str]:
+    """生成 Ed25519 签名密钥对（base64），私钥用于发卡，公钥登记到客户端。"""
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+    except ImportError as exc:
+        raise LicenseError("生成 Ed25519 密钥对需要安装 cryptography") from exc
+
+    private_key = Ed25519PrivateKey.generate()
+    private_raw = private_key.private_bytes(
+        serialization.Encoding.Raw, serialization.PrivateFormat.Raw, serialization.NoEncryption()
+    )
+    public_raw = private_key.public_key().public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+    return {
+        "private_key": base64.b64encode(private_raw).decode("ascii"),
+        "public_key": base64.b64encode(public_raw).decode("ascii"),
+    }
 
 
 def generate_key(prefix: str = "JD", length: int = 8, use_date: bool = True) -> str:
     """生成单个卡密"""
-    random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
+    random_part = ''.join(secrets.choice(ALPHABET) for _ in range(length))
     
     if use_date:
         year = datetime.now().year
@@ -31,9 +73,17 @@ def generate_keys(
     prefix: str = "JD",
     length: int = 8,
     use_date: bool = True,
-    output_file: str = None
+    output_file: str = None,
+    kid: Optional[str] = None,
+    signing_key: Optional[bytes] = None,
+    alg: str = ALG_EDDSA,
+    scope: Optional[List[str]] = None,
 ) -> Dict[str, str]:
-    """批量生成卡密"""
+    """批量生成卡密
+
+    提供 ``kid`` 与 ``signing_key`` 时生成签名卡密（卡密编号 -> 签名卡密），
+    客户端离线验签，无需修改 license.py。
+    """
     # 验证日期格式
     try:
         datetime.strptime(expiry_date, "%Y-%m-%d")
@@ -53,12 +103,18 @@ def generate_keys(
         
         if key not in generated:
             generated.add(key)
-            registry_dict[key] = expiry_date
+            if signing_key is not None:
+                registry_dict[key] = issue_token(key, expiry_date, kid, signing_key, alg=alg, scope=scope or ())
+            else:
+                registry_dict[key] = expiry_date
             print(f"[{len(registry_dict)}/{count}] {key}")
     
     # 输出到控制台
     print("\n" + "=" * 60)
-    print("生成的卡密字典（可直接复制到 license.py 的 DEFAULT_KEY_REGISTRY）:")
+    if signing_key is not None:
+        print("生成的签名卡密（卡密编号 -> 发给用户的签名卡密）:")
+    else:
+        print("生成的卡密字典（可直接复制到 license.py 的 DEFAULT_KEY_REGISTRY）:")
     print("=" * 60)
     print(json.dumps(registry_dict, ensure_ascii=False, indent=2))
     
@@ -75,6 +131,103 @@ def generate_keys(
     return registry_dict
 
 
+def iter_random_parts(length: int, batch_size: int) -> Iterator[List[str]]:
+    """按批生成随机字符串，每批一次读取系统随机源。"""
+
+    while True:
+        # 约 1.6% 的字节会被丢弃，多取一些保证一次凑够
+        raw = secrets.token_bytes(batch_size * length * 66 // 64 + 64)
+        chars = raw.translate(_BYTE_TO_CHAR, _REJECTED).decode("ascii")
+        usable = len(chars) // length
+        yield [chars[i * length:(i + 1) * length] for i in range(min(usable, batch_size))]
+
+
+def generate_bulk(
+    count: int,
+    expiry_date: str,
+    prefix: str = "JD",
+    length: int = 8,
+    use_date: bool = True,
+    output_file: Optional[str] = None,
+    output_format: Optional[str] = None,
+    registry_file: Optional[str] = None,
+    batch_size: int = 100000,
+    kid: Optional[str] = None,
+    signing_key: Optional[bytes] = None,
+    alg: str = ALG_EDDSA,
+    scope: Optional[List[str]] = None,
+) -> int:
+    """大批量生成卡密：按批生成并去重，流式写出 JSONL/CSV，可同时导出注册表文件。
+
+    不逐个打印卡密，也不在内存中保留输出内容，只保留用于去重的卡密集合。
+    """
+    datetime.strptime(expiry_date, "%Y-%m-%d")
+    if count > len(ALPHABET) ** length // 2:
+        raise ValueError(f"随机字符长度 {length} 的组合数不足以生成 {count} 个不重复的卡密，请增加 --length")
+
+    suffix = f"-{datetime.now().year}" if use_date else ""
+    head = f"{prefix}-"
+    output_path = Path(output_file) if output_file else None
+    fmt = output_format or (output_path.suffix.lstrip(".").lower() if output_path else "jsonl")
+    if fmt not in ("jsonl", "csv"):
+        raise ValueError("批量模式的输出格式应为 jsonl 或 csv")
+
+    generated: Set[str] = set()
+    started = time.perf_counter()
+    sink = None
+    writer = None
+    if output_path:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        sink = output_path.open("w", encoding="utf-8", newline="")
+        if fmt == "csv":
+            writer = csv.writer(sink)
+            writer.writerow(["key", "expiry", "token"] if signing_key is not None else ["key", "expiry"])
+    try:
+        for parts in iter_random_parts(length, batch_size):
+            batch = []
+            for part in parts:
+                key = f"{head}{part}{suffix}"
+                if key in generated:
+                    continue
+                generated.add(key)
+                batch.append(key)
+                if len(generated) >= count:
+                    break
+            if sink is not None and batch:
+                if fmt == "csv":
+                    if signing_key is not None:
+                        writer.writerows(
+                            (key, expiry_date, issue_token(key, expiry_date, kid, signing_key, alg=alg, scope=scope or ()))
+                            for key in batch
+                        )
+                    else:
+                        writer.writerows((key, expiry_date) for key in batch)
+                else:
+                    lines = []
+                    for key in batch:
+                        record = {"key": key, "expiry": expiry_date}
+                        if signing_key is not None:
+                            record["token"] = issue_token(key, expiry_date, kid, signing_key, alg=alg, scope=scope or ())
+                        lines.append(json.dumps(record, ensure_ascii=False))
+                    sink.write("\n".join(lines) + "\n")
+            print(f"已生成 {len(generated)}/{count} 个卡密", end="\r", flush=True)
+            if len(generated) >= count:
+                break
+    finally:
+        if sink is not None:
+            sink.close()
+    print()
+    print(f"生成 {len(generated)} 个卡密，用时 {time.perf_counter() - started:.1f} 秒")
+    if output_path:
+        print(f"卡密已保存到: {output_path.absolute()}")
+
+    if registry_file:
+        registry_path = Path(registry_file)
+        written = write_registry(registry_path, ((key, expiry_date) for key in generated))
+        print(f"注册表已写入: {registry_path.absolute()}（{written} 个卡密）")
+    return len(generated)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="卡密生成工具（命令行版本）",
@@ -89,20 +242,29 @@ def main():
   
   # 生成卡密，不包含年份
   python generate_keys_cli.py --count 5 --expiry 2025-12-31 --no-date
+  
+  # 生成 Ed25519 密钥对：公钥登记到 license.py 的 DEFAULT_TRUSTED_KEYS，私钥妥善保管
+  python generate_keys_cli.py --generate-keypair
+
+  # 用私钥生成签名卡密
+  python generate_keys_cli.py --count 10 --expiry 2026-06-30 --kid prod --signing-key <base64私钥>
+
+  # 批量生成一百万个卡密，流式写出 JSONL，并导出可供客户端查询的注册表
+  python generate_keys_cli.py --bulk --count 1000000 --expiry 2026-06-30 --output keys.jsonl --registry keys.jdkr
         """
     )
     
     parser.add_argument(
         "--count", "-c",
         type=int,
-        required=True,
+        default=None,
         help="要生成的卡密数量"
     )
     
     parser.add_argument(
         "--expiry", "-e",
         type=str,
-        required=True,
+        default=None,
         help="过期日期，格式: YYYY-MM-DD (例如: 2025-12-31)"
     )
     
@@ -133,22 +295,126 @@ def main():
         help="输出文件路径 (可选)"
     )
     
+    parser.add_argument(
+        "--kid",
+        type=str,
+        default=None,
+        help="签名密钥编号，需已登记在 license.py 的 DEFAULT_TRUSTED_KEYS 中"
+    )
+    
+    parser.add_argument(
+        "--signing-key",
+        type=str,
+        default=None,
+        help="base64 编码的签名密钥（EdDSA 为 32 字节私钥，HS256 为共享密钥），提供后生成签名卡密"
+    )
+    
+    parser.add_argument(
+        "--alg",
+        choices=[ALG_EDDSA, ALG_HS256],
+        default=ALG_EDDSA,
+        help="签名算法 (默认: EdDSA；HS256 仅用于服务端校验与测试，不能登记到客户端)"
+    )
+    
+    parser.add_argument(
+        "--generate-keypair",
+        action="store_true",
+        help="生成 Ed25519 密钥对后退出：公钥登记到 DEFAULT_TRUSTED_KEYS，私钥用于 --signing-key"
+    )
+    
+    parser.add_argument(
+        "--scope",
+        action="append",
+        default=None,
+        help="授权范围，可重复指定；不指定表示全部功能"
+    )
+    
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="批量模式：按批生成，不逐个打印，流式写出 JSONL/CSV"
+    )
+    
+    parser.add_argument(
+        "--format",
+        choices=["jsonl", "csv"],
+        default=None,
+        help="批量模式的输出格式 (默认按输出文件后缀，否则为 jsonl)"
+    )
+    
+    parser.add_argument(
+        "--registry",
+        type=str,
+        default=None,
+        help="批量模式下同时导出注册表：.sqlite/.db 为 SQLite，其他后缀为有序二进制文件 (如 keys.jdkr)"
+    )
+    
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100000,
+        help="批量模式每批生成的卡密数量 (默认: 100000)"
+    )
+    
     args = parser.parse_args()
     
+    if args.generate_keypair:
+        try:
+            keypair = generate_keypair()
+        except LicenseError as e:
+            print(f"错误: {e}")
+            return 1
+        print(f"公钥（登记到 license.py 的 DEFAULT_TRUSTED_KEYS）: {keypair['public_key']}")
+        print(f"私钥（只保存在发卡方，用于 --signing-key）: {keypair['private_key']}")
+        return 0
+    
+    if args.count is None or args.expiry is None:
+        parser.error("需要提供 --count 与 --expiry")
     if args.count <= 0:
         parser.error("卡密数量必须大于 0")
     
     if args.length < 4:
         print("警告: 随机字符长度过短，建议至少 4 位")
     
+    if bool(args.kid) != bool(args.signing_key):
+        parser.error("--kid 与 --signing-key 需同时提供")
+    signing_key = base64.b64decode(args.signing_key) if args.signing_key else None
+    
+    if (args.format or args.registry) and not args.bulk:
+        parser.error("--format 与 --registry 需配合 --bulk 使用")
+    if args.batch_size <= 0:
+        parser.error("--batch-size 必须大于 0")
+    
     try:
+        if args.bulk:
+            generate_bulk(
+                count=args.count,
+                expiry_date=args.expiry,
+                prefix=args.prefix,
+                length=args.length,
+                use_date=not args.no_date,
+                output_file=args.output,
+                output_format=args.format,
+                registry_file=args.registry,
+                batch_size=args.batch_size,
+                kid=args.kid,
+                signing_key=signing_key,
+                alg=args.alg,
+                scope=args.scope,
+            )
+            return 0
+        
         registry_dict = generate_keys(
             count=args.count,
             expiry_date=args.expiry,
             prefix=args.prefix,
             length=args.length,
             use_date=not args.no_date,
-            output_file=args.output
+            output_file=args.output,
+            kid=args.kid,
+            signing_key=signing_key,
+            alg=args.alg,
+            scope=args.scope,
         )
         
         print()